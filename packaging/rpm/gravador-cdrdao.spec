@@ -7,6 +7,7 @@ URL:            https://example.com/gravador-cdrdao
 BuildArch:      noarch
 BuildRequires:  python3-devel
 Requires:       python3-pyside6 cdrdao polkit
+Recommends:     python3-numpy
 
 %description
 Aplicativo GUI com suporte a CUE/BIN multi-trilha (PS1).
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import dataclasses
+import time
+from concurrent.futures import Future
+from functools import partial
+
+from PySide6 import QtCore
+
+from gravador_cdrdao.cache_imagens import CacheImagens, cue_comprimido
+from gravador_cdrdao.classificador_erros import ClassificadorErros, OcorrenciaErro
+from gravador_cdrdao.executor_cdrdao import ExecutorCdrdao, ExecutorCdrdaoFactory
+from gravador_cdrdao.fila_trabalhos import (
+    MODOS_COM_IMAGEM,
+    FilaTrabalhos,
+    TrabalhoGravacao,
+    le_imagem,
+    pode_tentar_novamente,
+    preparar_nova_tentativa,
+)
+from gravador_cdrdao.pre_leitura import (
+    EstatisticaPreLeitura,
+    PreLeitor,
+    duracao_estimada,
+    tamanho_imagem,
+)
+from gravador_cdrdao.progresso import ProgressoCdrdao, SerieTelemetria
+
+
+def criar_executor(trabalho: TrabalhoGravacao) -> ExecutorCdrdao:
+    return ExecutorCdrdaoFactory.criar_trabalho(trabalho)
+
+
+class AgendadorGravacoes(QtCore.QObject):
+    trabalho_iniciado = QtCore.Signal(str, str)
+    etapa_iniciada = QtCore.Signal(str, str, str)
+    progresso_trabalho = QtCore.Signal(str, str, ProgressoCdrdao)
+    etapa_finalizada = QtCore.Signal(str, str, str, int, str, float)
+    trabalho_finalizado = QtCore.Signal(str, str, int, str)
+    telemetria_trabalho = QtCore.Signal(str, str, SerieTelemetria)
+    erro_trabalho = QtCore.Signal(str, str, OcorrenciaErro)
+    # Identificador, drive, motivo e a velocidade da nova tentativa.
+    trabalho_reenfileirado = QtCore.Signal(str, str, str, int)
+    aviso_trabalho = QtCore.Signal(str, str, str)
+    pre_leitura_trabalho = QtCore.Signal(str, str, EstatisticaPreLeitura)
+    _preparo_concluido = QtCore.Signal(str)
+
+    def __init__(
+        self,
+        limite_concorrencia: int = 0,
+        classificador: ClassificadorErros | None = None,
+        cache_imagens: CacheImagens | None = None,
+        preparar_todos: bool = True,
+        pre_leitor: PreLeitor | None = None,
+    ) -> None:
+        super().__init__()
+        # Aquece no page cache as imagens que não passam pelo cache local.
+        self._pre_leitor = pre_leitor
+        self._tamanhos: dict[str, int] = {}
+        self._comprimidos: dict[str, bool] = {}
+        self._cache_imagens = cache_imagens
+        # Sem cache local configurado só os lotes multi-cópia passam pelo cache.
+        self._preparar_todos = preparar_todos
+        # CUE local de cada trabalho, copiado enquanto ele ainda espera na fila.
+        self._preparos: dict[str, Future[str]] = {}
+        self._preparo_concluido.connect(self._ao_preparo_concluido)
+        self._fila = FilaTrabalhos(limite_concorrencia)
+        self._classificador = classificador or ClassificadorErros()
+        self._executores: dict[str, ExecutorCdrdao] = {}
+        self._inicios: dict[str, float] = {}
+        self._cancelados: set[str] = set()
+        self._ocorrencias: dict[str, list[OcorrenciaErro]] = {}
+
+    def enfileirar(self, trabalho: TrabalhoGravacao) -> str:
+        self._fila.adicionar(trabalho)
+        if self._deve_preparar(trabalho):
+            self._preparos[trabalho.identificador] = self._cache_imagens.agendar(
+                trabalho.cue, trabalho.identificador
+            )
+        self._despachar()
+        return trabalho.identificador
+
+    def definir_cache_imagens(self, cache: CacheImagens, preparar_todos: bool) -> None:
+        self._cache_imagens = cache
+        self._preparar_todos = preparar_todos
+
+    def possui_cache_imagens(self) -> bool:
+        return self._cache_imagens is not None
+
+    def _deve_preparar(self, trabalho: TrabalhoGravacao) -> bool:
+        if self._cache_imagens is None or not le_imagem(trabalho):
+            return False
+        if self._preparar_todos or trabalho.grupo:
+            return True
+        # O cdrdao não lê BINs comprimidos: esses sempre passam pelo cache.
+        return self._comprimido(trabalho.cue)
+
+    def _comprimido(self, cue: str) -> bool:
+        if cue not in self._comprimidos:
+            self._comprimidos[cue] = cue_comprimido(cue)
+        return self._comprimidos[cue]
+
+    def definir_limite_concorrencia(self, limite: int) -> None:
+        self._fila.limite_concorrencia = limite
+        self._despachar()
+
+    def cancelar(self, dispositivo: str | None = None) -> None:
+        for removido in self._fila.remover_pendentes(dispositivo):
+            self._liberar_preparo(removido.identificador)
+        for trabalho in self._fila.ativos():
+            if dispositivo is None or trabalho.dispositivo == dispositivo:
+                self._cancelados.add(trabalho.identificador)
+                executor = self._executores.get(trabalho.identificador)
+                if executor:
+                    executor.cancelar()
+                elif trabalho.identificador in self._preparos:
+                    # Ainda esperando a cópia local: não há processo para matar.
+                    self._ao_finalizado(trabalho, 1, "Cancelado antes de iniciar.")
+
+    def em_execucao(self, dispositivo: str | None = None) -> bool:
+        if dispositivo is None:
+            return bool(self._fila.ativos())
+        return self._fila.ativo(dispositivo) is not None
+
+    def ocioso(self) -> bool:
+        return self._fila.vazia()
+
+    def pendentes(self, dispositivo: str | None = None) -> list[TrabalhoGravacao]:
+        return self._fila.pendentes(dispositivo)
+
+    def _despachar(self) -> None:
+        for trabalho in self._fila.proximos():
+            self.trabalho_iniciado.emit(trabalho.identificador, trabalho.dispositivo)
+            self._iniciar_etapa(trabalho)
+        self._replanejar_pre_leitura()
+
+    def _replanejar_pre_leitura(self) -> None:
+        """Reordena a pré-leitura pelo início previsto de cada trabalho pendente."""
+        if self._pre_leitor is None:
+            return
+        agora = time.monotonic()
+        livre_em: dict[str, float] = {}
+        for trabalho in self._fila.ativos():
+            decorrido = agora - self._inicios.get(trabalho.identificador, agora)
+            restante = max(0.0, self._duracao_prevista(trabalho) - decorrido)
+            livre_em[trabalho.dispositivo] = agora + restante
+        for trabalho in self._fila.pendentes():
+            inicio = livre_em.get(trabalho.dispositivo, agora)
+            livre_em[trabalho.dispositivo] = inicio + self._duracao_prevista(trabalho)
+            if le_imagem(trabalho) and not self._deve_preparar(trabalho):
+                self._pre_leitor.agendar(trabalho.identificador, trabalho.cue, inicio)
+
+    def _duracao_prevista(self, trabalho: TrabalhoGravacao) -> float:
+        if not le_imagem(trabalho):
+            return 0.0
+        if trabalho.cue not in self._tamanhos:
+            self._tamanhos[trabalho.cue] = tamanho_imagem(trabalho.cue)
+        return duracao_estimada(trabalho, self._tamanhos[trabalho.cue])
+
+    def _iniciar_etapa(self, trabalho: TrabalhoGravacao) -> None:
+        preparo = self._preparos.get(trabalho.identificador)
+        if preparo is not None and not preparo.done():
+            self.aviso_trabalho.emit(
+                trabalho.identificador,
+                trabalho.dispositivo,
+                "Copiando imagem para o cache local...",
+            )
+            # O callback roda na thread de cópia; o sinal volta para esta thread.
+            preparo.add_done_callback(
+                lambda _: self._preparo_concluido.emit(trabalho.identificador)
+            )
+            return
+        if self._pre_leitor is not None and trabalho.modo in MODOS_COM_IMAGEM:
+            estatistica = self._pre_leitor.iniciar(trabalho.identificador)
+            if estatistica is not None:
+                self.pre_leitura_trabalho.emit(
+                    trabalho.identificador, trabalho.dispositivo, estatistica
+                )
+        try:
+            local = self._com_cue_local(trabalho)
+        except ValueError as exc:
+            self._inicios[trabalho.identificador] = time.monotonic()
+            self.etapa_iniciada.emit(
+                trabalho.identificador, trabalho.dispositivo, trabalho.modo
+            )
+            self._ao_finalizado(trabalho, -1, str(exc))
+            return
+        executor = criar_executor(local)
+        executor.analisador_erros = self._classificador.novo_analisador()
+        self._ocorrencias[trabalho.identificador] = []
+        executor.progresso.connect(partial(self._ao_progresso, trabalho))
+        executor.erro_detectado.connect(partial(self._ao_erro, trabalho))
+        executor.finalizado.connect(partial(self._ao_finalizado, trabalho))
+        self._executores[trabalho.identificador] = executor
+        self._inicios[trabalho.identificador] = time.monotonic()
+        self.etapa_iniciada.emit(trabalho.identificador, trabalho.dispositivo, trabalho.modo)
+        executor.start()
+
+    def _com_cue_local(self, trabalho: TrabalhoGravacao) -> TrabalhoGravacao:
+        preparo = self._preparos.get(trabalho.identificador)
+        if preparo is None or trabalho.modo not in MODOS_COM_IMAGEM:
+            return trabalho
+        try:
+            return dataclasses.replace(trabalho, cue=preparo.result())
+        except Exception as exc:
+            if self._comprimido(trabalho.cue):
+                # Da origem o cdrdao gravaria os bytes comprimidos como dados.
+                raise ValueError(f"Imagem comprimida indisponível ({exc}).") from exc
+            # Sem cópia local a gravação ainda pode ler direto da origem.
+            del self._preparos[trabalho.identificador]
+            self.aviso_trabalho.emit(
+                trabalho.identificador,
+                trabalho.dispositivo,
+                f"Cache local indisponível ({exc}); lendo a imagem da origem.",
+            )
+            return trabalho
+
+    def _ao_preparo_concluido(self, identificador: str) -> None:
+        for trabalho in self._fila.ativos():
+            if trabalho.identificador == identificador:
+                self._iniciar_etapa(trabalho)
+
+    def _liberar_preparo(self, identificador: str) -> None:
+        if self._pre_leitor is not None:
+            self._pre_leitor.liberar(identificador)
+        preparo = self._preparos.pop(identificador, None)
+        if preparo is None or self._cache_imagens is None:
+            return
+        if preparo.done():
+            self._cache_imagens.liberar(identificador)
+        elif not preparo.cancel():
+            preparo.add_done_callback(lambda _: self._cache_imagens.liberar(identificador))
+
+    def _ao_progresso(self, trabalho: TrabalhoGravacao, progresso: ProgressoCdrdao) -> None:
+        self.progresso_trabalho.emit(trabalho.identificador, trabalho.dispositivo, progresso)
+
+    def _ao_erro(self, trabalho: TrabalhoGravacao, ocorrencia: OcorrenciaErro) -> None:
+        ocorrencias = self._ocorrencias.setdefault(trabalho.identificador, [])
+        ocorrencias.append(ocorrencia)
+        self.erro_trabalho.emit(trabalho.identificador, trabalho.dispositivo, ocorrencia)
+        if ocorrencia.fatal and not any(o.fatal for o in ocorrencias[:-1]):
+            # Não adianta esperar o cdrdao desistir sozinho.
+            executor = self._executores.get(trabalho.identificador)
+            if executor:
+                executor.cancelar()
+
+    def _ao_finalizado(self, trabalho: TrabalhoGravacao, codigo: int, log: str) -> None:
+        executor = self._executores.pop(trabalho.identificador, None)
+        if executor:
+            executor.aguardar()
+        ocorrencias = self._ocorrencias.pop(trabalho.identificador, [])
+        inicio = self._inicios.pop(trabalho.identificador, time.monotonic())
+        duracao = time.monotonic() - inicio
+        trabalho.tempos_etapas.append((trabalho.modo, duracao))
+        if executor and len(executor.telemetria):
+            self.telemetria_trabalho.emit(
+                trabalho.identificador, trabalho.dispositivo, executor.telemetria
+            )
+        self.etapa_finalizada.emit(
+            trabalho.identificador, trabalho.dispositivo, trabalho.modo, codigo, log, duracao
+        )
+        if self._etapa_aprovada(trabalho, codigo, ocorrencias):
+            if proxima := self._fila.avancar(trabalho.identificador):
+                self._iniciar_etapa(proxima)
+                return
+        cancelado = trabalho.identificador in self._cancelados
+        self._cancelados.discard(trabalho.identificador)
+        self._fila.concluir(trabalho.identificador)
+        fatal = next((o for o in ocorrencias if o.fatal), None)
+        if fatal and not cancelado and pode_tentar_novamente(trabalho, fatal):
+            self._reenfileirar(trabalho, fatal)
+            return
+        self._liberar_preparo(trabalho.identificador)
+        self.trabalho_finalizado.emit(
+            trabalho.identificador, trabalho.dispositivo, codigo, log
+        )
+        self._despachar()
+
+    def _etapa_aprovada(
+        self, trabalho: TrabalhoGravacao, codigo: int, ocorrencias: list[OcorrenciaErro]
+    ) -> bool:
+        if codigo != 0 or trabalho.identificador in self._cancelados:
+            return False
+        # Avisos ficam no log; só uma falha fatal reprova a etapa.
+        return not any(ocorrencia.fatal for ocorrencia in ocorrencias)
+
+    def _reenfileirar(self, trabalho: TrabalhoGravacao, ocorrencia: OcorrenciaErro) -> None:
+        preparar_nova_tentativa(trabalho, ocorrencia)
+        self._fila.adicionar(trabalho, prioritario=True)
+        self.trabalho_reenfileirado.emit(
+            trabalho.identificador,
+            trabalho.dispositivo,
+            ocorrencia.diagnostico.titulo,
+            trabalho.velocidade,
+        )
+        self._despachar()
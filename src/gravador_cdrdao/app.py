@@ -3,6 +3,7 @@ from __future__ import annotations
 from PySide6 import QtWidgets
 
 from gravador_cdrdao.janela_principal import JanelaPrincipal
+from gravador_cdrdao.supervisor_processos import supervisor_padrao
 from gravador_cdrdao.viewmodel_principal import ViewModelPrincipal
 
 
@@ -15,4 +16,8 @@ def iniciar() -> int:
     viewmodel = ViewModelPrincipal()
     janela = JanelaPrincipal(viewmodel)
     janela.show()
-    return app.exec()
+    viewmodel.iniciar_monitor_dispositivos()
+    codigo = app.exec()
+    viewmodel.parar_monitor_dispositivos()
+    supervisor_padrao().encerrar()
+    return codigo
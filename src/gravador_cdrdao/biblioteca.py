@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable
+
+from gravador_cdrdao.diretorios import diretorio_cache
+from gravador_cdrdao.hashes_imagem import calcular_hashes
+from gravador_cdrdao.parser_cue import (
+    carregar_cue,
+    detectar_mismatch_nomes,
+    iterar_faixas,
+    resolver_caminhos_relativos,
+)
+
+LOTE_GRAVACAO = 500
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS cues (
+    caminho TEXT PRIMARY KEY,
+    tamanho INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    valido INTEGER NOT NULL,
+    faixas INTEGER NOT NULL,
+    tamanho_total INTEGER NOT NULL,
+    ausentes TEXT NOT NULL,
+    mismatch INTEGER NOT NULL,
+    erro TEXT NOT NULL,
+    arquivos TEXT NOT NULL,
+    hashes TEXT NOT NULL
+)
+"""
+
+
+@dataclass
+class ResultadoCue:
+    caminho: str
+    tamanho: int
+    mtime_ns: int
+    valido: bool = False
+    faixas: int = 0
+    tamanho_total: int = 0
+    ausentes: list[str] = field(default_factory=list)
+    mismatch: bool = False
+    erro: str = ""
+    # (caminho, tamanho, mtime_ns) de cada BIN; tamanho -1 quando ausente.
+    arquivos: list[tuple[str, int, int]] = field(default_factory=list)
+    hashes: dict[str, dict[str, str]] = field(default_factory=dict)
+
+
+@dataclass
+class ResumoLote:
+    total: int = 0
+    processados: int = 0
+    reaproveitados: int = 0
+    removidos: int = 0
+    invalidos: list[ResultadoCue] = field(default_factory=list)
+
+
+def caminho_indice_padrao() -> Path:
+    return diretorio_cache() / "biblioteca.sqlite3"
+
+
+def encontrar_cues(raiz: Path) -> Iterable[str]:
+    for pasta, _, nomes in os.walk(raiz):
+        for nome in nomes:
+            if nome.lower().endswith(".cue"):
+                yield os.path.join(pasta, nome)
+
+
+def validar_arquivo(caminho: str, com_hashes: bool = False) -> ResultadoCue:
+    """Nunca levanta: o problema de um CUE fica em ``erro`` e a varredura segue."""
+    try:
+        info = os.stat(caminho)
+    except OSError as exc:
+        # Link quebrado ou CUE removido durante a varredura.
+        return ResultadoCue(caminho=caminho, tamanho=-1, mtime_ns=0, erro=str(exc))
+    resultado = ResultadoCue(caminho=caminho, tamanho=info.st_size, mtime_ns=info.st_mtime_ns)
+    try:
+        cue = carregar_cue(Path(caminho))
+        resultado.faixas = sum(1 for _ in iterar_faixas(cue))
+        resultado.mismatch = bool(detectar_mismatch_nomes(cue, Path(caminho).parent))
+        cue = resolver_caminhos_relativos(cue, Path(caminho).parent)
+    except (OSError, ValueError) as exc:
+        resultado.erro = str(exc)
+        return resultado
+    for arquivo in cue.arquivos:
+        try:
+            info_bin = os.stat(arquivo.caminho)
+        except OSError:
+            resultado.ausentes.append(arquivo.caminho)
+            resultado.arquivos.append((arquivo.caminho, -1, 0))
+            continue
+        resultado.arquivos.append((arquivo.caminho, info_bin.st_size, info_bin.st_mtime_ns))
+        resultado.tamanho_total += info_bin.st_size
+        if com_hashes:
+            try:
+                hashes = calcular_hashes(arquivo.caminho)
+            except (OSError, ValueError) as exc:
+                resultado.erro = f"Falha ao ler {arquivo.caminho}: {exc}"
+                continue
+            resultado.hashes[arquivo.caminho] = {
+                "crc32": hashes.crc32,
+                "md5": hashes.md5,
+                "sha1": hashes.sha1,
+            }
+    resultado.valido = not resultado.ausentes and not resultado.erro
+    return resultado
+
+
+def _validar_com_hashes(caminho: str) -> ResultadoCue:
+    return validar_arquivo(caminho, com_hashes=True)
+
+
+class IndiceBiblioteca:
+    """Resultados de validação por CUE, guardados em SQLite."""
+
+    def __init__(self, caminho: Path | str) -> None:
+        if str(caminho) != ":memory:":
+            Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+        self._conexao = sqlite3.connect(str(caminho))
+        self._conexao.execute(_ESQUEMA)
+
+    def fechar(self) -> None:
+        self._conexao.close()
+
+    def obter(self, caminho: str) -> ResultadoCue | None:
+        linha = self._conexao.execute(
+            "SELECT * FROM cues WHERE caminho = ?", (caminho,)
+        ).fetchone()
+        return None if linha is None else _resultado_da_linha(linha)
+
+    def todos(self) -> list[ResultadoCue]:
+        linhas = self._conexao.execute("SELECT * FROM cues ORDER BY caminho")
+        return [_resultado_da_linha(linha) for linha in linhas]
+
+    def assinaturas(self) -> dict[str, tuple[int, int, str, bool]]:
+        linhas = self._conexao.execute(
+            "SELECT caminho, tamanho, mtime_ns, arquivos, hashes != '{}' FROM cues"
+        )
+        return {linha[0]: (linha[1], linha[2], linha[3], bool(linha[4])) for linha in linhas}
+
+    def guardar(self, resultados: list[ResultadoCue]) -> None:
+        with self._conexao:
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO cues VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [_linha_do_resultado(resultado) for resultado in resultados],
+            )
+
+    def remover(self, caminhos: Iterable[str]) -> None:
+        with self._conexao:
+            self._conexao.executemany(
+                "DELETE FROM cues WHERE caminho = ?", [(caminho,) for caminho in caminhos]
+            )
+
+
+def _linha_do_resultado(resultado: ResultadoCue) -> tuple:
+    dados = asdict(resultado)
+    return (
+        dados["caminho"],
+        dados["tamanho"],
+        dados["mtime_ns"],
+        int(dados["valido"]),
+        dados["faixas"],
+        dados["tamanho_total"],
+        json.dumps(dados["ausentes"]),
+        int(dados["mismatch"]),
+        dados["erro"],
+        json.dumps(dados["arquivos"]),
+        json.dumps(dados["hashes"]),
+    )
+
+
+def _resultado_da_linha(linha: tuple) -> ResultadoCue:
+    return ResultadoCue(
+        caminho=linha[0],
+        tamanho=linha[1],
+        mtime_ns=linha[2],
+        valido=bool(linha[3]),
+        faixas=linha[4],
+        tamanho_total=linha[5],
+        ausentes=json.loads(linha[6]),
+        mismatch=bool(linha[7]),
+        erro=linha[8],
+        arquivos=[tuple(item) for item in json.loads(linha[9])],
+        hashes=json.loads(linha[10]),
+    )
+
+
+def _inalterado(
+    caminho: str, assinatura: tuple[int, int, str, bool], com_hashes: bool
+) -> bool:
+    tamanho, mtime_ns, arquivos, tem_hashes = assinatura
+    if com_hashes and not tem_hashes:
+        return False
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return False
+    if (info.st_size, info.st_mtime_ns) != (tamanho, mtime_ns):
+        return False
+    for caminho_bin, tamanho_bin, mtime_bin in json.loads(arquivos):
+        try:
+            info_bin = os.stat(caminho_bin)
+        except OSError:
+            if tamanho_bin != -1:
+                return False
+            continue
+        if (info_bin.st_size, info_bin.st_mtime_ns) != (tamanho_bin, mtime_bin):
+            return False
+    return True
+
+
+def validar_biblioteca(
+    raiz: Path,
+    indice: IndiceBiblioteca,
+    com_hashes: bool = False,
+    max_processos: int | None = None,
+    ao_progresso: Callable[[int, int], None] | None = None,
+) -> ResumoLote:
+    """Valida todos os CUEs sob ``raiz``; só reprocessa o que mudou."""
+    raiz = Path(raiz).resolve()
+    resumo = ResumoLote()
+    encontrados = list(encontrar_cues(raiz))
+    resumo.total = len(encontrados)
+    assinaturas = indice.assinaturas()
+    pendentes = [
+        caminho
+        for caminho in encontrados
+        if caminho not in assinaturas
+        or not _inalterado(caminho, assinaturas[caminho], com_hashes)
+    ]
+    resumo.reaproveitados = resumo.total - len(pendentes)
+
+    prefixo = os.path.join(str(raiz), "")
+    presentes = set(encontrados)
+    sumidos = [c for c in assinaturas if c.startswith(prefixo) and c not in presentes]
+    indice.remover(sumidos)
+    resumo.removidos = len(sumidos)
+
+    funcao = _validar_com_hashes if com_hashes else validar_arquivo
+    lote: list[ResultadoCue] = []
+    if len(pendentes) > 1 and max_processos != 1:
+        # Forkserver: os filhos não herdam a conexão SQLite aberta do índice.
+        contexto = multiprocessing.get_context("forkserver")
+        with ProcessPoolExecutor(max_processos, mp_context=contexto) as executor:
+            resultados = executor.map(funcao, pendentes, chunksize=16)
+            _coletar(resultados, indice, lote, resumo, ao_progresso)
+    else:
+        _coletar(map(funcao, pendentes), indice, lote, resumo, ao_progresso)
+    indice.guardar(lote)
+
+    resumo.invalidos = [r for r in indice.todos() if r.caminho in presentes and not r.valido]
+    return resumo
+
+
+def _coletar(
+    resultados: Iterable[ResultadoCue],
+    indice: IndiceBiblioteca,
+    lote: list[ResultadoCue],
+    resumo: ResumoLote,
+    ao_progresso: Callable[[int, int], None] | None,
+) -> None:
+    total = resumo.total - resumo.reaproveitados
+    for resultado in resultados:
+        lote.append(resultado)
+        resumo.processados += 1
+        if len(lote) >= LOTE_GRAVACAO:
+            indice.guardar(lote)
+            lote.clear()
+        if ao_progresso is not None:
+            ao_progresso(resumo.processados, total)
+
+
+def formatar_resumo(resumo: ResumoLote) -> str:
+    linhas = [
+        f"{resumo.total} CUEs: {resumo.processados} validados,"
+        f" {resumo.reaproveitados} sem alterações, {len(resumo.invalidos)} com problemas."
+    ]
+    for resultado in resumo.invalidos:
+        motivo = resultado.erro or "ausentes: " + ", ".join(resultado.ausentes)
+        linhas.append(f"{resultado.caminho}: {motivo}")
+    return "\n".join(linhas)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Valida uma biblioteca de imagens CUE/BIN.")
+    parser.add_argument("raiz")
+    parser.add_argument("--indice", default=str(caminho_indice_padrao()))
+    parser.add_argument("--hashes", action="store_true", help="calcula CRC32/MD5/SHA-1 dos BINs")
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    def ao_progresso(atual: int, total: int) -> None:
+        print(f"Validando: {atual} de {total}", end="\r", flush=True)
+
+    indice = IndiceBiblioteca(args.indice)
+    try:
+        resumo = validar_biblioteca(
+            Path(args.raiz),
+            indice,
+            args.hashes,
+            args.processos,
+            ao_progresso if sys.stdout.isatty() else None,
+        )
+    finally:
+        indice.fechar()
+    if resumo.processados and sys.stdout.isatty():
+        print()
+    print(formatar_resumo(resumo))
+    return 0 if not resumo.invalidos else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
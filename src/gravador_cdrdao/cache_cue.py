@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from gravador_cdrdao.layout_disco import LayoutDisco, calcular_layout
+from gravador_cdrdao.parser_cue import (
+    CueSheet,
+    carregar_cue,
+    resolver_caminhos_relativos,
+)
+
+# Orçamento medido pelo tamanho dos arquivos CUE de origem.
+LIMITE_BYTES_PADRAO = 16 * 1024 * 1024
+
+
+@dataclass
+class _EntradaCue:
+    tamanho: int
+    mtime_ns: int
+    cue: CueSheet
+    resolvido: CueSheet | None = None
+    layout: LayoutDisco | None = None
+    # (tamanho, mtime_ns) dos BINs quando o layout foi calculado.
+    assinatura_bins: tuple[tuple[int, int], ...] = ()
+
+
+class CacheCue:
+    """CueSheets já interpretados, indexados por (caminho, tamanho, mtime).
+
+    Os objetos retornados são compartilhados entre chamadas e não devem ser
+    alterados. Entradas menos usadas saem primeiro quando o orçamento estoura.
+    """
+
+    def __init__(self, limite_bytes: int = LIMITE_BYTES_PADRAO) -> None:
+        self.limite_bytes = limite_bytes
+        self._entradas: OrderedDict[str, _EntradaCue] = OrderedDict()
+        self._bytes = 0
+        self.acertos = 0
+        self.falhas = 0
+
+    def carregar(self, caminho: str | Path) -> CueSheet:
+        return self._entrada(Path(caminho)).cue
+
+    def carregar_resolvido(self, caminho: str | Path) -> CueSheet:
+        caminho = Path(caminho)
+        entrada = self._entrada(caminho)
+        if entrada.resolvido is None:
+            entrada.resolvido = resolver_caminhos_relativos(entrada.cue, caminho.parent)
+        return entrada.resolvido
+
+    def layout(self, caminho: str | Path) -> LayoutDisco:
+        """Layout das faixas; recalculado só quando CUE ou algum BIN muda."""
+        caminho = Path(caminho)
+        cue = self.carregar_resolvido(caminho)
+        entrada = self._entradas[str(caminho.resolve())]
+        assinatura = tuple(
+            (info.st_size, info.st_mtime_ns)
+            for info in (os.stat(arquivo.caminho) for arquivo in cue.arquivos)
+        )
+        if entrada.layout is None or entrada.assinatura_bins != assinatura:
+            entrada.layout = calcular_layout(cue)
+            entrada.assinatura_bins = assinatura
+        return entrada.layout
+
+    def escrever(self, caminho: str | Path, conteudo: str) -> None:
+        """Grava em arquivo temporário e renomeia; o CUE nunca fica pela metade."""
+        caminho = Path(caminho)
+        self.invalidar(caminho)
+        fd, temporario = tempfile.mkstemp(dir=caminho.parent, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as saida:
+                saida.write(conteudo)
+            if caminho.exists():
+                shutil.copymode(caminho, temporario)
+            os.replace(temporario, caminho)
+        except BaseException:
+            Path(temporario).unlink(missing_ok=True)
+            raise
+
+    def invalidar(self, caminho: str | Path) -> None:
+        entrada = self._entradas.pop(str(Path(caminho).resolve()), None)
+        if entrada is not None:
+            self._bytes -= entrada.tamanho
+
+    def limpar(self) -> None:
+        self._entradas.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    @property
+    def bytes_usados(self) -> int:
+        return self._bytes
+
+    def _entrada(self, caminho: Path) -> _EntradaCue:
+        chave = str(caminho.resolve())
+        info = os.stat(chave)
+        entrada = self._entradas.get(chave)
+        if (
+            entrada is not None
+            and entrada.tamanho == info.st_size
+            and entrada.mtime_ns == info.st_mtime_ns
+        ):
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return entrada
+        self.falhas += 1
+        self.invalidar(chave)
+        entrada = _EntradaCue(
+            tamanho=info.st_size,
+            mtime_ns=info.st_mtime_ns,
+            cue=carregar_cue(Path(chave)),
+        )
+        self._entradas[chave] = entrada
+        self._bytes += entrada.tamanho
+        while self._bytes > self.limite_bytes and len(self._entradas) > 1:
+            _, removida = self._entradas.popitem(last=False)
+            self._bytes -= removida.tamanho
+        return entrada
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from gravador_cdrdao.diretorios import diretorio_cache
+from gravador_cdrdao.hashes_imagem import CacheHashes, HashesArquivo, calcular_hashes
+from gravador_cdrdao.imagem_comprimida import (
+    comprimida,
+    nome_descomprimido,
+    tamanho_descomprimido,
+)
+from gravador_cdrdao.parser_cue import (
+    carregar_cue,
+    corrigir_conteudo_cue,
+    reescrever_nomes,
+    resolver_caminhos_relativos,
+)
+
+VARIAVEL_DIRETORIO = "GRAVADOR_CDRDAO_CACHE_LOCAL"
+VARIAVEL_LIMITE = "GRAVADOR_CDRDAO_CACHE_LOCAL_GB"
+LIMITE_BYTES_PADRAO = 8 * 1024**3
+MAX_COPIAS_SIMULTANEAS = 2
+# ioctl FICLONE: cópia por reflink (btrfs, xfs) quando origem e cache dividem o sistema.
+_FICLONE = 0x40049409
+
+
+def diretorio_cache_local() -> Path | None:
+    """Diretório rápido (tmpfs ou SSD) configurado pelo usuário, se houver."""
+    diretorio = os.environ.get(VARIAVEL_DIRETORIO)
+    return Path(diretorio) if diretorio else None
+
+
+def diretorio_copias() -> Path:
+    """Cache para lotes multi-cópia: o local configurado ou um no cache do usuário.
+
+    Mesmo em disco comum a cópia recém-escrita fica no page cache, e os drives
+    do lote leem dela em vez de cada um ler a origem.
+    """
+    return diretorio_cache_local() or diretorio_cache() / "imagens"
+
+
+def limite_cache_local() -> int:
+    try:
+        return int(float(os.environ[VARIAVEL_LIMITE]) * 1024**3)
+    except (KeyError, ValueError):
+        return LIMITE_BYTES_PADRAO
+
+
+def cue_comprimido(caminho_cue: str | Path) -> bool:
+    """O CUE usa algum BIN comprimido? Esses só gravam a partir do cache."""
+    caminho_cue = Path(caminho_cue)
+    try:
+        cue = resolver_caminhos_relativos(carregar_cue(caminho_cue), caminho_cue.parent)
+    except (OSError, ValueError):
+        return False
+    return any(comprimida(arquivo.caminho) for arquivo in cue.arquivos)
+
+
+def _sufixo(origem: str) -> str:
+    return Path(nome_descomprimido(origem)).suffix.lower()
+
+
+def _reflink(origem: str, destino: int) -> bool:
+    try:
+        with open(origem, "rb") as entrada:
+            fcntl.ioctl(destino, _FICLONE, entrada.fileno())
+    except OSError:
+        return False
+    return True
+
+
+class CacheImagens:
+    """Cópias locais dos BINs, endereçadas pelo SHA-1 do conteúdo.
+
+    Cada trabalho recebe um CUE reescrito apontando para as cópias; imagens
+    iguais são copiadas uma única vez. BINs comprimidos são decodificados
+    durante a cópia. Arquivos presos a trabalhos ativos não
+    saem do cache; os demais saem do menos usado para o mais usado quando o
+    orçamento estoura.
+    """
+
+    def __init__(
+        self,
+        diretorio: Path,
+        limite_bytes: int = LIMITE_BYTES_PADRAO,
+        cache_hashes: CacheHashes | None = None,
+        max_copias: int = MAX_COPIAS_SIMULTANEAS,
+    ) -> None:
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.limite_bytes = limite_bytes
+        self._hashes = cache_hashes or CacheHashes()
+        self._trava = threading.Lock()
+        # Trava por BIN de origem e quantas cópias a usam; sai do dicionário
+        # quando a última termina.
+        self._travas_origem: dict[str, threading.Lock] = {}
+        self._usos_origem: dict[str, int] = {}
+        self._arquivos: OrderedDict[str, int] = OrderedDict()
+        self._presos: dict[str, set[str]] = {}
+        self._bytes = 0
+        # Espaço prometido a cópias em andamento.
+        self._reservado = 0
+        self._executor: ThreadPoolExecutor | None = None
+        self._max_copias = max_copias
+        self.acertos = 0
+        self.copias = 0
+        self._carregar_existentes()
+
+    @property
+    def bytes_usados(self) -> int:
+        return self._bytes
+
+    def __contains__(self, nome: str) -> bool:
+        return nome in self._arquivos
+
+    def preparar_cue(self, caminho_cue: str | Path, identificador: str) -> str:
+        """Copia os BINs do CUE e devolve o caminho do CUE local."""
+        caminho_cue = Path(caminho_cue)
+        original = carregar_cue(caminho_cue)
+        resolvido = resolver_caminhos_relativos(original, caminho_cue.parent)
+        mapeamento: dict[str, str] = {}
+        try:
+            for arquivo, origem in zip(
+                original.arquivos, resolvido.arquivos, strict=True
+            ):
+                local = self._preparar_arquivo(origem.caminho, identificador)
+                mapeamento[arquivo.caminho] = str(local)
+            conteudo = corrigir_conteudo_cue(
+                caminho_cue.read_text(encoding="utf-8", errors="replace")
+            )
+            novo, edicoes = reescrever_nomes(conteudo, mapeamento)
+            # Um nome que ficou de fora apontaria para um BIN inexistente no cache.
+            if faltando := set(mapeamento) - {edicao.antigo for edicao in edicoes}:
+                raise ValueError(
+                    "Linhas FILE não reescritas no CUE local: "
+                    + ", ".join(sorted(faltando))
+                )
+            dados = novo.encode("utf-8")
+            nome = hashlib.sha1(dados).hexdigest() + ".cue"
+            with self._trava:
+                self._prender(nome, identificador)
+                if nome not in self._arquivos:
+                    self._gravar(nome, dados)
+            return str(self.diretorio / nome)
+        except BaseException:
+            self.liberar(identificador)
+            raise
+
+    def agendar(self, caminho_cue: str | Path, identificador: str) -> Future[str]:
+        """``preparar_cue`` numa thread de cópia; no máximo ``max_copias`` juntas."""
+        with self._trava:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self._max_copias, thread_name_prefix="cache-imagens"
+                )
+            executor = self._executor
+        return executor.submit(self.preparar_cue, caminho_cue, identificador)
+
+    def liberar(self, identificador: str) -> None:
+        with self._trava:
+            self._presos.pop(identificador, None)
+
+    def encerrar(self) -> None:
+        with self._trava:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _carregar_existentes(self) -> None:
+        entradas = []
+        for entrada in os.scandir(self.diretorio):
+            if not entrada.is_file():
+                continue
+            if entrada.name.startswith("."):
+                # Cópia interrompida de uma execução anterior.
+                Path(entrada.path).unlink(missing_ok=True)
+                continue
+            info = entrada.stat()
+            entradas.append((info.st_mtime_ns, entrada.name, info.st_size))
+        for _, nome, tamanho in sorted(entradas):
+            self._arquivos[nome] = tamanho
+            self._bytes += tamanho
+
+    def _preparar_arquivo(self, origem: str, identificador: str) -> Path:
+        chave = str(Path(origem).resolve())
+        with self._trava:
+            trava_origem = self._travas_origem.setdefault(chave, threading.Lock())
+            self._usos_origem[chave] = self._usos_origem.get(chave, 0) + 1
+        try:
+            # Duas cópias do mesmo BIN esperam uma pela outra em vez de ler o NAS
+            # duas vezes.
+            with trava_origem:
+                return self._preparar_arquivo_travado(origem, identificador)
+        finally:
+            with self._trava:
+                self._usos_origem[chave] -= 1
+                if not self._usos_origem[chave]:
+                    del self._usos_origem[chave]
+                    del self._travas_origem[chave]
+
+    def _preparar_arquivo_travado(self, origem: str, identificador: str) -> Path:
+        with self._trava:
+            hashes = self._hashes.obter(origem)
+        if hashes is not None:
+            nome = hashes.sha1 + _sufixo(origem)
+            with self._trava:
+                if nome in self._arquivos:
+                    self._prender(nome, identificador)
+                    self.acertos += 1
+                    return self.diretorio / nome
+        tamanho = tamanho_descomprimido(origem)
+        with self._trava:
+            self._reservar(tamanho)
+        hashes = self._copiar(origem, tamanho, hashes, identificador)
+        with self._trava:
+            self._hashes.registrar(origem, hashes)
+            self._hashes.salvar()
+        return self.diretorio / (hashes.sha1 + _sufixo(origem))
+
+    def _copiar(
+        self,
+        origem: str,
+        reservado: int,
+        hashes: HashesArquivo | None,
+        identificador: str,
+    ) -> HashesArquivo:
+        temporario: str | None = None
+        try:
+            fd, temporario = tempfile.mkstemp(dir=self.diretorio, prefix=".", suffix=".tmp")
+            with os.fdopen(fd, "wb") as saida:
+                if not comprimida(origem) and _reflink(origem, saida.fileno()):
+                    hashes = hashes or calcular_hashes(temporario)
+                else:
+                    hashes = calcular_hashes(origem, copiar_para=saida)
+            nome = hashes.sha1 + _sufixo(origem)
+            with self._trava:
+                self.copias += 1
+                if nome in self._arquivos:
+                    # Mesmo conteúdo já veio de outro caminho.
+                    Path(temporario).unlink()
+                else:
+                    os.replace(temporario, self.diretorio / nome)
+                    self._arquivos[nome] = hashes.tamanho
+                    self._bytes += hashes.tamanho
+                self._prender(nome, identificador)
+            return hashes
+        except BaseException:
+            if temporario is not None:
+                Path(temporario).unlink(missing_ok=True)
+            raise
+        finally:
+            with self._trava:
+                self._reservado -= reservado
+
+    def _gravar(self, nome: str, dados: bytes) -> None:
+        fd, temporario = tempfile.mkstemp(dir=self.diretorio, prefix=".", suffix=".tmp")
+        with os.fdopen(fd, "wb") as saida:
+            saida.write(dados)
+        os.replace(temporario, self.diretorio / nome)
+        self._arquivos[nome] = len(dados)
+        self._bytes += len(dados)
+
+    def _prender(self, nome: str, identificador: str) -> None:
+        self._presos.setdefault(identificador, set()).add(nome)
+        if nome in self._arquivos:
+            self._arquivos.move_to_end(nome)
+            os.utime(self.diretorio / nome)
+
+    def _reservar(self, tamanho: int) -> None:
+        presos = set().union(*self._presos.values())
+        necessario = self._bytes + self._reservado + tamanho
+        for nome in list(self._arquivos):
+            if necessario <= self.limite_bytes:
+                break
+            if nome in presos:
+                continue
+            liberado = self._arquivos.pop(nome)
+            self._bytes -= liberado
+            necessario -= liberado
+            (self.diretorio / nome).unlink(missing_ok=True)
+        if necessario > self.limite_bytes:
+            raise OSError(
+                f"Cache local sem espaço: {tamanho} bytes pedidos,"
+                f" {self.limite_bytes - necessario + tamanho} livres."
+            )
+        self._reservado += tamanho
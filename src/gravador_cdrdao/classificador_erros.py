@@ -4,6 +4,10 @@ import dataclasses
 import re
 from typing import Pattern
 
+SEVERIDADE_ERRO = "erro"
+# Falhas fatais não se recuperam: o processo é cancelado sem esperar a saída.
+SEVERIDADE_FATAL = "fatal"
+
 
 @dataclasses.dataclass
 class DiagnosticoErro:
@@ -19,6 +23,22 @@ class RegraErro:
     nome: str
     padrao: Pattern[str]
     diagnostico: DiagnosticoErro
+    severidade: str = SEVERIDADE_ERRO
+    reenfileirar: bool = False
+
+
+@dataclasses.dataclass
+class OcorrenciaErro:
+    regra: str
+    linha: int
+    texto: str
+    severidade: str
+    reenfileirar: bool
+    diagnostico: DiagnosticoErro
+
+    @property
+    def fatal(self) -> bool:
+        return self.severidade == SEVERIDADE_FATAL
 
 
 class ClassificadorErros:
@@ -69,6 +89,8 @@ class ClassificadorErros:
                     como_resolver="Reduza a velocidade e tente novamente.",
                     acoes=["Ajustar velocidade"],
                 ),
+                severidade=SEVERIDADE_FATAL,
+                reenfileirar=True,
             ),
             RegraErro(
                 nome="usb_reset",
@@ -80,11 +102,76 @@ class ClassificadorErros:
                     como_resolver="Desative autosuspend temporariamente.",
                     acoes=["Desativar autosuspend"],
                 ),
+                severidade=SEVERIDADE_FATAL,
+                reenfileirar=True,
             ),
         ]
+        self._prioridades = {regra.nome: posicao for posicao, regra in enumerate(self._regras)}
+        self._por_nome = {regra.nome: regra for regra in self._regras}
+        # Uma única alternação, um grupo nomeado por regra: cada linha é varrida
+        # uma vez. Trechos que se sobrepõem valem para a regra que começa antes
+        # e, no mesmo ponto, para a primeira da lista (a de maior prioridade).
+        self._padrao = re.compile(
+            "|".join(
+                f"(?P<{regra.nome}>{regra.padrao.pattern})" for regra in self._regras
+            ),
+            re.I,
+        )
+
+    def novo_analisador(self) -> AnalisadorErros:
+        return AnalisadorErros(self)
+
+    def analisar_linha(self, linha: str, numero: int) -> list[OcorrenciaErro]:
+        ocorrencias: list[OcorrenciaErro] = []
+        vistas: set[str] = set()
+        for match in self._padrao.finditer(linha):
+            nome = match.lastgroup
+            if nome is None or nome in vistas:
+                continue
+            vistas.add(nome)
+            regra = self._por_nome[nome]
+            ocorrencias.append(
+                OcorrenciaErro(
+                    regra=regra.nome,
+                    linha=numero,
+                    texto=linha.strip(),
+                    severidade=regra.severidade,
+                    reenfileirar=regra.reenfileirar,
+                    diagnostico=regra.diagnostico,
+                )
+            )
+        return ocorrencias
+
+    def analisar(self, log: str) -> list[OcorrenciaErro]:
+        analisador = self.novo_analisador()
+        for linha in log.splitlines():
+            analisador.alimentar(linha)
+        return analisador.ocorrencias
 
     def classificar(self, log: str) -> DiagnosticoErro | None:
-        for regra in self._regras:
-            if regra.padrao.search(log):
-                return regra.diagnostico
-        return None
+        return self.mais_relevante(self.analisar(log))
+
+    def mais_relevante(self, ocorrencias: list[OcorrenciaErro]) -> DiagnosticoErro | None:
+        if not ocorrencias:
+            return None
+        escolhida = min(ocorrencias, key=lambda ocorrencia: self._prioridades[ocorrencia.regra])
+        return escolhida.diagnostico
+
+
+class AnalisadorErros:
+    """Classifica a saída linha a linha, conforme ela chega."""
+
+    def __init__(self, classificador: ClassificadorErros) -> None:
+        self._classificador = classificador
+        self._linhas = 0
+        self.ocorrencias: list[OcorrenciaErro] = []
+
+    def alimentar(self, linha: str) -> list[OcorrenciaErro]:
+        self._linhas += 1
+        novas = self._classificador.analisar_linha(linha, self._linhas)
+        self.ocorrencias.extend(novas)
+        return novas
+
+    @property
+    def fatal(self) -> OcorrenciaErro | None:
+        return next((ocorrencia for ocorrencia in self.ocorrencias if ocorrencia.fatal), None)
@@ -0,0 +1,560 @@
+"""Linha de comando sem interface gráfica.
+
+Nada neste caminho importa PySide6; os módulos mais pesados (asyncio, sqlite,
+hashes) só são carregados pelos subcomandos que precisam deles.
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+from gravador_cdrdao.cache_cue import CacheCue
+from gravador_cdrdao.classificador_erros import OcorrenciaErro
+from gravador_cdrdao.fila_trabalhos import (
+    MODO_APAGAR,
+    MODO_GRAVAR,
+    MODO_SIMULAR,
+    MODO_VERIFICAR,
+    TrabalhoGravacao,
+    criar_copias,
+    criar_pipeline,
+    grava_midia,
+    le_imagem,
+)
+from gravador_cdrdao.layout_disco import checar_capacidade
+from gravador_cdrdao.parser_cue import (
+    CueSheet,
+    corrigir_conteudo_cue,
+    detectar_mismatch_nomes,
+    formatar_sumario,
+    reescrever_nomes,
+    sugerir_mapeamento_automatico,
+    validar_arquivos_existem,
+)
+from gravador_cdrdao.progresso import ProgressoCdrdao
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from gravador_cdrdao.cache_imagens import CacheImagens
+    from gravador_cdrdao.execucao_sincrona import ResultadoTrabalho
+    from gravador_cdrdao.info_drive import InfoDispositivo
+    from gravador_cdrdao.pre_leitura import PreLeitor
+
+VELOCIDADE_PADRAO = 8
+_ESPERA_CANCELAMENTO = 0.2
+
+
+def _erro(mensagem: str) -> None:
+    print(mensagem, file=sys.stderr)
+
+
+def _validar(args: argparse.Namespace) -> int:
+    cache = CacheCue()
+    indice = None
+    if args.dat:
+        from gravador_cdrdao.hashes_imagem import cache_hashes_padrao
+        from gravador_cdrdao.indice_dat import IndiceDat, caminho_indice_padrao
+
+        try:
+            indice = IndiceDat(caminho_indice_padrao())
+        except (OSError, ValueError) as exc:
+            _erro(f"Índice DAT indisponível ({exc}); importe com 'dat import'.")
+            return 1
+        hashes = cache_hashes_padrao()
+    falhas = 0
+    for caminho in args.cue:
+        try:
+            cue = cache.carregar_resolvido(caminho)
+            ausentes = validar_arquivos_existem(cue)
+            mismatch = detectar_mismatch_nomes(cache.carregar(caminho), Path(caminho).parent)
+        except (OSError, ValueError) as exc:
+            _erro(f"{caminho}: inválido ({exc})")
+            falhas += 1
+            continue
+        if ausentes:
+            _erro(f"{caminho}: arquivos ausentes: " + ", ".join(ausentes))
+            for nome, sugestoes in mismatch.items():
+                if sugestoes:
+                    _erro(f"  {nome} -> talvez {', '.join(sugestoes)}")
+            falhas += 1
+            continue
+        layout = cache.layout(caminho)
+        print(f"{caminho}: OK, {layout.setores_total} setores ({layout.duracao})")
+        if args.detalhes:
+            print(formatar_sumario(cue))
+        if indice is not None:
+            titulo = indice.corresponder(cue, hashes).titulo
+            print(f"  Dump verificado: {titulo}" if titulo else "  Dump não encontrado no DAT.")
+        if args.setores and not _varrer_setores(cue, args.ecc):
+            falhas += 1
+    if indice is not None:
+        indice.fechar()
+        hashes.salvar()
+    return 1 if falhas else 0
+
+
+def _importar_dat(args: argparse.Namespace) -> int:
+    from xml.etree.ElementTree import ParseError
+
+    from gravador_cdrdao.indice_dat import caminho_indice_padrao, construir_indice
+
+    try:
+        quantidade = construir_indice(
+            [Path(caminho) for caminho in args.dat], caminho_indice_padrao()
+        )
+    except (OSError, ValueError, ParseError) as exc:
+        _erro(f"Falha ao importar DAT: {exc}")
+        return 1
+    print(f"Índice DAT atualizado: {quantidade} ROMs.")
+    return 0
+
+
+def _varrer_setores(cue: CueSheet, ecc: bool) -> bool:
+    from gravador_cdrdao import setores_cd
+
+    if not setores_cd.VETORIZADO:
+        _erro("  Verificação de setores indisponível: instale NumPy.")
+        return True
+    from gravador_cdrdao.varredura_setores import varrer_cue
+
+    relatorio = varrer_cue(cue, ecc=ecc)
+    for linha in relatorio.resumo().splitlines():
+        print(f"  {linha}")
+    return relatorio.ok
+
+
+def _corrigir(args: argparse.Namespace) -> int:
+    caminho = Path(args.cue)
+    mapeamento: dict[str, str] = {}
+    for item in args.mapa:
+        antigo, separador, novo = item.partition("=")
+        if not separador or not antigo or not novo:
+            _erro(f"Mapeamento inválido: {item} (use ANTIGO=NOVO)")
+            return 2
+        mapeamento[antigo] = novo
+    cache = CacheCue()
+    try:
+        conteudo = corrigir_conteudo_cue(
+            caminho.read_text(encoding="utf-8", errors="replace")
+        )
+        if args.auto:
+            automatico = sugerir_mapeamento_automatico(cache.carregar(caminho), caminho.parent)
+            mapeamento = {**automatico, **mapeamento}
+        novo, edicoes = reescrever_nomes(conteudo, mapeamento)
+    except (OSError, ValueError) as exc:
+        _erro(f"Falha ao corrigir: {exc}")
+        return 1
+    for edicao in edicoes:
+        print(f"Linha {edicao.linha}: {edicao.antigo} -> {edicao.novo}")
+    if args.simular:
+        return 0
+    try:
+        cache.escrever(caminho, novo)
+    except OSError as exc:
+        _erro(f"Falha ao gravar {caminho}: {exc}")
+        return 1
+    print(f"{caminho}: CUE corrigido.")
+    return 0
+
+
+def _formatar_progresso(trabalho: TrabalhoGravacao, progresso: ProgressoCdrdao) -> str:
+    mensagem = progresso.mensagem
+    if progresso.faixa:
+        mensagem = f"Escrevendo track {progresso.faixa} - {mensagem}"
+    if progresso.velocidade_x is not None:
+        mensagem = f"{mensagem} - {progresso.velocidade_x:.1f}x"
+    if progresso.eta_segundos is not None:
+        minutos, segundos = divmod(int(progresso.eta_segundos), 60)
+        mensagem = f"{mensagem}, restam {minutos:02d}:{segundos:02d}"
+    return f"[{trabalho.dispositivo}] {mensagem}"
+
+
+def _preparar(
+    trabalho: TrabalhoGravacao, cache: CacheCue, infos: list[InfoDispositivo]
+) -> str:
+    if not trabalho.cue:
+        return ""
+    try:
+        ausentes = validar_arquivos_existem(cache.carregar_resolvido(trabalho.cue))
+    except (OSError, ValueError) as exc:
+        return f"CUE inválido ({exc})"
+    if ausentes:
+        return "arquivos ausentes: " + ", ".join(ausentes)
+    if not grava_midia(trabalho):
+        return ""
+    try:
+        layout = cache.layout(trabalho.cue)
+    except (OSError, ValueError) as exc:
+        return f"layout do CUE inválido ({exc})"
+    # Só a mídia do próprio drive: a CLI não troca o drive pedido.
+    proprias = [info for info in infos if info.caminho == trabalho.dispositivo]
+    resultado = checar_capacidade(layout, trabalho.dispositivo, proprias, set())
+    if resultado.aviso:
+        _erro(f"[{trabalho.dispositivo}] Aviso: {resultado.aviso}.")
+    return resultado.motivo
+
+
+def _criar_cache_imagens(proprio: bool) -> CacheImagens | None:
+    """Cache configurado ou, com ``proprio``, um no cache do usuário."""
+    from gravador_cdrdao.cache_imagens import (
+        CacheImagens,
+        diretorio_cache_local,
+        diretorio_copias,
+        limite_cache_local,
+    )
+    from gravador_cdrdao.hashes_imagem import cache_hashes_padrao
+
+    diretorio = diretorio_copias() if proprio else diretorio_cache_local()
+    if diretorio is None:
+        return None
+    try:
+        return CacheImagens(diretorio, limite_cache_local(), cache_hashes_padrao())
+    except OSError as exc:
+        _erro(f"Cache local indisponível ({exc}); lendo as imagens da origem.")
+        return None
+
+
+def _agendar_pre_leitura(
+    pre_leitor: PreLeitor,
+    por_drive: dict[str, list[TrabalhoGravacao]],
+    usa_cache: Callable[[TrabalhoGravacao], bool],
+) -> None:
+    """Agenda a pré-leitura de cada trabalho que espera a vez no seu drive.
+
+    O início previsto soma as durações estimadas dos anteriores no mesmo drive.
+    """
+    from gravador_cdrdao.pre_leitura import duracao_estimada, tamanho_imagem
+
+    for fila in por_drive.values():
+        inicio = 0.0
+        for posicao, trabalho in enumerate(fila):
+            if not le_imagem(trabalho):
+                continue
+            tamanho = tamanho_imagem(trabalho.cue)
+            # O primeiro começa agora; o cdrdao lê a imagem antes da pré-leitura.
+            if posicao and not usa_cache(trabalho):
+                pre_leitor.agendar(trabalho.identificador, trabalho.cue, inicio)
+            inicio += duracao_estimada(trabalho, tamanho)
+
+
+def executar_trabalhos(trabalhos: list[TrabalhoGravacao], paralelo: int = 0) -> int:
+    """Roda os trabalhos com uma thread por drive; Ctrl+C cancela todos.
+
+    Com cache local configurado, a imagem do próximo trabalho de cada drive
+    é copiada enquanto o atual grava. Lotes multi-cópia sempre leem a origem
+    uma vez só, de uma cópia no cache, mesmo sem cache configurado; imagens
+    comprimidas também, decodificadas na cópia. As demais imagens da fila são
+    aquecidas no page cache antes da vez delas.
+    """
+    from gravador_cdrdao.cache_imagens import cue_comprimido, diretorio_cache_local
+    from gravador_cdrdao.execucao_sincrona import ResultadoTrabalho, executar_trabalho
+    from gravador_cdrdao.pre_leitura import PreLeitor, formatar_estatistica
+    from gravador_cdrdao.supervisor_processos import supervisor_padrao
+
+    preparar_todos = diretorio_cache_local() is not None
+    comprimidos = {
+        trabalho.identificador
+        for trabalho in trabalhos
+        if le_imagem(trabalho) and cue_comprimido(trabalho.cue)
+    }
+    proprio = bool(comprimidos) or any(trabalho.grupo for trabalho in trabalhos)
+    cache_imagens = _criar_cache_imagens(proprio) if preparar_todos or proprio else None
+    cache = CacheCue()
+    gravadores = sorted({t.dispositivo for t in trabalhos if grava_midia(t)})
+    infos = _consultar_midias(gravadores) if gravadores else []
+    por_drive: dict[str, list[TrabalhoGravacao]] = {}
+    falhas = 0
+    for trabalho in trabalhos:
+        motivo = _preparar(trabalho, cache, infos)
+        if not motivo and trabalho.identificador in comprimidos and cache_imagens is None:
+            motivo = "imagem comprimida sem cache local para decodificar"
+        if motivo:
+            _erro(f"[{trabalho.dispositivo}] Trabalho ignorado: {motivo}")
+            falhas += 1
+            continue
+        por_drive.setdefault(trabalho.dispositivo, []).append(trabalho)
+
+    cancelar = threading.Event()
+    vagas = threading.BoundedSemaphore(paralelo) if paralelo > 0 else None
+    trava = threading.Lock()
+    resultados: list[ResultadoTrabalho] = []
+
+    def ao_progresso(trabalho: TrabalhoGravacao, progresso: ProgressoCdrdao) -> None:
+        print(_formatar_progresso(trabalho, progresso), flush=True)
+
+    def ao_erro(trabalho: TrabalhoGravacao, ocorrencia: OcorrenciaErro) -> None:
+        _erro(f"[{trabalho.dispositivo}] {ocorrencia.diagnostico.titulo}: {ocorrencia.texto}")
+
+    def usa_cache(trabalho: TrabalhoGravacao) -> bool:
+        if cache_imagens is None or not le_imagem(trabalho):
+            return False
+        return (
+            preparar_todos or bool(trabalho.grupo) or trabalho.identificador in comprimidos
+        )
+
+    def preparar(trabalho: TrabalhoGravacao) -> Future[str] | None:
+        if not usa_cache(trabalho):
+            return None
+        return cache_imagens.agendar(trabalho.cue, trabalho.identificador)
+
+    pre_leitor = PreLeitor()
+    _agendar_pre_leitura(pre_leitor, por_drive, usa_cache)
+
+    def cue_local(trabalho: TrabalhoGravacao, preparo: Future[str] | None) -> TrabalhoGravacao:
+        if preparo is None:
+            return trabalho
+        try:
+            return dataclasses.replace(trabalho, cue=preparo.result())
+        except Exception as exc:
+            if trabalho.identificador in comprimidos:
+                # Da origem o cdrdao gravaria os bytes comprimidos como dados.
+                raise ValueError(f"Imagem comprimida indisponível ({exc}).") from exc
+            _erro(f"[{trabalho.dispositivo}] Cache local indisponível ({exc}); lendo a origem.")
+            return trabalho
+
+    def rodar_drive(fila: list[TrabalhoGravacao]) -> None:
+        proximo = preparar(fila[0])
+        for posicao, trabalho in enumerate(fila):
+            if cancelar.is_set():
+                return
+            preparo = proximo
+            proximo = preparar(fila[posicao + 1]) if posicao + 1 < len(fila) else None
+            if vagas is not None:
+                vagas.acquire()
+            if estatistica := pre_leitor.iniciar(trabalho.identificador):
+                print(f"[{trabalho.dispositivo}] {formatar_estatistica(estatistica)}", flush=True)
+            try:
+                try:
+                    local = cue_local(trabalho, preparo)
+                except ValueError as exc:
+                    resultado = ResultadoTrabalho(trabalho, codigo=-1, log=str(exc))
+                else:
+                    resultado = executar_trabalho(
+                        local,
+                        ao_progresso=ao_progresso,
+                        ao_erro=ao_erro,
+                        cancelar=cancelar,
+                    )
+            finally:
+                if vagas is not None:
+                    vagas.release()
+                pre_leitor.liberar(trabalho.identificador)
+                if cache_imagens is not None:
+                    cache_imagens.liberar(trabalho.identificador)
+            with trava:
+                resultados.append(resultado)
+            estado = "concluído" if resultado.sucesso else f"falhou ({resultado.codigo})"
+            print(f"[{trabalho.dispositivo}] {trabalho.identificador} {estado}.", flush=True)
+            if not resultado.sucesso and resultado.log:
+                _erro(resultado.log)
+
+    threads = [
+        threading.Thread(target=rodar_drive, args=(fila,), name=f"cli-{dispositivo}")
+        for dispositivo, fila in por_drive.items()
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(_ESPERA_CANCELAMENTO)
+    except KeyboardInterrupt:
+        _erro("Cancelando...")
+        cancelar.set()
+        for thread in threads:
+            thread.join()
+        falhas += 1
+    finally:
+        supervisor_padrao().encerrar()
+        pre_leitor.parar()
+        if cache_imagens is not None:
+            cache_imagens.encerrar()
+    falhas += sum(1 for resultado in resultados if not resultado.sucesso)
+    if len(trabalhos) > 1:
+        print(f"{len(trabalhos) - falhas} de {len(trabalhos)} trabalhos concluídos.")
+    return 1 if falhas else 0
+
+
+def _trabalhos_imagem(
+    dispositivos: list[str], etapas: list[str], cue: str, velocidade: int
+) -> list[TrabalhoGravacao]:
+    if len(dispositivos) > 1:
+        return criar_copias(dispositivos, etapas, cue, velocidade)
+    return [criar_pipeline(dispositivos[0], etapas, cue, velocidade)]
+
+
+def _gravar(args: argparse.Namespace) -> int:
+    etapas = [MODO_SIMULAR, MODO_GRAVAR] if args.simular else [MODO_GRAVAR]
+    if args.verificar:
+        etapas.append(MODO_VERIFICAR)
+    return executar_trabalhos(_trabalhos_imagem(args.device, etapas, args.cue, args.speed))
+
+
+def _simular(args: argparse.Namespace) -> int:
+    return executar_trabalhos(
+        _trabalhos_imagem(args.device, [MODO_SIMULAR], args.cue, args.speed)
+    )
+
+
+def _apagar(args: argparse.Namespace) -> int:
+    return executar_trabalhos([TrabalhoGravacao(dispositivo=args.device, modo=MODO_APAGAR)])
+
+
+def _consultar_midias(caminhos: list[str]) -> list[InfoDispositivo]:
+    """Drive e mídia de cada caminho, consultados em paralelo; bloqueia até o fim."""
+    from gravador_cdrdao.info_drive import ConsultorInfoDrive
+
+    restantes = threading.Semaphore(0)
+    infos: list[InfoDispositivo] = []
+
+    def ao_concluir(info: InfoDispositivo) -> None:
+        infos.append(info)
+        restantes.release()
+
+    ConsultorInfoDrive().consultar_todos(caminhos, ao_concluir)
+    for _ in caminhos:
+        restantes.acquire()
+    return sorted(infos, key=lambda info: info.caminho)
+
+
+def _dispositivos(args: argparse.Namespace) -> int:
+    from gravador_cdrdao.dispositivos import listar_dispositivos
+
+    dispositivos = listar_dispositivos()
+    if not dispositivos:
+        print("Nenhum drive óptico encontrado.")
+        return 1
+    for dispositivo in dispositivos:
+        midia = "com mídia" if dispositivo.setores_midia else "sem mídia"
+        print(
+            f"{dispositivo.caminho}\t{dispositivo.fabricante} {dispositivo.modelo}"
+            f"\t{dispositivo.sg or '-'}\t{midia}"
+        )
+    if args.info:
+        from gravador_cdrdao.info_drive import formatar_info
+        from gravador_cdrdao.supervisor_processos import supervisor_padrao
+
+        infos = _consultar_midias([dispositivo.caminho for dispositivo in dispositivos])
+        supervisor_padrao().encerrar()
+        for info in infos:
+            print(f"\n[{info.caminho}]")
+            print(formatar_info(info).split("\n\n", 1)[0])
+    return 0
+
+
+def ler_fila(caminho: Path) -> list[TrabalhoGravacao]:
+    """Um trabalho JSON por linha: dispositivo, etapas, cue e velocidade.
+
+    Com ``dispositivos`` (lista) no lugar de ``dispositivo`` a linha vira um
+    lote multi-cópia.
+    """
+    trabalhos: list[TrabalhoGravacao] = []
+    with open(caminho, encoding="utf-8") as arquivo:
+        for numero, linha in enumerate(arquivo, start=1):
+            if not linha.strip() or linha.lstrip().startswith("#"):
+                continue
+            try:
+                dados = json.loads(linha)
+                etapas = list(dados.get("etapas", [MODO_GRAVAR]))
+                cue = dados.get("cue", "")
+                velocidade = int(dados.get("velocidade", VELOCIDADE_PADRAO))
+                if "dispositivos" in dados:
+                    trabalhos.extend(
+                        criar_copias(list(dados["dispositivos"]), etapas, cue, velocidade)
+                    )
+                else:
+                    trabalhos.append(
+                        criar_pipeline(dados["dispositivo"], etapas, cue, velocidade)
+                    )
+            except (KeyError, TypeError, ValueError) as exc:
+                raise ValueError(f"Linha {numero}: trabalho inválido ({exc})") from exc
+    return trabalhos
+
+
+def _fila(args: argparse.Namespace) -> int:
+    try:
+        trabalhos = ler_fila(Path(args.arquivo))
+    except (OSError, ValueError) as exc:
+        _erro(str(exc))
+        return 2
+    return executar_trabalhos(trabalhos, args.paralelo)
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="gravador-cdrdao-cli", description="Gravador CDRDAO sem interface gráfica."
+    )
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    validar = subcomandos.add_parser("validate", help="valida um ou mais CUEs")
+    validar.add_argument("cue", nargs="+")
+    validar.add_argument("--detalhes", action="store_true", help="mostra as tracks")
+    validar.add_argument("--dat", action="store_true", help="confere os BINs no índice DAT")
+    validar.add_argument(
+        "--setores", action="store_true", help="confere sync, cabeçalho e EDC dos setores"
+    )
+    validar.add_argument("--ecc", action="store_true", help="com --setores, confere também o ECC")
+    validar.set_defaults(funcao=_validar)
+
+    dat = subcomandos.add_parser("dat", help="gerencia o índice DAT")
+    subcomandos_dat = dat.add_subparsers(dest="acao", required=True)
+    importar = subcomandos_dat.add_parser(
+        "import", help="recria o índice a partir de DATs (Redump, No-Intro)"
+    )
+    importar.add_argument("dat", nargs="+")
+    importar.set_defaults(funcao=_importar_dat)
+
+    corrigir = subcomandos.add_parser("fix", help="normaliza o CUE e corrige nomes de FILE")
+    corrigir.add_argument("cue")
+    corrigir.add_argument("--mapa", action="append", default=[], metavar="ANTIGO=NOVO")
+    corrigir.add_argument("--auto", action="store_true", help="aplica sugestões inequívocas")
+    corrigir.add_argument("--simular", action="store_true", help="só mostra as alterações")
+    corrigir.set_defaults(funcao=_corrigir)
+
+    for nome, ajuda, funcao in (
+        ("burn", "grava um CUE/BIN", _gravar),
+        ("simulate", "simula a gravação", _simular),
+    ):
+        sub = subcomandos.add_parser(nome, help=ajuda)
+        sub.add_argument("cue")
+        sub.add_argument(
+            "--device", action="append", required=True, help="repita para gravar cópias"
+        )
+        sub.add_argument("--speed", type=int, default=VELOCIDADE_PADRAO)
+        sub.set_defaults(funcao=funcao)
+        if nome == "burn":
+            sub.add_argument("--simular", action="store_true", help="simula antes de gravar")
+            sub.add_argument("--verificar", action="store_true", help="verifica após gravar")
+
+    apagar = subcomandos.add_parser("blank", help="apaga um CD-RW")
+    apagar.add_argument("--device", required=True)
+    apagar.set_defaults(funcao=_apagar)
+
+    dispositivos = subcomandos.add_parser("devices", help="lista os drives ópticos")
+    dispositivos.add_argument("--info", action="store_true", help="consulta drive e mídia")
+    dispositivos.set_defaults(funcao=_dispositivos)
+
+    fila = subcomandos.add_parser("queue", help="executa uma fila de trabalhos (JSON Lines)")
+    fila.add_argument("arquivo")
+    fila.add_argument("--paralelo", type=int, default=0, help="máximo de drives ao mesmo tempo")
+    fila.set_defaults(funcao=_fila)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = criar_parser().parse_args(argv)
+    if os.geteuid() == 0 and args.comando in ("burn", "simulate", "blank", "queue"):
+        _erro("O Gravador CDRDAO não deve ser executado como root.")
+        return 1
+    return args.funcao(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import sys
+
+from gravador_cdrdao.fila_trabalhos import (
+    MODO_APAGAR,
+    MODO_GRAVAR,
+    MODO_SIMULAR,
+    MODO_VERIFICAR,
+    TrabalhoGravacao,
+)
+
+
+def comando_simulacao(dev: str, velocidade: int, cue: str) -> list[str]:
+    return ["cdrdao", "simulate", "--device", dev, "--speed", str(velocidade), cue]
+
+
+def comando_gravacao(dev: str, velocidade: int, cue: str, ejetar: bool = True) -> list[str]:
+    comando = ["cdrdao", "write", "--device", dev, "--speed", str(velocidade)]
+    if ejetar:
+        comando.append("--eject")
+    return [*comando, cue]
+
+
+def comando_verificacao(dev: str, cue: str, ejetar: bool = True) -> list[str]:
+    comando = [sys.executable, "-m", "gravador_cdrdao.verificacao", "--device", dev]
+    if ejetar:
+        comando.append("--ejetar")
+    return [*comando, cue]
+
+
+def comando_validacao_biblioteca(raiz: str, hashes: bool = False) -> list[str]:
+    comando = [sys.executable, "-m", "gravador_cdrdao.biblioteca"]
+    if hashes:
+        comando.append("--hashes")
+    return [*comando, raiz]
+
+
+def comando_hashes(cue: str) -> list[str]:
+    return [sys.executable, "-m", "gravador_cdrdao.hashes_imagem", cue]
+
+
+def comando_apagar(dev: str) -> list[str]:
+    return ["cdrdao", "blank", "--device", dev]
+
+
+def comando_trabalho(trabalho: TrabalhoGravacao) -> list[str]:
+    """Linha de comando da etapa atual de ``trabalho``."""
+    if trabalho.modo == MODO_SIMULAR:
+        return comando_simulacao(trabalho.dispositivo, trabalho.velocidade, trabalho.cue)
+    if trabalho.modo == MODO_GRAVAR:
+        # Com verificação pendente o disco precisa continuar no drive.
+        return comando_gravacao(
+            trabalho.dispositivo,
+            trabalho.velocidade,
+            trabalho.cue,
+            ejetar=MODO_VERIFICAR not in trabalho.etapas_seguintes,
+        )
+    if trabalho.modo == MODO_VERIFICAR:
+        return comando_verificacao(trabalho.dispositivo, trabalho.cue)
+    if trabalho.modo == MODO_APAGAR:
+        return comando_apagar(trabalho.dispositivo)
+    raise ValueError(f"Modo de trabalho desconhecido: {trabalho.modo}")
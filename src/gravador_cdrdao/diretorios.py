@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+def diretorio_cache() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "gravador-cdrdao"
@@ -15,6 +15,30 @@ class DispositivoOptico:
     fabricante: str
     modelo: str
     sg: str | None
+    # Tamanho da mídia em setores de 512 bytes, lido do sysfs; 0 sem disco.
+    setores_midia: int = 0
+
+
+RAIZ_BLOCOS = Path("/sys/class/block")
+
+
+def _ler_setores_midia(caminho: Path) -> int:
+    try:
+        return int((caminho / "size").read_text().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def ler_dispositivo(caminho: Path) -> DispositivoOptico:
+    vendor, model = _ler_modelo_sr(caminho)
+    dev = f"/dev/{caminho.name}"
+    return DispositivoOptico(
+        caminho=dev,
+        fabricante=vendor,
+        modelo=model,
+        sg=_mapear_sg(dev),
+        setores_midia=_ler_setores_midia(caminho),
+    )
 
 
 def _ler_modelo_sr(caminho: Path) -> tuple[str, str]:
@@ -34,20 +58,8 @@ def _mapear_sg(caminho: str) -> str | None:
     return candidato if os.path.exists(candidato) else None
 
 
-def listar_dispositivos() -> list[DispositivoOptico]:
-    dispositivos: list[DispositivoOptico] = []
-    for caminho in sorted(Path("/sys/class/block").glob("sr*")):
-        vendor, model = _ler_modelo_sr(caminho)
-        dev = f"/dev/{caminho.name}"
-        dispositivos.append(
-            DispositivoOptico(
-                caminho=dev,
-                fabricante=vendor,
-                modelo=model,
-                sg=_mapear_sg(dev),
-            )
-        )
-    return dispositivos
+def listar_dispositivos(raiz: Path = RAIZ_BLOCOS) -> list[DispositivoOptico]:
+    return [ler_dispositivo(caminho) for caminho in sorted(raiz.glob("sr*"))]
 
 
 def obter_info_lsblk() -> dict[str, dict[str, str]]:
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Callable
+
+from gravador_cdrdao.classificador_erros import ClassificadorErros, OcorrenciaErro
+from gravador_cdrdao.comandos_cdrdao import comando_trabalho
+from gravador_cdrdao.fila_trabalhos import (
+    TrabalhoGravacao,
+    pode_tentar_novamente,
+    preparar_nova_tentativa,
+)
+from gravador_cdrdao.progresso import (
+    AnalisadorProgresso,
+    LimitadorProgresso,
+    ProgressoCdrdao,
+    SaidaRetida,
+)
+from gravador_cdrdao.supervisor_processos import SupervisorProcessos, supervisor_padrao
+
+_contador_etapas = itertools.count(1)
+
+
+@dataclass
+class ResultadoTrabalho:
+    trabalho: TrabalhoGravacao
+    codigo: int = 0
+    log: str = ""
+    ocorrencias: list[OcorrenciaErro] = field(default_factory=list)
+
+    @property
+    def sucesso(self) -> bool:
+        return self.codigo == 0 and not any(o.fatal for o in self.ocorrencias)
+
+
+def executar_trabalho(
+    trabalho: TrabalhoGravacao,
+    supervisor: SupervisorProcessos | None = None,
+    classificador: ClassificadorErros | None = None,
+    ao_progresso: Callable[[TrabalhoGravacao, ProgressoCdrdao], None] | None = None,
+    ao_erro: Callable[[TrabalhoGravacao, OcorrenciaErro], None] | None = None,
+    cancelar: threading.Event | None = None,
+) -> ResultadoTrabalho:
+    """Executa as etapas de ``trabalho`` em sequência, bloqueando até o fim.
+
+    Mesma política do agendador da interface: erro fatal cancela a etapa e,
+    quando a regra permite, a etapa é repetida uma vez.
+    """
+    supervisor = supervisor or supervisor_padrao()
+    classificador = classificador or ClassificadorErros()
+    while True:
+        resultado = _executar_etapa(
+            trabalho, supervisor, classificador, ao_progresso, ao_erro, cancelar
+        )
+        if cancelar is not None and cancelar.is_set():
+            return resultado
+        if resultado.sucesso:
+            if not trabalho.etapas_seguintes:
+                return resultado
+            trabalho.modo = trabalho.etapas_seguintes.pop(0)
+            continue
+        fatal = next((o for o in resultado.ocorrencias if o.fatal), None)
+        if fatal and pode_tentar_novamente(trabalho, fatal):
+            preparar_nova_tentativa(trabalho, fatal)
+            continue
+        return resultado
+
+
+def _executar_etapa(
+    trabalho: TrabalhoGravacao,
+    supervisor: SupervisorProcessos,
+    classificador: ClassificadorErros,
+    ao_progresso: Callable[[TrabalhoGravacao, ProgressoCdrdao], None] | None,
+    ao_erro: Callable[[TrabalhoGravacao, OcorrenciaErro], None] | None,
+    cancelar: threading.Event | None,
+) -> ResultadoTrabalho:
+    identificador = f"{trabalho.identificador}-etapa-{next(_contador_etapas)}"
+    resultado = ResultadoTrabalho(trabalho)
+    saida = SaidaRetida()
+    analisador = AnalisadorProgresso()
+    limitador = LimitadorProgresso()
+    erros = classificador.novo_analisador()
+
+    def emitir(progresso: ProgressoCdrdao | None) -> None:
+        if progresso is not None and ao_progresso is not None:
+            ao_progresso(trabalho, progresso)
+
+    def ao_linhas(linhas: list[str]) -> None:
+        for linha in linhas:
+            saida.adicionar(linha)
+            for ocorrencia in erros.alimentar(linha):
+                resultado.ocorrencias.append(ocorrencia)
+                if ao_erro is not None:
+                    ao_erro(trabalho, ocorrencia)
+                if ocorrencia.fatal and erros.fatal is ocorrencia:
+                    supervisor.cancelar(identificador)
+            if progresso := analisador.analisar(linha):
+                emitir(limitador.oferecer(progresso))
+        emitir(limitador.vencido())
+
+    def ao_fim(codigo: int, falha: str | None) -> None:
+        emitir(limitador.pendente())
+        resultado.codigo = codigo
+        resultado.log = falha if falha is not None else saida.texto()
+
+    futuro = supervisor.iniciar(
+        identificador,
+        comando_trabalho(trabalho),
+        ao_linhas=ao_linhas,
+        ao_fim=ao_fim,
+        ao_ocioso=lambda: emitir(limitador.vencido()),
+        intervalo=limitador.intervalo or None,
+    )
+    while cancelar is not None and not futuro.done():
+        if cancelar.wait(0.2):
+            supervisor.cancelar(identificador)
+            break
+    try:
+        futuro.result()
+    except Exception:
+        pass
+    return resultado
@@ -1,91 +1,128 @@
 from __future__ import annotations
 
-import re
-import subprocess
-from dataclasses import dataclass
-from typing import Callable
+import itertools
+from concurrent.futures import Future
 
 from PySide6 import QtCore
 
+from gravador_cdrdao.classificador_erros import AnalisadorErros, OcorrenciaErro
+from gravador_cdrdao.comandos_cdrdao import (
+    comando_apagar,
+    comando_gravacao,
+    comando_hashes,
+    comando_simulacao,
+    comando_trabalho,
+    comando_validacao_biblioteca,
+    comando_verificacao,
+)
+from gravador_cdrdao.fila_trabalhos import TrabalhoGravacao
+from gravador_cdrdao.progresso import (
+    MAX_EMISSOES_POR_SEGUNDO,
+    MAX_LINHAS_RETIDAS,
+    AnalisadorProgresso,
+    LimitadorProgresso,
+    ProgressoCdrdao,
+    SaidaRetida,
+    SerieTelemetria,
+)
+from gravador_cdrdao.supervisor_processos import SupervisorProcessos, supervisor_padrao
 
-@dataclass
-class ProgressoCdrdao:
-    mensagem: str
-    faixa: str | None
-    buffer: str | None
+_contador_execucoes = itertools.count(1)
 
 
-class ExecutorCdrdao(QtCore.QThread):
+class ExecutorCdrdao(QtCore.QObject):
     progresso = QtCore.Signal(ProgressoCdrdao)
     finalizado = QtCore.Signal(int, str)
+    erro_detectado = QtCore.Signal(OcorrenciaErro)
 
-    def __init__(self, comando: list[str]) -> None:
+    def __init__(
+        self,
+        comando: list[str],
+        max_emissoes_por_segundo: float = MAX_EMISSOES_POR_SEGUNDO,
+        linhas_retidas: int = MAX_LINHAS_RETIDAS,
+        supervisor: SupervisorProcessos | None = None,
+    ) -> None:
         super().__init__()
         self._comando = comando
-        self._processo: subprocess.Popen[str] | None = None
-        self._cancelado = False
-
-    def run(self) -> None:
-        try:
-            self._processo = subprocess.Popen(
-                self._comando,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-            )
-            saida = []
-            assert self._processo.stdout
-            for linha in self._processo.stdout:
-                saida.append(linha)
-                self._emitir_progresso(linha)
-                if self._cancelado:
-                    break
-            if self._cancelado and self._processo.poll() is None:
-                self._processo.terminate()
-            codigo = self._processo.wait() if self._processo else 1
-            self.finalizado.emit(codigo, "".join(saida))
-        except Exception as exc:
-            self.finalizado.emit(1, f"Falha ao executar: {exc}")
+        self._supervisor = supervisor or supervisor_padrao()
+        self._identificador = f"execucao-{next(_contador_execucoes)}"
+        self._saida = SaidaRetida(linhas_retidas)
+        self._analisador = AnalisadorProgresso()
+        self._limitador = LimitadorProgresso(max_emissoes_por_segundo)
+        self.telemetria: SerieTelemetria = self._analisador.serie
+        # Definido antes de ``start``; cada linha passa pelo classificador.
+        self.analisador_erros: AnalisadorErros | None = None
+        self._futuro: Future[int] | None = None
+
+    def start(self) -> None:
+        self._futuro = self._supervisor.iniciar(
+            self._identificador,
+            self._comando,
+            ao_linhas=self._ao_linhas,
+            ao_fim=self._ao_fim,
+            ao_ocioso=self._ao_ocioso,
+            intervalo=self._limitador.intervalo or None,
+        )
 
     def cancelar(self) -> None:
-        self._cancelado = True
-        if self._processo and self._processo.poll() is None:
-            self._processo.terminate()
-
-    def _emitir_progresso(self, linha: str) -> None:
-        faixa = None
-        buffer = None
-        if match := re.search(r"Writing track\s+(\d+)", linha, re.I):
-            faixa = match.group(1)
-        if match := re.search(r"buffer\s*([0-9]+%)", linha, re.I):
-            buffer = match.group(1)
-        mensagem = linha.strip()
-        if mensagem:
-            self.progresso.emit(ProgressoCdrdao(mensagem=mensagem, faixa=faixa, buffer=buffer))
+        self._supervisor.cancelar(self._identificador)
+
+    def aguardar(self, tempo_limite: float | None = None) -> None:
+        # Garante que o supervisor soltou os callbacks antes de o executor
+        # ser descartado na thread da interface.
+        if self._futuro is not None:
+            try:
+                self._futuro.result(tempo_limite)
+            except Exception:
+                pass
+
+    def _ao_linhas(self, linhas: list[str]) -> None:
+        for linha in linhas:
+            self._saida.adicionar(linha)
+            if self.analisador_erros is not None:
+                for ocorrencia in self.analisador_erros.alimentar(linha):
+                    self.erro_detectado.emit(ocorrencia)
+            if progresso := self._analisador.analisar(linha):
+                self._emitir_progresso(self._limitador.oferecer(progresso))
+        self._emitir_progresso(self._limitador.vencido())
+
+    def _ao_ocioso(self) -> None:
+        self._emitir_progresso(self._limitador.vencido())
+
+    def _ao_fim(self, codigo: int, falha: str | None) -> None:
+        self._emitir_progresso(self._limitador.pendente())
+        self.finalizado.emit(codigo, falha if falha is not None else self._saida.texto())
+
+    def _emitir_progresso(self, progresso: ProgressoCdrdao | None) -> None:
+        if progresso is not None:
+            self.progresso.emit(progresso)
 
 
 class ExecutorCdrdaoFactory:
     @staticmethod
     def criar_simulacao(dev: str, velocidade: int, cue: str) -> ExecutorCdrdao:
-        return ExecutorCdrdao(
-            ["cdrdao", "simulate", "--device", dev, "--speed", str(velocidade), cue]
-        )
+        return ExecutorCdrdao(comando_simulacao(dev, velocidade, cue))
 
     @staticmethod
-    def criar_gravacao(dev: str, velocidade: int, cue: str) -> ExecutorCdrdao:
-        return ExecutorCdrdao(
-            [
-                "cdrdao",
-                "write",
-                "--device",
-                dev,
-                "--speed",
-                str(velocidade),
-                "--eject",
-                cue,
-            ]
-        )
+    def criar_gravacao(dev: str, velocidade: int, cue: str, ejetar: bool = True) -> ExecutorCdrdao:
+        return ExecutorCdrdao(comando_gravacao(dev, velocidade, cue, ejetar))
+
+    @staticmethod
+    def criar_verificacao(dev: str, cue: str, ejetar: bool = True) -> ExecutorCdrdao:
+        return ExecutorCdrdao(comando_verificacao(dev, cue, ejetar))
+
+    @staticmethod
+    def criar_validacao_biblioteca(raiz: str, hashes: bool = False) -> ExecutorCdrdao:
+        return ExecutorCdrdao(comando_validacao_biblioteca(raiz, hashes))
+
+    @staticmethod
+    def criar_hashes(cue: str) -> ExecutorCdrdao:
+        return ExecutorCdrdao(comando_hashes(cue))
 
     @staticmethod
     def criar_apagar(dev: str) -> ExecutorCdrdao:
-        return ExecutorCdrdao(["cdrdao", "blank", "--device", dev])
+        return ExecutorCdrdao(comando_apagar(dev))
+
+    @staticmethod
+    def criar_trabalho(trabalho: TrabalhoGravacao) -> ExecutorCdrdao:
+        return ExecutorCdrdao(comando_trabalho(trabalho))
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import itertools
+from collections import deque
+from dataclasses import dataclass, field
+
+from gravador_cdrdao.classificador_erros import OcorrenciaErro
+
+MODO_SIMULAR = "simular"
+MODO_GRAVAR = "gravar"
+MODO_APAGAR = "apagar"
+MODO_VERIFICAR = "verificar"
+MODOS = (MODO_SIMULAR, MODO_GRAVAR, MODO_APAGAR, MODO_VERIFICAR)
+# Etapas que leem os BINs do CUE.
+MODOS_COM_IMAGEM = (MODO_SIMULAR, MODO_GRAVAR, MODO_VERIFICAR)
+MAX_TENTATIVAS = 1
+
+_contador_trabalhos = itertools.count(1)
+_contador_grupos = itertools.count(1)
+
+
+def _novo_identificador() -> str:
+    return f"trabalho-{next(_contador_trabalhos)}"
+
+
+@dataclass
+class TrabalhoGravacao:
+    dispositivo: str
+    modo: str
+    cue: str = ""
+    velocidade: int = 0
+    identificador: str = field(default_factory=_novo_identificador)
+    etapas_seguintes: list[str] = field(default_factory=list)
+    tempos_etapas: list[tuple[str, float]] = field(default_factory=list)
+    tentativas: int = 0
+    # Trabalhos de um mesmo lote multi-cópia compartilham o grupo.
+    grupo: str = ""
+
+
+def criar_pipeline(
+    dispositivo: str, etapas: list[str], cue: str = "", velocidade: int = 0
+) -> TrabalhoGravacao:
+    if not etapas:
+        raise ValueError("Pipeline sem etapas.")
+    return TrabalhoGravacao(
+        dispositivo=dispositivo,
+        modo=etapas[0],
+        cue=cue,
+        velocidade=velocidade,
+        etapas_seguintes=list(etapas[1:]),
+    )
+
+
+def le_imagem(trabalho: TrabalhoGravacao) -> bool:
+    etapas = (trabalho.modo, *trabalho.etapas_seguintes)
+    return bool(trabalho.cue) and any(etapa in MODOS_COM_IMAGEM for etapa in etapas)
+
+
+def grava_midia(trabalho: TrabalhoGravacao) -> bool:
+    """Alguma etapa escreve (ou simula escrever) a imagem na mídia."""
+    etapas = {trabalho.modo, *trabalho.etapas_seguintes}
+    return bool(trabalho.cue) and bool({MODO_SIMULAR, MODO_GRAVAR} & etapas)
+
+
+def pode_tentar_novamente(trabalho: TrabalhoGravacao, ocorrencia: OcorrenciaErro) -> bool:
+    return ocorrencia.reenfileirar and trabalho.tentativas < MAX_TENTATIVAS
+
+
+def preparar_nova_tentativa(trabalho: TrabalhoGravacao, ocorrencia: OcorrenciaErro) -> None:
+    trabalho.tentativas += 1
+    if ocorrencia.regra == "velocidade" and trabalho.velocidade > 1:
+        trabalho.velocidade //= 2
+
+
+def criar_copias(
+    dispositivos: list[str], etapas: list[str], cue: str, velocidade: int = 0
+) -> list[TrabalhoGravacao]:
+    """Um pipeline por drive para gravar a mesma imagem em todos."""
+    if not dispositivos:
+        raise ValueError("Nenhum drive para as cópias.")
+    grupo = f"copias-{next(_contador_grupos)}"
+    trabalhos = []
+    for dispositivo in dispositivos:
+        trabalho = criar_pipeline(dispositivo, etapas, cue, velocidade)
+        trabalho.grupo = grupo
+        trabalhos.append(trabalho)
+    return trabalhos
+
+
+class FilaTrabalhos:
+    """Filas por drive: no máximo um trabalho ativo por dispositivo.
+
+    ``limite_concorrencia`` limita o total de drives gravando ao mesmo tempo;
+    ``0`` significa sem limite.
+    """
+
+    def __init__(self, limite_concorrencia: int = 0) -> None:
+        self.limite_concorrencia = limite_concorrencia
+        self._filas: dict[str, deque[TrabalhoGravacao]] = {}
+        self._ativos: dict[str, TrabalhoGravacao] = {}
+
+    def adicionar(self, trabalho: TrabalhoGravacao, prioritario: bool = False) -> None:
+        for modo in (trabalho.modo, *trabalho.etapas_seguintes):
+            if modo not in MODOS:
+                raise ValueError(f"Modo de trabalho desconhecido: {modo}")
+        fila = self._filas.setdefault(trabalho.dispositivo, deque())
+        if prioritario:
+            fila.appendleft(trabalho)
+        else:
+            fila.append(trabalho)
+
+    def proximos(self) -> list[TrabalhoGravacao]:
+        iniciados: list[TrabalhoGravacao] = []
+        for dispositivo, fila in self._filas.items():
+            if not self._tem_vaga():
+                break
+            if not fila or dispositivo in self._ativos:
+                continue
+            trabalho = fila.popleft()
+            self._ativos[dispositivo] = trabalho
+            iniciados.append(trabalho)
+        return iniciados
+
+    def avancar(self, identificador: str) -> TrabalhoGravacao | None:
+        for trabalho in self._ativos.values():
+            if trabalho.identificador == identificador and trabalho.etapas_seguintes:
+                trabalho.modo = trabalho.etapas_seguintes.pop(0)
+                return trabalho
+        return None
+
+    def concluir(self, identificador: str) -> TrabalhoGravacao | None:
+        for dispositivo, trabalho in self._ativos.items():
+            if trabalho.identificador == identificador:
+                del self._ativos[dispositivo]
+                return trabalho
+        return None
+
+    def remover_pendentes(self, dispositivo: str | None = None) -> list[TrabalhoGravacao]:
+        removidos: list[TrabalhoGravacao] = []
+        for chave, fila in self._filas.items():
+            if dispositivo is None or chave == dispositivo:
+                removidos.extend(fila)
+                fila.clear()
+        return removidos
+
+    def ativo(self, dispositivo: str) -> TrabalhoGravacao | None:
+        return self._ativos.get(dispositivo)
+
+    def ativos(self) -> list[TrabalhoGravacao]:
+        return list(self._ativos.values())
+
+    def pendentes(self, dispositivo: str | None = None) -> list[TrabalhoGravacao]:
+        if dispositivo is not None:
+            return list(self._filas.get(dispositivo, ()))
+        return [trabalho for fila in self._filas.values() for trabalho in fila]
+
+    def vazia(self) -> bool:
+        return not self._ativos and not any(self._filas.values())
+
+    def _tem_vaga(self) -> bool:
+        return self.limite_concorrencia <= 0 or len(self._ativos) < self.limite_concorrencia
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from gravador_cdrdao.diretorios import diretorio_cache
+from gravador_cdrdao.imagem_comprimida import abrir_imagem
+from gravador_cdrdao.parser_cue import (
+    CueSheet,
+    carregar_cue,
+    resolver_caminhos_relativos,
+)
+
+TAMANHO_BUFFER_HASH = 4 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class HashesArquivo:
+    tamanho: int
+    crc32: str
+    md5: str
+    sha1: str
+
+
+def calcular_hashes(
+    caminho: str | Path, copiar_para: BinaryIO | None = None
+) -> HashesArquivo:
+    """Com ``copiar_para`` os blocos lidos também são gravados lá: cópia e hash numa leitura.
+
+    BINs comprimidos são lidos já decodificados: os hashes são os da imagem.
+    """
+    crc = 0
+    md5 = hashlib.md5()
+    sha1 = hashlib.sha1()
+    tamanho = 0
+    buffer = bytearray(TAMANHO_BUFFER_HASH)
+    visao = memoryview(buffer)
+    with abrir_imagem(caminho) as arquivo:
+        while lidos := arquivo.readinto(buffer):
+            bloco = visao[:lidos]
+            crc = zlib.crc32(bloco, crc)
+            md5.update(bloco)
+            sha1.update(bloco)
+            tamanho += lidos
+            if copiar_para is not None:
+                copiar_para.write(bloco)
+    return HashesArquivo(
+        tamanho=tamanho,
+        crc32=f"{crc:08x}",
+        md5=md5.hexdigest(),
+        sha1=sha1.hexdigest(),
+    )
+
+
+def _chave_arquivo(caminho: str | Path) -> str:
+    resolvido = Path(caminho).resolve()
+    info = resolvido.stat()
+    return f"{resolvido}|{info.st_size}|{info.st_mtime_ns}|{info.st_ino}"
+
+
+class CacheHashes:
+    """Hashes já calculados, indexados por (caminho, tamanho, mtime, inode).
+
+    Compartilhado entre a interface e as threads de cópia do cache de imagens;
+    o arquivo também é escrito pelo processo de hashes em segundo plano.
+    """
+
+    def __init__(self, arquivo: Path | None = None) -> None:
+        self.arquivo = arquivo
+        self._trava = threading.Lock()
+        self._entradas = self._ler()
+        self._alterado = False
+
+    def _ler(self) -> dict[str, HashesArquivo]:
+        if self.arquivo is None or not self.arquivo.exists():
+            return {}
+        try:
+            dados = json.loads(self.arquivo.read_text(encoding="utf-8"))
+            return {chave: HashesArquivo(**valor) for chave, valor in dados.items()}
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def recarregar(self) -> None:
+        """Traz as entradas que outro processo gravou no arquivo."""
+        lidas = self._ler()
+        with self._trava:
+            for chave, hashes in lidas.items():
+                self._entradas.setdefault(chave, hashes)
+
+    def obter(self, caminho: str | Path) -> HashesArquivo | None:
+        try:
+            chave = _chave_arquivo(caminho)
+        except OSError:
+            return None
+        with self._trava:
+            return self._entradas.get(chave)
+
+    def guardar(self, chave: str, hashes: HashesArquivo) -> None:
+        with self._trava:
+            self._entradas[chave] = hashes
+            self._alterado = True
+
+    def registrar(self, caminho: str | Path, hashes: HashesArquivo) -> None:
+        self.guardar(_chave_arquivo(caminho), hashes)
+
+    def salvar(self) -> None:
+        # A trava cobre a escrita: um salvamento antigo não sobrescreve um novo.
+        with self._trava:
+            if self.arquivo is None or not self._alterado:
+                return
+            self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+            for chave, hashes in self._ler().items():
+                self._entradas.setdefault(chave, hashes)
+            dados = {chave: asdict(valor) for chave, valor in self._entradas.items()}
+            fd, temporario = tempfile.mkstemp(dir=self.arquivo.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as saida:
+                json.dump(dados, saida)
+            os.replace(temporario, self.arquivo)
+            self._alterado = False
+
+
+def cache_hashes_padrao() -> CacheHashes:
+    return CacheHashes(diretorio_cache() / "hashes.json")
+
+
+def calcular_hashes_cue(
+    cue: CueSheet,
+    cache: CacheHashes | None = None,
+    max_processos: int | None = None,
+) -> dict[str, HashesArquivo]:
+    resultado: dict[str, HashesArquivo] = {}
+    pendentes: dict[str, str] = {}
+    for arquivo in cue.arquivos:
+        if arquivo.caminho in resultado or arquivo.caminho in pendentes:
+            continue
+        if cache is not None and (hashes := cache.obter(arquivo.caminho)):
+            resultado[arquivo.caminho] = hashes
+        else:
+            pendentes[arquivo.caminho] = _chave_arquivo(arquivo.caminho)
+
+    caminhos = list(pendentes)
+    if len(caminhos) > 1 and max_processos != 1:
+        trabalhadores = min(len(caminhos), max_processos or os.cpu_count() or 1)
+        # Forkserver: quem chama pode ter threads vivas (cópias, supervisor).
+        contexto = multiprocessing.get_context("forkserver")
+        with ProcessPoolExecutor(trabalhadores, mp_context=contexto) as executor:
+            calculados = list(executor.map(calcular_hashes, caminhos))
+    else:
+        calculados = [calcular_hashes(caminho) for caminho in caminhos]
+
+    for caminho, hashes in zip(caminhos, calculados, strict=True):
+        resultado[caminho] = hashes
+        if cache is not None:
+            cache.guardar(pendentes[caminho], hashes)
+    if cache is not None:
+        cache.salvar()
+    return resultado
+
+
+def formatar_hashes(hashes: dict[str, HashesArquivo]) -> str:
+    return "\n".join(
+        f"{Path(arquivo).name}: {item.tamanho} bytes\n"
+        f"  CRC32 {item.crc32}\n  MD5 {item.md5}\n  SHA-1 {item.sha1}"
+        for arquivo, item in hashes.items()
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Calcula os hashes dos BINs de um CUE e guarda no cache."
+    )
+    parser.add_argument("cue")
+    args = parser.parse_args(argv)
+    try:
+        caminho = Path(args.cue)
+        cue = resolver_caminhos_relativos(carregar_cue(caminho), caminho.parent)
+        hashes = calcular_hashes_cue(cue, cache_hashes_padrao())
+    except (OSError, ValueError) as exc:
+        print(f"Falha ao calcular hashes: {exc}")
+        return 1
+    print(formatar_hashes(hashes))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+"""BINs guardados comprimidos (ECM, gzip, xz, zip), lidos já decodificados.
+
+O cdrdao precisa do tamanho e de acesso aleatório ao BIN, então a imagem não
+vai para ele por um pipe: é decodificada em fluxo, num processo à parte, para
+o cache local de imagens, e o CUE reescrito aponta para essa cópia.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gzip
+import io
+import lzma
+import os
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+from typing import BinaryIO
+
+from gravador_cdrdao import setores_cd
+from gravador_cdrdao.parser_cue import SUFIXOS_COMPRIMIDOS
+
+TAMANHO_BLOCO = 1024 * 1024
+# Setores regenerados de uma vez pelo decodificador ECM (~2,3 MiB).
+LOTE_SETORES_ECM = 1024
+_MAGICO_ECM = b"ECM\x00"
+_FIM_ECM = 0xFFFFFFFF
+# Tipo ECM -> (bytes guardados por setor, bytes gerados por setor).
+_SETORES_ECM = {
+    setores_cd.TIPO_MODE1: (0x803, setores_cd.TAMANHO_SETOR),
+    setores_cd.TIPO_MODE2_FORM1: (0x804, 2336),
+    setores_cd.TIPO_MODE2_FORM2: (0x918, 2336),
+}
+
+
+def comprimida(caminho: str | Path) -> bool:
+    return Path(caminho).suffix.lower() in SUFIXOS_COMPRIMIDOS
+
+
+def nome_descomprimido(caminho: str | Path) -> str:
+    """``jogo.bin.ecm`` -> ``jogo.bin``."""
+    nome = Path(caminho).name
+    return Path(nome).stem if comprimida(nome) else nome
+
+
+def _ler_exato(entrada: BinaryIO, tamanho: int) -> bytes:
+    dados = entrada.read(tamanho)
+    if len(dados) != tamanho:
+        raise ValueError("ECM truncado.")
+    return dados
+
+
+def _ler_registro_ecm(entrada: BinaryIO) -> tuple[int, int]:
+    """(tipo, quantidade) do próximo registro; quantidade 0 marca o fim."""
+    byte = entrada.read(1)
+    if not byte:
+        raise ValueError("ECM truncado.")
+    valor = byte[0]
+    tipo = valor & 3
+    quantidade = (valor >> 2) & 0x1F
+    bits = 5
+    while valor & 0x80:
+        byte = entrada.read(1)
+        if not byte:
+            raise ValueError("ECM truncado.")
+        valor = byte[0]
+        quantidade |= (valor & 0x7F) << bits
+        bits += 7
+        if bits > 40:
+            raise ValueError("ECM corrompido.")
+    quantidade &= 0xFFFFFFFF
+    if quantidade == _FIM_ECM:
+        return tipo, 0
+    if quantidade + 1 >= 0x80000000:
+        raise ValueError("ECM corrompido.")
+    return tipo, quantidade + 1
+
+
+def _checar_magico_ecm(entrada: BinaryIO) -> None:
+    if entrada.read(4) != _MAGICO_ECM:
+        raise ValueError("Arquivo não é ECM.")
+
+
+def _setores_ecm(dados: bytes, tipo: int, quantidade: int) -> bytes:
+    guardado, gerado = _SETORES_ECM[tipo]
+    if not setores_cd.VETORIZADO:
+        saida = bytearray()
+        for indice in range(quantidade):
+            saida += _setor_ecm(dados[indice * guardado : (indice + 1) * guardado], tipo)
+        return bytes(saida)
+    import numpy as np
+
+    payload = np.frombuffer(dados, dtype=np.uint8).reshape(quantidade, guardado)
+    setores = np.zeros((quantidade, setores_cd.TAMANHO_SETOR), dtype=np.uint8)
+    if tipo == setores_cd.TIPO_MODE1:
+        setores[:, 0x0C:0x0F] = payload[:, :3]
+        setores[:, 0x0F] = 1
+        setores[:, 0x10:0x810] = payload[:, 3:]
+    else:
+        setores[:, 0x0F] = 2
+        setores[:, 0x14 : 0x14 + guardado] = payload
+        setores[:, 0x10:0x14] = payload[:, :4]
+    setores_cd.regenerar_lote(setores, tipo)
+    return setores[:, setores_cd.TAMANHO_SETOR - gerado :].tobytes()
+
+
+def _setor_ecm(dados: bytes, tipo: int) -> bytes:
+    setor = bytearray(setores_cd.TAMANHO_SETOR)
+    if tipo == setores_cd.TIPO_MODE1:
+        setor[0x0C:0x0F] = dados[:3]
+        setor[0x0F] = 1
+        setor[0x10:0x810] = dados[3:]
+    else:
+        setor[0x0F] = 2
+        setor[0x14 : 0x14 + len(dados)] = dados
+        setor[0x10:0x14] = dados[:4]
+    setores_cd.regenerar(setor, tipo)
+    return bytes(setor[setores_cd.TAMANHO_SETOR - _SETORES_ECM[tipo][1] :])
+
+
+def decodificar_ecm(entrada: BinaryIO, saida: BinaryIO) -> int:
+    """Reconstrói o BIN de um ECM, regenerando EDC/ECC em lotes de setores."""
+    _checar_magico_ecm(entrada)
+    edc = setores_cd.AcumuladorEdc()
+    total = 0
+    while True:
+        tipo, quantidade = _ler_registro_ecm(entrada)
+        if not quantidade:
+            break
+        while quantidade:
+            if tipo == 0:
+                parte = min(quantidade, TAMANHO_BLOCO)
+                bloco = _ler_exato(entrada, parte)
+            else:
+                parte = min(quantidade, LOTE_SETORES_ECM)
+                guardado = _SETORES_ECM[tipo][0]
+                bloco = _setores_ecm(_ler_exato(entrada, parte * guardado), tipo, parte)
+            edc.atualizar(bloco)
+            saida.write(bloco)
+            total += len(bloco)
+            quantidade -= parte
+    esperado = int.from_bytes(_ler_exato(entrada, 4), "little")
+    if esperado != edc.valor:
+        raise ValueError("ECM com EDC inválido: imagem corrompida.")
+    return total
+
+
+def _tamanho_ecm(caminho: str | Path) -> int:
+    total = 0
+    with open(caminho, "rb") as entrada:
+        _checar_magico_ecm(entrada)
+        while True:
+            tipo, quantidade = _ler_registro_ecm(entrada)
+            if not quantidade:
+                return total
+            if tipo == 0:
+                guardado, gerado = quantidade, quantidade
+            else:
+                guardado = quantidade * _SETORES_ECM[tipo][0]
+                gerado = quantidade * _SETORES_ECM[tipo][1]
+            entrada.seek(guardado, os.SEEK_CUR)
+            total += gerado
+
+
+def _ler_varint(dados: bytes, posicao: int) -> tuple[int, int]:
+    valor = 0
+    for deslocamento in range(0, 63, 7):
+        if posicao >= len(dados):
+            break
+        byte = dados[posicao]
+        posicao += 1
+        valor |= (byte & 0x7F) << deslocamento
+        if not byte & 0x80:
+            return valor, posicao
+    raise ValueError("Índice xz corrompido.")
+
+
+def _tamanho_xz(caminho: str | Path) -> int:
+    """Soma os tamanhos descomprimidos do índice de cada stream, de trás para frente."""
+    total = 0
+    with open(caminho, "rb") as entrada:
+        fim = entrada.seek(0, os.SEEK_END)
+        while fim > 0:
+            if fim < 24:
+                raise ValueError("Arquivo xz inválido.")
+            entrada.seek(fim - 4)
+            if entrada.read(4) == bytes(4):
+                fim -= 4  # Stream Padding
+                continue
+            entrada.seek(fim - 12)
+            rodape = entrada.read(12)
+            if rodape[10:] != b"YZ":
+                raise ValueError("Arquivo xz inválido.")
+            tamanho_indice = (int.from_bytes(rodape[4:8], "little") + 1) * 4
+            inicio_indice = fim - 12 - tamanho_indice
+            if inicio_indice < 12:
+                raise ValueError("Índice xz corrompido.")
+            entrada.seek(inicio_indice)
+            indice = entrada.read(tamanho_indice)
+            if indice[0] != 0:
+                raise ValueError("Índice xz corrompido.")
+            registros, posicao = _ler_varint(indice, 1)
+            blocos = 0
+            for _ in range(registros):
+                sem_preenchimento, posicao = _ler_varint(indice, posicao)
+                descomprimido, posicao = _ler_varint(indice, posicao)
+                blocos += (sem_preenchimento + 3) // 4 * 4
+                total += descomprimido
+            fim = inicio_indice - blocos - 12
+    return total
+
+
+def _membro_zip(arquivo: zipfile.ZipFile, caminho: str | Path) -> zipfile.ZipInfo:
+    membros = [info for info in arquivo.infolist() if not info.is_dir()]
+    esperado = nome_descomprimido(caminho)
+    for info in membros:
+        if Path(info.filename).name == esperado:
+            return info
+    if len(membros) == 1:
+        return membros[0]
+    raise ValueError(f"{Path(caminho).name}: não contém {esperado}.")
+
+
+def tamanho_descomprimido(caminho: str | Path) -> int:
+    """Tamanho do BIN decodificado; para arquivos comuns, o próprio tamanho."""
+    sufixo = Path(caminho).suffix.lower()
+    if sufixo == ".ecm":
+        return _tamanho_ecm(caminho)
+    if sufixo == ".gz":
+        # ISIZE do gzip: módulo 2**32, o bastante para imagens de CD.
+        with open(caminho, "rb") as entrada:
+            entrada.seek(-4, os.SEEK_END)
+            return int.from_bytes(entrada.read(4), "little")
+    if sufixo == ".xz":
+        return _tamanho_xz(caminho)
+    if sufixo == ".zip":
+        try:
+            with zipfile.ZipFile(caminho) as arquivo:
+                return _membro_zip(arquivo, caminho).file_size
+        except zipfile.BadZipFile as exc:
+            raise ValueError(f"{Path(caminho).name}: {exc}") from None
+    return os.path.getsize(caminho)
+
+
+def decodificar(caminho: str | Path, saida: BinaryIO) -> int:
+    """Escreve o BIN decodificado em ``saida``; devolve quantos bytes gerou."""
+    sufixo = Path(caminho).suffix.lower()
+    if sufixo == ".ecm":
+        with open(caminho, "rb") as entrada:
+            return decodificar_ecm(io.BufferedReader(entrada, TAMANHO_BLOCO), saida)
+    try:
+        with contextlib.ExitStack() as pilha:
+            if sufixo == ".gz":
+                entrada = pilha.enter_context(gzip.open(caminho, "rb"))
+            elif sufixo == ".xz":
+                entrada = pilha.enter_context(lzma.open(caminho, "rb"))
+            elif sufixo == ".zip":
+                arquivo = pilha.enter_context(zipfile.ZipFile(caminho))
+                entrada = pilha.enter_context(arquivo.open(_membro_zip(arquivo, caminho)))
+            else:
+                entrada = pilha.enter_context(open(caminho, "rb"))
+            total = 0
+            while bloco := entrada.read(TAMANHO_BLOCO):
+                saida.write(bloco)
+                total += len(bloco)
+            return total
+    except (EOFError, gzip.BadGzipFile, lzma.LZMAError, zipfile.BadZipFile) as exc:
+        raise ValueError(f"{Path(caminho).name}: {exc}") from None
+
+
+class LeitorDescomprimido(io.RawIOBase):
+    """Lê o BIN decodificado por um processo à parte.
+
+    O processo escreve num pipe; o buffer limitado do pipe segura a
+    decodificação quando quem lê (cópia, hash) fica para trás.
+    """
+
+    def __init__(self, caminho: str | Path) -> None:
+        super().__init__()
+        self.caminho = Path(caminho)
+        self._processo = subprocess.Popen(
+            [sys.executable, "-m", "gravador_cdrdao.imagem_comprimida", str(caminho)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        lidos = self._processo.stdout.readinto(buffer)
+        if not lidos:
+            self._concluir()
+        return lidos
+
+    def close(self) -> None:
+        if not self.closed and self._processo.poll() is None:
+            self._processo.kill()
+        self._processo.wait()
+        self._processo.stdout.close()
+        self._processo.stderr.close()
+        super().close()
+
+    def _concluir(self) -> None:
+        erro = self._processo.stderr.read().decode(errors="replace").strip()
+        if self._processo.wait() != 0:
+            raise ValueError(f"Falha ao decodificar {self.caminho.name}: {erro}")
+
+
+def abrir_imagem(caminho: str | Path) -> BinaryIO:
+    """Abre o BIN para leitura sequencial, decodificando se estiver comprimido."""
+    if comprimida(caminho):
+        return LeitorDescomprimido(caminho)
+    return open(caminho, "rb", buffering=0)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Decodifica um BIN comprimido.")
+    parser.add_argument("arquivo")
+    parser.add_argument("destino", nargs="?", help="Padrão: saída padrão.")
+    args = parser.parse_args(argv)
+    try:
+        if args.destino:
+            with open(args.destino, "wb") as saida:
+                decodificar(args.arquivo, saida)
+        else:
+            decodificar(args.arquivo, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
+    except (OSError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
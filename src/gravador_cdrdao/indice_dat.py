@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import tempfile
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from gravador_cdrdao.diretorios import diretorio_cache
+from gravador_cdrdao.hashes_imagem import CacheHashes, calcular_hashes_cue
+from gravador_cdrdao.parser_cue import CueSheet
+
+_MAGICO = b"GCDAT001"
+# magico, quantidade de registros, quantidade de títulos
+_CABECALHO = struct.Struct("<8sQQ")
+# tamanho, crc32, sha1, índice do título; ordenado por (tamanho, crc32)
+_REGISTRO = struct.Struct("<QI20sI")
+_DESLOCAMENTO = struct.Struct("<Q")
+_ELEMENTOS_JOGO = ("game", "machine")
+
+
+@dataclass
+class CorrespondenciaCue:
+    titulo: str | None
+    arquivos: dict[str, str | None]
+
+
+def caminho_indice_padrao() -> Path:
+    return diretorio_cache() / "dat.idx"
+
+
+def _ler_roms(caminho_dat: Path) -> Iterable[tuple[str, int, int, bytes]]:
+    titulo = ""
+    raiz = None
+    for evento, elemento in ET.iterparse(caminho_dat, events=("start", "end")):
+        if evento == "start":
+            if raiz is None:
+                raiz = elemento
+            elif elemento.tag in _ELEMENTOS_JOGO:
+                titulo = elemento.get("name", "")
+            continue
+        if elemento.tag == "rom":
+            tamanho = elemento.get("size")
+            crc = elemento.get("crc")
+            sha1 = elemento.get("sha1")
+            if tamanho and crc:
+                sha1_bytes = bytes.fromhex(sha1) if sha1 else bytes(20)
+                yield titulo, int(tamanho), int(crc, 16), sha1_bytes
+        elif elemento.tag in _ELEMENTOS_JOGO and raiz is not None:
+            # Descarta jogos já lidos para manter a memória constante.
+            raiz.clear()
+
+
+def construir_indice(caminhos_dat: Iterable[Path], destino: Path) -> int:
+    titulos: dict[str, int] = {}
+    registros: list[tuple[int, int, bytes, int]] = []
+    for caminho_dat in caminhos_dat:
+        for titulo, tamanho, crc, sha1 in _ler_roms(Path(caminho_dat)):
+            indice_titulo = titulos.setdefault(titulo, len(titulos))
+            registros.append((tamanho, crc, sha1, indice_titulo))
+    registros.sort()
+
+    nomes = [titulo.encode("utf-8") for titulo in titulos]
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=destino.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as saida:
+        saida.write(_CABECALHO.pack(_MAGICO, len(registros), len(nomes)))
+        for registro in registros:
+            saida.write(_REGISTRO.pack(*registro))
+        deslocamento = 0
+        for nome in nomes:
+            saida.write(_DESLOCAMENTO.pack(deslocamento))
+            deslocamento += len(nome)
+        saida.write(_DESLOCAMENTO.pack(deslocamento))
+        for nome in nomes:
+            saida.write(nome)
+    os.replace(temporario, destino)
+    return len(registros)
+
+
+class IndiceDat:
+    """Índice DAT mapeado em memória; consultas por busca binária."""
+
+    def __init__(self, caminho: Path) -> None:
+        self.caminho = caminho
+        with open(caminho, "rb") as arquivo:
+            self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, self.quantidade, self._quantidade_titulos = _CABECALHO.unpack_from(self._mapa, 0)
+        if magico != _MAGICO:
+            self._mapa.close()
+            raise ValueError(f"Índice DAT inválido: {caminho}")
+        self._inicio_registros = _CABECALHO.size
+        self._inicio_deslocamentos = self._inicio_registros + self.quantidade * _REGISTRO.size
+        self._inicio_nomes = (
+            self._inicio_deslocamentos + (self._quantidade_titulos + 1) * _DESLOCAMENTO.size
+        )
+
+    def fechar(self) -> None:
+        self._mapa.close()
+
+    def _registro(self, posicao: int) -> tuple[int, int, bytes, int]:
+        return _REGISTRO.unpack_from(self._mapa, self._inicio_registros + posicao * _REGISTRO.size)
+
+    def _titulo(self, indice: int) -> str:
+        base = self._inicio_deslocamentos + indice * _DESLOCAMENTO.size
+        (inicio,) = _DESLOCAMENTO.unpack_from(self._mapa, base)
+        (fim,) = _DESLOCAMENTO.unpack_from(self._mapa, base + _DESLOCAMENTO.size)
+        return self._mapa[self._inicio_nomes + inicio : self._inicio_nomes + fim].decode("utf-8")
+
+    def buscar(self, tamanho: int, crc32: int, sha1: bytes | None = None) -> list[str]:
+        chave = (tamanho, crc32)
+        baixo, alto = 0, self.quantidade
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            if self._registro(meio)[:2] < chave:
+                baixo = meio + 1
+            else:
+                alto = meio
+        titulos = []
+        posicao = baixo
+        while posicao < self.quantidade:
+            reg_tamanho, reg_crc, reg_sha1, indice_titulo = self._registro(posicao)
+            if (reg_tamanho, reg_crc) != chave:
+                break
+            if sha1 is None or reg_sha1 == sha1 or reg_sha1 == bytes(20):
+                titulos.append(self._titulo(indice_titulo))
+            posicao += 1
+        return titulos
+
+    def corresponder(self, cue: CueSheet, cache: CacheHashes | None = None) -> CorrespondenciaCue:
+        hashes = calcular_hashes_cue(cue, cache)
+        arquivos: dict[str, str | None] = {}
+        comuns: set[str] | None = None
+        for caminho, item in hashes.items():
+            titulos = self.buscar(item.tamanho, int(item.crc32, 16), bytes.fromhex(item.sha1))
+            arquivos[caminho] = titulos[0] if titulos else None
+            comuns = set(titulos) if comuns is None else comuns & set(titulos)
+        titulo = min(comuns) if comuns else None
+        return CorrespondenciaCue(titulo=titulo, arquivos=arquivos)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import heapq
+import os
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+LIMITE_SUGESTOES = 5
+PESO_EXTENSAO = 0.3
+PESO_FAIXA = 0.5
+PESO_TAMANHO = 0.4
+
+_RE_FAIXA = re.compile(r"\(\s*track\s*0*(\d+)\s*\)", re.I)
+_RE_SEPARADORES = re.compile(r"[^0-9a-z]+")
+
+
+@dataclass(frozen=True)
+class ArquivoPasta:
+    nome: str
+    extensao: str
+    tamanho: int
+    faixa: int | None
+    trigramas: frozenset[str]
+
+
+@dataclass(frozen=True)
+class Candidato:
+    nome: str
+    pontuacao: float
+
+
+def numero_faixa(nome: str) -> int | None:
+    if match := _RE_FAIXA.search(nome):
+        return int(match.group(1))
+    return None
+
+
+def _trigramas(nome: str) -> frozenset[str]:
+    # "(Track N)" é pontuado à parte; fora dos trigramas não domina a similaridade.
+    base = _RE_FAIXA.sub(" ", Path(nome).stem.lower())
+    base = _RE_SEPARADORES.sub(" ", base).strip()
+    texto = f"  {base} "
+    return frozenset(texto[i : i + 3] for i in range(len(texto) - 2))
+
+
+class IndiceNomes:
+    """Índice de trigramas dos arquivos de uma pasta, montado uma única vez."""
+
+    def __init__(self, pasta: Path) -> None:
+        self.arquivos: list[ArquivoPasta] = []
+        self._por_trigrama: dict[str, list[int]] = defaultdict(list)
+        self._por_extensao: dict[str, list[int]] = defaultdict(list)
+        with os.scandir(pasta) as entradas:
+            for entrada in entradas:
+                if not entrada.is_file():
+                    continue
+                arquivo = ArquivoPasta(
+                    nome=entrada.name,
+                    extensao=Path(entrada.name).suffix.lower(),
+                    tamanho=entrada.stat().st_size,
+                    faixa=numero_faixa(entrada.name),
+                    trigramas=_trigramas(entrada.name),
+                )
+                posicao = len(self.arquivos)
+                self.arquivos.append(arquivo)
+                for trigrama in arquivo.trigramas:
+                    self._por_trigrama[trigrama].append(posicao)
+                self._por_extensao[arquivo.extensao].append(posicao)
+        self.nomes = {arquivo.nome for arquivo in self.arquivos}
+
+    def __contains__(self, nome: str) -> bool:
+        return nome in self.nomes
+
+    def candidatos(
+        self,
+        nome: str,
+        tamanho_setor: int | None = None,
+        tamanho_minimo: int = 0,
+        faixa: int | None = None,
+        limite: int = LIMITE_SUGESTOES,
+    ) -> list[Candidato]:
+        """Melhores arquivos para ``nome``, do mais provável ao menos provável.
+
+        ``tamanho_setor`` e ``tamanho_minimo`` vêm do layout das tracks do CUE;
+        ``faixa`` é o número da primeira track do FILE.
+        """
+        consulta = _trigramas(nome)
+        extensao = Path(nome).suffix.lower()
+        faixa = faixa if faixa is not None else numero_faixa(nome)
+        comuns: Counter[int] = Counter()
+        for trigrama in consulta:
+            comuns.update(self._por_trigrama.get(trigrama, ()))
+        if len(comuns) < limite:
+            for posicao in self._por_extensao.get(extensao, ()):
+                comuns.setdefault(posicao, 0)
+
+        def pontuar(posicao: int) -> float:
+            arquivo = self.arquivos[posicao]
+            compartilhados = comuns[posicao]
+            uniao = len(consulta) + len(arquivo.trigramas) - compartilhados
+            pontuacao = compartilhados / uniao if uniao else 0.0
+            if arquivo.extensao == extensao:
+                pontuacao += PESO_EXTENSAO
+            if faixa is not None and arquivo.faixa is not None:
+                pontuacao += PESO_FAIXA if arquivo.faixa == faixa else -PESO_FAIXA
+            if tamanho_setor:
+                compativel = (
+                    arquivo.tamanho % tamanho_setor == 0 and arquivo.tamanho >= tamanho_minimo
+                )
+                pontuacao += PESO_TAMANHO if compativel else -PESO_TAMANHO
+            return pontuacao
+
+        pontuados = ((pontuar(posicao), posicao) for posicao in comuns)
+        melhores = heapq.nlargest(limite, pontuados)
+        return [
+            Candidato(nome=self.arquivos[posicao].nome, pontuacao=pontuacao)
+            for pontuacao, posicao in melhores
+            if pontuacao > 0
+        ]
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import itertools
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable
+
+from gravador_cdrdao.supervisor_processos import SupervisorProcessos, supervisor_padrao
+
+_RE_BLOCOS = re.compile(r"\((\d+)\s+blocks", re.I)
+_RE_VELOCIDADES = re.compile(r"(\d+)\s*X", re.I)
+_contador_consultas = itertools.count(1)
+
+
+@dataclass
+class InfoDispositivo:
+    caminho: str
+    fabricante: str = ""
+    modelo: str = ""
+    revisao: str = ""
+    midia_presente: bool = False
+    regravavel: bool | None = None
+    vazia: bool | None = None
+    anexavel: bool | None = None
+    # Capacidades em setores de 2048 bytes ("blocks" no disk-info).
+    capacidade_total: int = 0
+    capacidade_restante: int = 0
+    velocidade_max_x: int = 0
+    texto: str = ""
+
+
+def _campos(texto: str) -> dict[str, str]:
+    campos: dict[str, str] = {}
+    for linha in texto.splitlines():
+        chave, separador, valor = linha.partition(":")
+        if separador and chave.strip():
+            campos.setdefault(chave.strip().lower(), valor.strip())
+    return campos
+
+
+def _sim_nao(valor: str | None) -> bool | None:
+    if valor is None:
+        return None
+    return valor.lower().startswith("yes")
+
+
+def _blocos(valor: str | None) -> int:
+    if valor and (match := _RE_BLOCOS.search(valor)):
+        return int(match.group(1))
+    return 0
+
+
+def interpretar_inquiry(texto: str, info: InfoDispositivo) -> None:
+    campos = _campos(texto)
+    info.fabricante = campos.get("vendor", info.fabricante)
+    info.modelo = campos.get("product", info.modelo)
+    info.revisao = campos.get("revision", info.revisao)
+
+
+def interpretar_disk_info(texto: str, info: InfoDispositivo) -> None:
+    campos = _campos(texto)
+    info.regravavel = _sim_nao(campos.get("cd-rw"))
+    info.vazia = _sim_nao(campos.get("cd-r empty"))
+    info.anexavel = _sim_nao(campos.get("appendable"))
+    info.capacidade_total = _blocos(campos.get("total capacity"))
+    info.capacidade_restante = _blocos(campos.get("remaining capacity"))
+    velocidades = [int(v) for v in _RE_VELOCIDADES.findall(campos.get("recording speed", ""))]
+    info.velocidade_max_x = max(velocidades, default=0)
+    info.midia_presente = any(
+        valor is not None for valor in (info.regravavel, info.vazia, info.anexavel)
+    )
+
+
+def formatar_info(info: InfoDispositivo) -> str:
+    linhas = [f"Drive: {info.fabricante} {info.modelo} {info.revisao}".rstrip()]
+    if not info.midia_presente:
+        linhas.append("Mídia: nenhuma detectada")
+    else:
+        tipo = "CD-RW" if info.regravavel else "CD-R"
+        estado = "vazia" if info.vazia else ("anexável" if info.anexavel else "fechada")
+        linhas.append(f"Mídia: {tipo} {estado}")
+        linhas.append(
+            f"Capacidade: {info.capacidade_restante} de {info.capacidade_total} setores livres"
+        )
+        if info.velocidade_max_x:
+            linhas.append(f"Velocidade máxima da mídia: {info.velocidade_max_x}x")
+    return "\n".join(linhas) + "\n\n" + info.texto
+
+
+class ConsultorInfoDrive:
+    """Consulta ``cdrdao inquiry`` e ``disk-info`` sem bloquear quem chama.
+
+    Os resultados ficam em cache por dispositivo até ``invalidar``; o callback
+    é chamado na thread do supervisor (ou na de quem chamou, em acerto de cache).
+    """
+
+    def __init__(
+        self, supervisor: SupervisorProcessos | None = None, programa: list[str] | None = None
+    ) -> None:
+        self._supervisor = supervisor or supervisor_padrao()
+        self._programa = programa or ["cdrdao"]
+        self._trava = threading.Lock()
+        self._cache: dict[str, InfoDispositivo] = {}
+        self._aguardando: dict[str, list[Callable[[InfoDispositivo], None]]] = {}
+        # Consultas em andamento invalidadas no meio do caminho não vão ao cache.
+        self._obsoletos: set[str] = set()
+
+    def em_cache(self, caminho: str) -> InfoDispositivo | None:
+        with self._trava:
+            return self._cache.get(caminho)
+
+    def invalidar(self, caminho: str | None = None) -> None:
+        with self._trava:
+            if caminho is None:
+                self._cache.clear()
+                self._obsoletos.update(self._aguardando)
+            else:
+                self._cache.pop(caminho, None)
+                if caminho in self._aguardando:
+                    self._obsoletos.add(caminho)
+
+    def consultar(
+        self, caminho: str, ao_concluir: Callable[[InfoDispositivo], None]
+    ) -> None:
+        with self._trava:
+            info = self._cache.get(caminho)
+            if info is None:
+                aguardando = self._aguardando.setdefault(caminho, [])
+                aguardando.append(ao_concluir)
+                if len(aguardando) > 1:
+                    return
+        if info is not None:
+            ao_concluir(info)
+            return
+        info = InfoDispositivo(caminho=caminho)
+        self._executar(info, "inquiry", interpretar_inquiry, self._consultar_midia)
+
+    def consultar_todos(
+        self, caminhos: list[str], ao_concluir: Callable[[InfoDispositivo], None]
+    ) -> None:
+        # Todas as consultas entram no supervisor de uma vez e rodam em paralelo.
+        for caminho in caminhos:
+            self.consultar(caminho, ao_concluir)
+
+    def _consultar_midia(self, info: InfoDispositivo) -> None:
+        self._executar(info, "disk-info", interpretar_disk_info, self._concluir)
+
+    def _executar(
+        self,
+        info: InfoDispositivo,
+        subcomando: str,
+        interpretar: Callable[[str, InfoDispositivo], None],
+        proximo: Callable[[InfoDispositivo], None],
+    ) -> None:
+        linhas: list[str] = []
+
+        def ao_fim(codigo: int, falha: str | None) -> None:
+            texto = falha if falha is not None else "\n".join(linhas)
+            interpretar(texto, info)
+            info.texto += texto + "\n"
+            proximo(info)
+
+        self._supervisor.iniciar(
+            f"info-{next(_contador_consultas)}",
+            [*self._programa, subcomando, "--device", info.caminho],
+            ao_linhas=linhas.extend,
+            ao_fim=ao_fim,
+        )
+
+    def _concluir(self, info: InfoDispositivo) -> None:
+        with self._trava:
+            if info.caminho in self._obsoletos:
+                self._obsoletos.discard(info.caminho)
+            else:
+                self._cache[info.caminho] = info
+            aguardando = self._aguardando.pop(info.caminho, [])
+        for ao_concluir in aguardando:
+            ao_concluir(info)
@@ -6,7 +6,9 @@ from pathlib import Path
 from PySide6 import QtCore, QtGui, QtWidgets
 
 from gravador_cdrdao.dispositivos import DispositivoOptico
+from gravador_cdrdao.registro_log import MAX_LINHAS_PADRAO
 from gravador_cdrdao.requisitos import ResultadoRequisitos
+from gravador_cdrdao.varredura_setores import RelatorioVarredura
 from gravador_cdrdao.viewmodel_principal import ViewModelPrincipal
 
 
@@ -66,6 +68,8 @@ class DialogoAssistenteMismatch(QtWidgets.QDialog):
             linha = QtWidgets.QHBoxLayout()
             linha.addWidget(QtWidgets.QLabel(nome))
             combo = QtWidgets.QComboBox()
+            # Só os melhores candidatos são listados; outro nome pode ser digitado.
+            combo.setEditable(True)
             combo.addItems(lista)
             linha.addWidget(combo)
             layout.addLayout(linha)
@@ -117,26 +121,46 @@ class JanelaPrincipal(QtWidgets.QMainWindow):
         opcoes_layout = QtWidgets.QHBoxLayout()
         self.check_simular = QtWidgets.QCheckBox("Simular antes de gravar")
         self.check_ps1 = QtWidgets.QCheckBox("Modo PS1 recomendado")
+        self.check_verificar = QtWidgets.QCheckBox("Verificar após gravar")
+        self.check_setores = QtWidgets.QCheckBox("Conferir setores ao validar")
+        self.check_setores.setToolTip("Confere sync, cabeçalho e EDC de cada setor de dados")
         self.spin_velocidade = QtWidgets.QSpinBox()
         self.spin_velocidade.setRange(1, 52)
         self.spin_velocidade.setValue(8)
         opcoes_layout.addWidget(self.check_simular)
         opcoes_layout.addWidget(self.check_ps1)
+        opcoes_layout.addWidget(self.check_verificar)
+        opcoes_layout.addWidget(self.check_setores)
         opcoes_layout.addWidget(QtWidgets.QLabel("Velocidade:"))
         opcoes_layout.addWidget(self.spin_velocidade)
+        self.spin_concorrencia = QtWidgets.QSpinBox()
+        self.spin_concorrencia.setRange(0, 32)
+        self.spin_concorrencia.setSpecialValueText("Sem limite")
+        opcoes_layout.addWidget(QtWidgets.QLabel("Drives simultâneos:"))
+        opcoes_layout.addWidget(self.spin_concorrencia)
         layout.addLayout(opcoes_layout)
 
         botoes_layout = QtWidgets.QHBoxLayout()
         self.botao_validar = QtWidgets.QPushButton("Validar")
         self.botao_corrigir = QtWidgets.QPushButton("Corrigir")
+        self.botao_hashes = QtWidgets.QPushButton("Hashes")
+        self.botao_dat = QtWidgets.QPushButton("Importar DAT")
+        self.botao_biblioteca = QtWidgets.QPushButton("Validar biblioteca")
+        self.botao_inventario = QtWidgets.QPushButton("Inventariar drives")
         self.botao_simular = QtWidgets.QPushButton("Simular")
         self.botao_gravar = QtWidgets.QPushButton("Gravar")
+        self.botao_copias = QtWidgets.QPushButton("Gravar em todos os drives")
         self.botao_cancelar = QtWidgets.QPushButton("Cancelar")
         self.botao_apagar = QtWidgets.QPushButton("Apagar CD-RW")
         botoes_layout.addWidget(self.botao_validar)
         botoes_layout.addWidget(self.botao_corrigir)
+        botoes_layout.addWidget(self.botao_hashes)
+        botoes_layout.addWidget(self.botao_dat)
+        botoes_layout.addWidget(self.botao_biblioteca)
+        botoes_layout.addWidget(self.botao_inventario)
         botoes_layout.addWidget(self.botao_simular)
         botoes_layout.addWidget(self.botao_gravar)
+        botoes_layout.addWidget(self.botao_copias)
         botoes_layout.addWidget(self.botao_apagar)
         botoes_layout.addWidget(self.botao_cancelar)
         layout.addLayout(botoes_layout)
@@ -145,8 +169,9 @@ class JanelaPrincipal(QtWidgets.QMainWindow):
         layout.addWidget(self.progress_label)
 
         self.tabs = QtWidgets.QTabWidget()
-        self.tab_logs = QtWidgets.QTextEdit()
+        self.tab_logs = QtWidgets.QPlainTextEdit()
         self.tab_logs.setReadOnly(True)
+        self.tab_logs.setMaximumBlockCount(MAX_LINHAS_PADRAO)
         self.tab_diagnostico = QtWidgets.QTextEdit()
         self.tab_diagnostico.setReadOnly(True)
         self.tab_info = QtWidgets.QTextEdit()
@@ -163,18 +188,28 @@ class JanelaPrincipal(QtWidgets.QMainWindow):
         self.botao_arquivo.clicked.connect(self._selecionar_arquivo)
         self.botao_validar.clicked.connect(self._validar)
         self.botao_corrigir.clicked.connect(self._corrigir)
+        self.botao_hashes.clicked.connect(self._hashes)
+        self.botao_dat.clicked.connect(self._importar_dat)
+        self.botao_biblioteca.clicked.connect(self._validar_biblioteca)
+        self.botao_inventario.clicked.connect(self.viewmodel.preflight_dispositivos)
         self.botao_simular.clicked.connect(self._simular)
         self.botao_gravar.clicked.connect(self._gravar)
-        self.botao_cancelar.clicked.connect(self.viewmodel.cancelar_operacao)
+        self.botao_copias.clicked.connect(self._gravar_copias)
+        self.botao_cancelar.clicked.connect(self._cancelar)
         self.botao_apagar.clicked.connect(self._apagar)
         self.combo_dispositivos.currentIndexChanged.connect(self._atualizar_info_drive)
+        self.spin_concorrencia.valueChanged.connect(
+            self.viewmodel.definir_limite_concorrencia
+        )
 
         self.viewmodel.requisitos_atualizados.connect(self._mostrar_requisitos)
         self.viewmodel.dispositivos_atualizados.connect(self._atualizar_lista)
-        self.viewmodel.log_atualizado.connect(self.tab_logs.setPlainText)
+        self.viewmodel.log_anexado.connect(self.tab_logs.appendPlainText)
         self.viewmodel.diagnostico_atualizado.connect(self.tab_diagnostico.setPlainText)
         self.viewmodel.progresso_atualizado.connect(self.progress_label.setText)
         self.viewmodel.info_drive_atualizada.connect(self.tab_info.setPlainText)
+        self.viewmodel.varredura_concluida.connect(self._mostrar_varredura)
+        self.viewmodel.hashes_calculados.connect(self._mostrar_hashes)
 
     def _mostrar_requisitos(self, resultado: ResultadoRequisitos) -> None:
         if resultado.obrigatorios_pendentes():
@@ -183,11 +218,21 @@ class JanelaPrincipal(QtWidgets.QMainWindow):
             dialogo.exec()
 
     def _atualizar_lista(self, dispositivos: list[DispositivoOptico]) -> None:
+        anterior = self.combo_dispositivos.currentData()
+        self.combo_dispositivos.blockSignals(True)
         self.combo_dispositivos.clear()
         for item in dispositivos:
             texto = f"{item.caminho} - {item.fabricante} {item.modelo}"
             self.combo_dispositivos.addItem(texto, item)
-        if dispositivos:
+            if isinstance(anterior, DispositivoOptico) and item.caminho == anterior.caminho:
+                self.combo_dispositivos.setCurrentIndex(self.combo_dispositivos.count() - 1)
+        self.combo_dispositivos.blockSignals(False)
+        atual = self.combo_dispositivos.currentData()
+        if dispositivos and (
+            not isinstance(anterior, DispositivoOptico)
+            or anterior.caminho != atual.caminho
+            or anterior.setores_midia != atual.setores_midia
+        ):
             self._atualizar_info_drive()
 
     def _selecionar_arquivo(self) -> None:
@@ -201,15 +246,58 @@ class JanelaPrincipal(QtWidgets.QMainWindow):
             self.campo_imagem.setText(caminho)
 
     def _validar(self) -> None:
-        ok, msg = self.viewmodel.validar_cue(self.campo_imagem.text())
+        ok, msg = self.viewmodel.validar_cue(
+            self.campo_imagem.text(), profunda=self.check_setores.isChecked()
+        )
         QtWidgets.QMessageBox.information(self, "Validação", msg)
         if not ok:
             self._abrir_assistente_mismatch()
 
+    def _mostrar_varredura(self, caminho: str, relatorio: RelatorioVarredura) -> None:
+        texto = f"{Path(caminho).name}\n{relatorio.resumo()}"
+        if relatorio.ok:
+            QtWidgets.QMessageBox.information(self, "Setores", texto)
+        else:
+            QtWidgets.QMessageBox.warning(self, "Setores", texto)
+
     def _corrigir(self) -> None:
         ok, msg = self.viewmodel.corrigir_cue(self.campo_imagem.text())
         QtWidgets.QMessageBox.information(self, "Correção", msg)
 
+    def _hashes(self) -> None:
+        ok, msg = self.viewmodel.calcular_hashes(self.campo_imagem.text())
+        if not ok:
+            QtWidgets.QMessageBox.warning(self, "Hashes", msg)
+
+    def _mostrar_hashes(self, ok: bool, texto: str) -> None:
+        if not ok:
+            QtWidgets.QMessageBox.warning(self, "Hashes", texto)
+            return
+        self.tab_info.setPlainText(texto)
+        self.tabs.setCurrentWidget(self.tab_info)
+
+    def _importar_dat(self) -> None:
+        caminhos, _ = QtWidgets.QFileDialog.getOpenFileNames(
+            self, "Importar DAT", "", "DAT (*.dat *.xml)"
+        )
+        if not caminhos:
+            return
+        ok, msg = self.viewmodel.importar_dat(caminhos)
+        if ok:
+            QtWidgets.QMessageBox.information(self, "DAT", msg)
+        else:
+            QtWidgets.QMessageBox.warning(self, "DAT", msg)
+
+    def _validar_biblioteca(self) -> None:
+        raiz = QtWidgets.QFileDialog.getExistingDirectory(self, "Biblioteca de imagens")
+        if not raiz:
+            return
+        ok, msg = self.viewmodel.validar_biblioteca(raiz)
+        if not ok:
+            QtWidgets.QMessageBox.warning(self, "Biblioteca", msg)
+            return
+        self.tabs.setCurrentWidget(self.tab_logs)
+
     def _abrir_assistente_mismatch(self) -> None:
         ok, msg, sugestoes = self.viewmodel.assistente_mismatch(
             self.campo_imagem.text()
@@ -235,9 +323,33 @@ class JanelaPrincipal(QtWidgets.QMainWindow):
         if self.check_ps1.isChecked():
             self.check_simular.setChecked(True)
             self.spin_velocidade.setValue(4)
-        if self.check_simular.isChecked():
-            self.viewmodel.iniciar_simulacao(dev, self.spin_velocidade.value(), cue)
-        self.viewmodel.iniciar_gravacao(dev, self.spin_velocidade.value(), cue)
+        self.viewmodel.iniciar_pipeline(
+            dev,
+            self.spin_velocidade.value(),
+            cue,
+            self.check_simular.isChecked(),
+            self.check_verificar.isChecked(),
+        )
+
+    def _gravar_copias(self) -> None:
+        devs = [
+            data.caminho
+            for indice in range(self.combo_dispositivos.count())
+            if isinstance(data := self.combo_dispositivos.itemData(indice), DispositivoOptico)
+        ]
+        if self.check_ps1.isChecked():
+            self.check_simular.setChecked(True)
+            self.spin_velocidade.setValue(4)
+        self.viewmodel.iniciar_copias(
+            devs,
+            self.spin_velocidade.value(),
+            self.campo_imagem.text(),
+            self.check_simular.isChecked(),
+            self.check_verificar.isChecked(),
+        )
+
+    def _cancelar(self) -> None:
+        self.viewmodel.cancelar_operacao(self._dispositivo_selecionado())
 
     def _apagar(self) -> None:
         dev = self._dispositivo_selecionado()
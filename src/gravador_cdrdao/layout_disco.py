@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from gravador_cdrdao.parser_cue import (
+    SUFIXOS_COMPRIMIDOS,
+    CueSheet,
+    frames_para_tempo,
+    tamanho_setor,
+)
+
+if TYPE_CHECKING:
+    # Só para anotações: info_drive traz asyncio, caro na partida da CLI.
+    from gravador_cdrdao.info_drive import InfoDispositivo
+
+
+@dataclass
+class RegiaoFaixa:
+    numero: str
+    tipo: str
+    caminho: str
+    deslocamento: int
+    setores: int
+    tamanho_setor: int
+    lba_inicial: int
+
+
+@dataclass
+class LayoutDisco:
+    faixas: list[RegiaoFaixa]
+    # PREGAP/POSTGAP gerados pelo gravador, fora dos BINs.
+    setores_gerados: int = 0
+
+    @property
+    def setores_total(self) -> int:
+        return sum(faixa.setores for faixa in self.faixas) + self.setores_gerados
+
+    @property
+    def duracao(self) -> str:
+        return frames_para_tempo(self.setores_total)
+
+
+def _tamanho_arquivo(caminho: str) -> int:
+    if os.path.splitext(caminho)[1].lower() in SUFIXOS_COMPRIMIDOS:
+        # Importado só aqui: a decodificação não entra na partida da CLI.
+        from gravador_cdrdao.imagem_comprimida import tamanho_descomprimido
+
+        return tamanho_descomprimido(caminho)
+    return os.path.getsize(caminho)
+
+
+def mapear_faixas(cue: CueSheet) -> list[RegiaoFaixa]:
+    regioes: list[RegiaoFaixa] = []
+    lba_arquivo = 0
+    # PREGAP/POSTGAP ocupam setores no disco sem estar nos BINs.
+    gerados = 0
+    for arquivo in cue.arquivos:
+        tamanho_arquivo = _tamanho_arquivo(arquivo.caminho)
+        inicios = [
+            min((indice.frames for indice in faixa.indices), default=0)
+            for faixa in arquivo.faixas
+        ]
+        deslocamento = 0
+        setores_arquivo = 0
+        for posicao, faixa in enumerate(arquivo.faixas):
+            tamanho = tamanho_setor(faixa.tipo)
+            gerados += faixa.pregap
+            if posicao + 1 < len(arquivo.faixas):
+                setores = inicios[posicao + 1] - inicios[posicao]
+            else:
+                setores = (tamanho_arquivo - deslocamento) // tamanho
+            regioes.append(
+                RegiaoFaixa(
+                    numero=faixa.numero,
+                    tipo=faixa.tipo.upper(),
+                    caminho=arquivo.caminho,
+                    deslocamento=deslocamento,
+                    setores=setores,
+                    tamanho_setor=tamanho,
+                    lba_inicial=lba_arquivo + gerados + inicios[posicao],
+                )
+            )
+            gerados += faixa.postgap
+            deslocamento += setores * tamanho
+            setores_arquivo = inicios[posicao] + setores
+        lba_arquivo += setores_arquivo
+    return regioes
+
+
+def calcular_layout(cue: CueSheet) -> LayoutDisco:
+    gerados = sum(
+        faixa.pregap + faixa.postgap for arquivo in cue.arquivos for faixa in arquivo.faixas
+    )
+    return LayoutDisco(faixas=mapear_faixas(cue), setores_gerados=gerados)
+
+
+def cabe_na_midia(layout: LayoutDisco, info: InfoDispositivo) -> bool | None:
+    """``None`` quando o drive não informou a capacidade livre."""
+    if not info.midia_presente or not info.capacidade_restante:
+        return None
+    return layout.setores_total <= info.capacidade_restante
+
+
+@dataclass
+class ResultadoCapacidade:
+    """``motivo`` impede o trabalho; ``aviso`` só é informado."""
+
+    motivo: str = ""
+    aviso: str = ""
+    # Drive livre onde a imagem cabe, quando não cabe no pedido.
+    alternativo: str | None = None
+
+
+def checar_capacidade(
+    layout: LayoutDisco,
+    dispositivo: str,
+    infos: list[InfoDispositivo],
+    ocupados: set[str],
+) -> ResultadoCapacidade:
+    """Confere a mídia de ``dispositivo``; se não couber, procura outra livre."""
+    info = next((info for info in infos if info.caminho == dispositivo), None)
+    cabe = None if info is None else cabe_na_midia(layout, info)
+    if cabe is None:
+        return ResultadoCapacidade(
+            aviso=(
+                f"capacidade livre de {dispositivo} desconhecida; os"
+                f" {layout.setores_total} setores ({layout.duracao})"
+                " não foram conferidos"
+            )
+        )
+    if cabe:
+        return ResultadoCapacidade()
+    alternativo = escolher_dispositivo(layout, infos, ocupados)
+    if alternativo is None:
+        return ResultadoCapacidade(
+            motivo=(
+                f"{layout.setores_total} setores ({layout.duracao}) não cabem nos"
+                f" {info.capacidade_restante} livres em {dispositivo}"
+            )
+        )
+    return ResultadoCapacidade(alternativo=alternativo)
+
+
+def escolher_dispositivo(
+    layout: LayoutDisco, infos: list[InfoDispositivo], ocupados: set[str]
+) -> str | None:
+    """Drive livre com mídia vazia onde a imagem cabe, com a menor sobra."""
+    candidatos = [
+        info
+        for info in infos
+        if info.caminho not in ocupados and info.vazia and cabe_na_midia(layout, info)
+    ]
+    if not candidatos:
+        return None
+    return min(candidatos, key=lambda info: info.capacidade_restante).caminho
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import re
+
+TAMANHO_BLOCO = 4096
+
+_RE_QUEBRA = re.compile(rb"\r\n|\r|\n")
+
+
+class DivisorLinhas:
+    """Divide blocos brutos em linhas tanto em ``\\n`` quanto em ``\\r``.
+
+    O cdrdao redesenha o status de gravação com ``\\r``; tratar o retorno de
+    carro como fim de linha entrega cada atualização assim que ela chega.
+    """
+
+    def __init__(self, codificacao: str = "utf-8") -> None:
+        self._codificacao = codificacao
+        self._resto = b""
+        self._terminou_em_cr = False
+
+    def alimentar(self, bloco: bytes) -> list[str]:
+        if self._terminou_em_cr and bloco.startswith(b"\n"):
+            bloco = bloco[1:]
+        self._terminou_em_cr = bloco.endswith(b"\r")
+        partes = _RE_QUEBRA.split(self._resto + bloco)
+        self._resto = partes.pop()
+        return [self._decodificar(parte) for parte in partes]
+
+    def finalizar(self) -> list[str]:
+        resto, self._resto = self._resto, b""
+        return [self._decodificar(resto)] if resto else []
+
+    def _decodificar(self, dados: bytes) -> str:
+        return dados.decode(self._codificacao, errors="replace")
+
@@ -1,22 +1,34 @@
 from __future__ import annotations
 
 import dataclasses
-import re
 from pathlib import Path
 from typing import Iterable
 
+from gravador_cdrdao.indice_nomes import LIMITE_SUGESTOES, Candidato, IndiceNomes
 
-@dataclasses.dataclass
+
+@dataclasses.dataclass(slots=True)
 class IndiceCue:
     numero: str
-    tempo: str
+    frames: int
 
+    @property
+    def tempo(self) -> str:
+        return frames_para_tempo(self.frames)
 
-@dataclasses.dataclass
+
+@dataclasses.dataclass(slots=True)
 class FaixaCue:
     numero: str
     tipo: str
     indices: list[IndiceCue]
+    pregap: int = 0
+    postgap: int = 0
+    flags: list[str] = dataclasses.field(default_factory=list)
+    isrc: str = ""
+    titulo: str = ""
+    interprete: str = ""
+    compositor: str = ""
 
 
 @dataclasses.dataclass
@@ -29,11 +41,52 @@ class ArquivoCue:
 @dataclasses.dataclass
 class CueSheet:
     arquivos: list[ArquivoCue]
-
-
-_RE_FILE = re.compile(r'^FILE\s+"(?P<caminho>.+?)"\s+(?P<tipo>\S+)', re.I)
-_RE_TRACK = re.compile(r'^TRACK\s+(?P<numero>\d{2})\s+(?P<tipo>\S+)', re.I)
-_RE_INDEX = re.compile(r'^INDEX\s+(?P<numero>\d{2})\s+(?P<tempo>\d{2}:\d{2}:\d{2})', re.I)
+    catalogo: str = ""
+    arquivo_cdtext: str = ""
+    titulo: str = ""
+    interprete: str = ""
+    compositor: str = ""
+    comentarios: list[str] = dataclasses.field(default_factory=list)
+
+
+FRAMES_POR_SEGUNDO = 75
+# BINs guardados comprimidos; decodificados por ``imagem_comprimida`` antes da gravação.
+SUFIXOS_COMPRIMIDOS = (".ecm", ".gz", ".xz", ".zip")
+TAMANHOS_SETOR = {
+    "AUDIO": 2352,
+    "CDG": 2448,
+    "MODE1/2048": 2048,
+    "MODE1/2352": 2352,
+    "MODE2/2048": 2048,
+    "MODE2/2324": 2324,
+    "MODE2/2336": 2336,
+    "MODE2/2352": 2352,
+    "CDI/2336": 2336,
+    "CDI/2352": 2352,
+}
+
+
+def tamanho_setor(tipo: str) -> int:
+    try:
+        return TAMANHOS_SETOR[tipo.upper()]
+    except KeyError:
+        raise ValueError(f"Tipo de track desconhecido: {tipo}") from None
+
+
+def tempo_para_frames(tempo: str) -> int:
+    partes = tempo.split(":")
+    if len(partes) != 3 or not all(parte.isdigit() for parte in partes):
+        raise ValueError(f"Tempo inválido: {tempo}")
+    minutos, segundos, frames = (int(parte) for parte in partes)
+    if segundos >= 60 or frames >= FRAMES_POR_SEGUNDO:
+        raise ValueError(f"Tempo inválido: {tempo}")
+    return (minutos * 60 + segundos) * FRAMES_POR_SEGUNDO + frames
+
+
+def frames_para_tempo(frames: int) -> str:
+    segundos, frame = divmod(frames, FRAMES_POR_SEGUNDO)
+    minutos, segundo = divmod(segundos, 60)
+    return f"{minutos:02d}:{segundo:02d}:{frame:02d}"
 
 
 def _normalizar_aspas(texto: str) -> str:
@@ -57,56 +110,136 @@ def corrigir_conteudo_cue(conteudo: str) -> str:
     return _normalizar_finais_linha(_remover_bom(_normalizar_aspas(conteudo)))
 
 
+def _texto(valor: str) -> str:
+    valor = valor.strip()
+    if len(valor) >= 2 and valor[0] == valor[-1] == '"':
+        return valor[1:-1]
+    return valor
+
+
+def _numero(valor: str, comando: str) -> str:
+    if not valor.isdigit():
+        raise ValueError(f"{comando} com número inválido: {valor}")
+    return f"{int(valor):02d}"
+
+
+def _dividir_file(resto: str) -> tuple[str, str]:
+    """Nome e tipo de uma linha FILE; separados por qualquer espaço em branco."""
+    resto = resto.strip()
+    if resto.startswith('"') and (fim := resto.find('"', 1)) > 0:
+        return resto[1:fim], resto[fim + 1 :].strip()
+    partes = resto.rsplit(None, 1)
+    if len(partes) < 2:
+        return "", ""
+    return _texto(partes[0]), partes[1]
+
+
+def _interpretar_file(resto: str) -> ArquivoCue:
+    caminho, tipo = _dividir_file(resto)
+    if not caminho.strip() or not tipo:
+        raise ValueError(f"FILE inválido: {resto}")
+    return ArquivoCue(caminho=caminho, tipo=tipo, faixas=[])
+
+
 def carregar_cue(caminho: Path) -> CueSheet:
     conteudo = caminho.read_text(encoding="utf-8", errors="replace")
-    conteudo = corrigir_conteudo_cue(conteudo)
+    return interpretar_cue(corrigir_conteudo_cue(conteudo))
+
 
-    arquivos: list[ArquivoCue] = []
+def interpretar_cue(conteudo: str) -> CueSheet:
+    cue = CueSheet(arquivos=[])
     arquivo_atual: ArquivoCue | None = None
     faixa_atual: FaixaCue | None = None
 
-    for linha_bruta in conteudo.splitlines():
-        linha = linha_bruta.strip()
-        if not linha:
-            continue
-        if match := _RE_FILE.match(linha):
-            arquivo_atual = ArquivoCue(
-                caminho=match.group("caminho"),
-                tipo=match.group("tipo"),
-                faixas=[],
-            )
-            arquivos.append(arquivo_atual)
-            faixa_atual = None
+    for numero_linha, linha in enumerate(conteudo.splitlines(), start=1):
+        partes = linha.split(None, 1)
+        if not partes:
             continue
-        if match := _RE_TRACK.match(linha):
-            if arquivo_atual is None:
-                raise ValueError("TRACK encontrado antes de FILE.")
-            faixa_atual = FaixaCue(
-                numero=match.group("numero"),
-                tipo=match.group("tipo"),
-                indices=[],
-            )
-            arquivo_atual.faixas.append(faixa_atual)
-            continue
-        if match := _RE_INDEX.match(linha):
-            if faixa_atual is None:
-                raise ValueError("INDEX encontrado antes de TRACK.")
-            faixa_atual.indices.append(
-                IndiceCue(numero=match.group("numero"), tempo=match.group("tempo"))
-            )
-            continue
-
-    if not arquivos:
+        comando = partes[0].upper()
+        resto = partes[1].strip() if len(partes) > 1 else ""
+        try:
+            if comando == "INDEX":
+                if faixa_atual is None:
+                    raise ValueError("INDEX encontrado antes de TRACK.")
+                argumentos = resto.split()
+                if len(argumentos) != 2:
+                    raise ValueError(f"INDEX inválido: {resto}")
+                faixa_atual.indices.append(
+                    IndiceCue(
+                        numero=_numero(argumentos[0], comando),
+                        frames=tempo_para_frames(argumentos[1]),
+                    )
+                )
+            elif comando == "TRACK":
+                if arquivo_atual is None:
+                    raise ValueError("TRACK encontrado antes de FILE.")
+                argumentos = resto.split()
+                if len(argumentos) != 2:
+                    raise ValueError(f"TRACK inválido: {resto}")
+                faixa_atual = FaixaCue(
+                    numero=_numero(argumentos[0], comando), tipo=argumentos[1], indices=[]
+                )
+                arquivo_atual.faixas.append(faixa_atual)
+            elif comando == "FILE":
+                arquivo_atual = _interpretar_file(resto)
+                cue.arquivos.append(arquivo_atual)
+                faixa_atual = None
+            elif comando in ("PREGAP", "POSTGAP"):
+                if faixa_atual is None:
+                    raise ValueError(f"{comando} encontrado antes de TRACK.")
+                if comando == "PREGAP":
+                    faixa_atual.pregap = tempo_para_frames(resto)
+                else:
+                    faixa_atual.postgap = tempo_para_frames(resto)
+            elif comando == "FLAGS":
+                if faixa_atual is None:
+                    raise ValueError("FLAGS encontrado antes de TRACK.")
+                faixa_atual.flags = [flag.upper() for flag in resto.split()]
+            elif comando == "ISRC":
+                if faixa_atual is None:
+                    raise ValueError("ISRC encontrado antes de TRACK.")
+                faixa_atual.isrc = _texto(resto)
+            elif comando in ("TITLE", "PERFORMER", "SONGWRITER"):
+                alvo = faixa_atual if faixa_atual is not None else cue
+                atributo = {
+                    "TITLE": "titulo",
+                    "PERFORMER": "interprete",
+                    "SONGWRITER": "compositor",
+                }[comando]
+                setattr(alvo, atributo, _texto(resto))
+            elif comando == "REM":
+                cue.comentarios.append(resto)
+            elif comando == "CATALOG":
+                cue.catalogo = _texto(resto)
+            elif comando == "CDTEXTFILE":
+                cue.arquivo_cdtext = _texto(resto)
+        except ValueError as exc:
+            raise ValueError(f"Linha {numero_linha}: {exc}") from None
+
+    if not cue.arquivos:
         raise ValueError("Nenhum arquivo FILE encontrado.")
-    return CueSheet(arquivos=arquivos)
+    return cue
+
+
+def localizar_comprimida(caminho: str | Path) -> Path | None:
+    """Versão comprimida de um BIN (``jogo.bin`` -> ``jogo.bin.ecm``), se existir."""
+    caminho = Path(caminho)
+    for sufixo in SUFIXOS_COMPRIMIDOS:
+        candidato = caminho.with_name(caminho.name + sufixo)
+        if candidato.is_file():
+            return candidato
+    return None
 
 
 def resolver_caminhos_relativos(cue: CueSheet, base: Path) -> CueSheet:
+    """Caminhos absolutos; um BIN ausente com versão comprimida passa a apontar para ela."""
     arquivos = []
     for arquivo in cue.arquivos:
         caminho = Path(arquivo.caminho)
         if not caminho.is_absolute():
             caminho = (base / caminho).resolve()
+        if not caminho.exists() and (comprimida := localizar_comprimida(caminho)):
+            caminho = comprimida
         arquivos.append(
             ArquivoCue(
                 caminho=str(caminho),
@@ -114,28 +247,117 @@ def resolver_caminhos_relativos(cue: CueSheet, base: Path) -> CueSheet:
                 faixas=arquivo.faixas,
             )
         )
-    return CueSheet(arquivos=arquivos)
+    return dataclasses.replace(cue, arquivos=arquivos)
 
 
 def listar_arquivos_cue(cue: CueSheet) -> list[str]:
     return [arquivo.caminho for arquivo in cue.arquivos]
 
 
-def detectar_mismatch_nomes(cue: CueSheet, pasta: Path) -> dict[str, list[str]]:
-    existentes = {p.name: p for p in pasta.iterdir() if p.is_file()}
+def layout_arquivo(arquivo: ArquivoCue) -> tuple[int | None, int]:
+    """Retorna (tamanho de setor comum, tamanho mínimo em bytes) do FILE."""
+    if not arquivo.faixas:
+        return None, 0
+    try:
+        tamanhos = [tamanho_setor(faixa.tipo) for faixa in arquivo.faixas]
+    except ValueError:
+        return None, 0
+    inicios = [
+        min((indice.frames for indice in faixa.indices), default=0) for faixa in arquivo.faixas
+    ]
+    minimo = tamanhos[-1]
+    for posicao in range(len(inicios) - 1):
+        minimo += max(0, inicios[posicao + 1] - inicios[posicao]) * tamanhos[posicao]
+    setor = tamanhos[0] if len(set(tamanhos)) == 1 else None
+    return setor, minimo
+
+
+def _candidatos_arquivo(
+    indice: IndiceNomes, arquivo: ArquivoCue, limite: int
+) -> list[Candidato]:
+    setor, minimo = layout_arquivo(arquivo)
+    # Só um FILE com uma única track corresponde a um "(Track N)".
+    faixa = int(arquivo.faixas[0].numero) if len(arquivo.faixas) == 1 else None
+    nome = Path(arquivo.caminho).name
+    return indice.candidatos(nome, setor, minimo, faixa, limite)
+
+
+def _presente(indice: IndiceNomes, nome: str) -> bool:
+    return nome in indice or any(nome + sufixo in indice for sufixo in SUFIXOS_COMPRIMIDOS)
+
+
+def detectar_mismatch_nomes(
+    cue: CueSheet, pasta: Path, limite: int = LIMITE_SUGESTOES
+) -> dict[str, list[str]]:
+    indice = IndiceNomes(pasta)
     sugestoes: dict[str, list[str]] = {}
     for arquivo in cue.arquivos:
         nome = Path(arquivo.caminho).name
-        if nome not in existentes:
-            sugestoes[nome] = list(existentes.keys())
+        if not _presente(indice, nome):
+            candidatos = _candidatos_arquivo(indice, arquivo, limite)
+            sugestoes[nome] = [candidato.nome for candidato in candidatos]
     return sugestoes
 
 
+def sugerir_mapeamento_automatico(
+    cue: CueSheet, pasta: Path, margem: float = 0.2
+) -> dict[str, str]:
+    """Mapeamento só para os nomes com um candidato claramente melhor."""
+    indice = IndiceNomes(pasta)
+    mapeamento: dict[str, str] = {}
+    usados: set[str] = set()
+    for arquivo in cue.arquivos:
+        nome = Path(arquivo.caminho).name
+        if _presente(indice, nome):
+            continue
+        candidatos = _candidatos_arquivo(indice, arquivo, 2)
+        if not candidatos or candidatos[0].pontuacao < 1.0:
+            continue
+        if len(candidatos) > 1 and candidatos[0].pontuacao - candidatos[1].pontuacao < margem:
+            continue
+        if candidatos[0].nome in usados:
+            continue
+        usados.add(candidatos[0].nome)
+        mapeamento[nome] = candidatos[0].nome
+    return mapeamento
+
+
+@dataclasses.dataclass(frozen=True)
+class EdicaoCue:
+    linha: int
+    antigo: str
+    novo: str
+
+
+def reescrever_nomes(
+    conteudo: str, mapeamento: dict[str, str]
+) -> tuple[str, list[EdicaoCue]]:
+    """Aplica todo o mapeamento numa única passada, só nas linhas FILE.
+
+    BOM e aspas tipográficas são normalizados linha a linha antes de comparar;
+    os finais de linha do arquivo são mantidos.
+    """
+    edicoes: list[EdicaoCue] = []
+    linhas = conteudo.splitlines(keepends=True)
+    for numero, linha in enumerate(linhas):
+        linha = _remover_bom(_normalizar_aspas(linha))
+        recuo = linha[: len(linha) - len(linha.lstrip())]
+        partes = linha.split(None, 1)
+        if len(partes) < 2 or partes[0].upper() != "FILE":
+            continue
+        corpo = partes[1].rstrip("\r\n")
+        fim_linha = partes[1][len(corpo) :]
+        nome, tipo = _dividir_file(corpo)
+        if not tipo or nome not in mapeamento:
+            continue
+        novo_nome = mapeamento[nome]
+        linhas[numero] = f'{recuo}{partes[0]} "{novo_nome}" {tipo}{fim_linha}'
+        edicoes.append(EdicaoCue(linha=numero + 1, antigo=nome, novo=novo_nome))
+    return "".join(linhas), edicoes
+
+
 def aplicar_mapeamento_nomes(conteudo: str, mapeamento: dict[str, str]) -> str:
-    novo = conteudo
-    for antigo, novo_nome in mapeamento.items():
-        novo = re.sub(rf'FILE\s+"{re.escape(antigo)}"', f'FILE "{novo_nome}"', novo)
-    return novo
+    return reescrever_nomes(conteudo, mapeamento)[0]
 
 
 def validar_arquivos_existem(cue: CueSheet) -> list[str]:
@@ -152,6 +374,8 @@ def formatar_sumario(cue: CueSheet) -> str:
         linhas.append(f"Arquivo: {arquivo.caminho} ({arquivo.tipo})")
         for faixa in arquivo.faixas:
             linhas.append(f"  Track {faixa.numero} ({faixa.tipo})")
+            if faixa.pregap:
+                linhas.append(f"    Pregap {frames_para_tempo(faixa.pregap)}")
             for indice in faixa.indices:
                 linhas.append(f"    Index {indice.numero} {indice.tempo}")
     return "\n".join(linhas)
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import ctypes
+import mmap
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from gravador_cdrdao.fila_trabalhos import MODOS_COM_IMAGEM, TrabalhoGravacao
+from gravador_cdrdao.imagem_comprimida import tamanho_descomprimido
+from gravador_cdrdao.parser_cue import carregar_cue, resolver_caminhos_relativos
+from gravador_cdrdao.progresso import BYTES_POR_SEGUNDO_1X
+
+LIMITE_BYTES_PADRAO = 4 * 1024**3
+# Velocidade 0 deixa o cdrdao escolher; para a previsão vale uma velocidade típica.
+VELOCIDADE_ESTIMADA_PADRAO = 8
+# Cada pedido ao kernel cobre um bloco; entre blocos a prioridade é reavaliada.
+BLOCO_PRE_LEITURA = 32 * 1024 * 1024
+
+
+@dataclass
+class EstatisticaPreLeitura:
+    bytes_total: int = 0
+    # Bytes já pedidos ao kernel quando o trabalho começou.
+    bytes_pedidos: int = 0
+    # Medido com mincore no início do trabalho; None quando não dá para medir.
+    bytes_em_memoria: int | None = None
+
+    @property
+    def taxa_acerto(self) -> float | None:
+        if self.bytes_em_memoria is None or not self.bytes_total:
+            return None
+        return self.bytes_em_memoria / self.bytes_total
+
+
+def formatar_estatistica(estatistica: EstatisticaPreLeitura) -> str:
+    total_mib = estatistica.bytes_total / 1024**2
+    taxa = estatistica.taxa_acerto
+    if taxa is None:
+        pedidos_mib = estatistica.bytes_pedidos / 1024**2
+        return f"Pré-leitura: {pedidos_mib:.0f} de {total_mib:.0f} MiB pedidos antes do início"
+    em_memoria_mib = (estatistica.bytes_em_memoria or 0) / 1024**2
+    return (
+        f"Pré-leitura: {taxa:.0%} da imagem já em memória"
+        f" ({em_memoria_mib:.0f} de {total_mib:.0f} MiB)"
+    )
+
+
+@dataclass
+class _Pedido:
+    identificador: str
+    cue: str
+    inicio_previsto: float
+    arquivos: list[tuple[str, int]] | None = None
+    tamanho: int = 0
+    reservado: bool = False
+    iniciado: bool = False
+    # Posição da pré-leitura: índice do arquivo e deslocamento dentro dele.
+    cursor: tuple[int, int] = (0, 0)
+    pedidos: int = 0
+    erro: str = ""
+    concluido: bool = False
+
+
+def tamanho_imagem(caminho_cue: str | Path) -> int:
+    """Soma dos BINs do CUE; 0 quando o CUE não pode ser lido."""
+    caminho_cue = Path(caminho_cue)
+    try:
+        cue = resolver_caminhos_relativos(carregar_cue(caminho_cue), caminho_cue.parent)
+        return sum(tamanho_descomprimido(arquivo.caminho) for arquivo in cue.arquivos)
+    except (OSError, ValueError):
+        return 0
+
+
+def duracao_estimada(trabalho: TrabalhoGravacao, tamanho: int) -> float:
+    """Segundos que as etapas restantes que leem a imagem devem levar no drive."""
+    etapas = (trabalho.modo, *trabalho.etapas_seguintes)
+    com_imagem = sum(etapa in MODOS_COM_IMAGEM for etapa in etapas)
+    por_segundo = BYTES_POR_SEGUNDO_1X * (trabalho.velocidade or VELOCIDADE_ESTIMADA_PADRAO)
+    return com_imagem * tamanho / por_segundo
+
+
+def _libc() -> ctypes.CDLL | None:
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.mincore  # noqa: B018 - só confirma que o símbolo existe
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+_LIBC = _libc()
+
+
+def bytes_em_memoria(caminho: str | Path) -> int | None:
+    """Quantos bytes do arquivo estão no page cache agora (via mincore)."""
+    if _LIBC is None:
+        return None
+    tamanho = os.path.getsize(caminho)
+    if not tamanho:
+        return 0
+    paginas = (tamanho + mmap.PAGESIZE - 1) // mmap.PAGESIZE
+    vetor = (ctypes.c_ubyte * paginas)()
+    with open(caminho, "rb") as arquivo:
+        # ACCESS_COPY só para o ctypes aceitar o buffer; nada é escrito.
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_COPY) as mapa:
+            inicio = ctypes.c_char.from_buffer(mapa)
+            try:
+                endereco = ctypes.c_void_p(ctypes.addressof(inicio))
+                codigo = _LIBC.mincore(endereco, ctypes.c_size_t(tamanho), vetor)
+            finally:
+                del inicio
+    if codigo != 0:
+        return None
+    residentes = paginas - bytes(vetor).count(0)
+    return min(tamanho, residentes * mmap.PAGESIZE)
+
+
+class PreLeitor:
+    """Aquece no page cache os BINs dos trabalhos que ainda esperam na fila.
+
+    Os pedidos ``POSIX_FADV_WILLNEED`` saem numa thread própria, na ordem do
+    início previsto de cada trabalho, enquanto a soma das imagens reservadas
+    couber em ``limite_bytes``. A reserva vale até ``liberar``.
+    """
+
+    def __init__(self, limite_bytes: int = LIMITE_BYTES_PADRAO) -> None:
+        self.limite_bytes = limite_bytes
+        self._pedidos: dict[str, _Pedido] = {}
+        self._reservado = 0
+        self._condicao = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._parar = False
+
+    def agendar(self, identificador: str, cue: str, inicio_previsto: float) -> None:
+        """Inclui o trabalho ou só atualiza seu início previsto."""
+        with self._condicao:
+            pedido = self._pedidos.get(identificador)
+            if pedido is None:
+                self._pedidos[identificador] = _Pedido(identificador, cue, inicio_previsto)
+            else:
+                pedido.inicio_previsto = inicio_previsto
+            self._garantir_thread()
+            self._condicao.notify()
+
+    def iniciar(self, identificador: str) -> EstatisticaPreLeitura | None:
+        """O trabalho começou: encerra sua pré-leitura e mede o que já está em memória."""
+        with self._condicao:
+            pedido = self._pedidos.get(identificador)
+            if pedido is None or pedido.iniciado:
+                return None
+            pedido.iniciado = True
+            arquivos = list(pedido.arquivos or [])
+            estatistica = EstatisticaPreLeitura(pedido.tamanho, pedido.pedidos)
+        if not arquivos:
+            return None
+        em_memoria = 0
+        for caminho, _ in arquivos:
+            try:
+                medidos = bytes_em_memoria(caminho)
+            except (OSError, ValueError):
+                medidos = None
+            if medidos is None:
+                return estatistica
+            em_memoria += medidos
+        estatistica.bytes_em_memoria = em_memoria
+        return estatistica
+
+    def liberar(self, identificador: str) -> None:
+        with self._condicao:
+            pedido = self._pedidos.pop(identificador, None)
+            if pedido is not None and pedido.reservado:
+                self._reservado -= pedido.tamanho
+            self._condicao.notify()
+
+    def parar(self) -> None:
+        with self._condicao:
+            self._parar = True
+            self._condicao.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def _garantir_thread(self) -> None:
+        if self._thread is None:
+            self._parar = False
+            self._thread = threading.Thread(
+                target=self._executar, name="pre-leitura", daemon=True
+            )
+            self._thread.start()
+
+    def _proximo(self) -> _Pedido | None:
+        ativos = sorted(
+            (p for p in self._pedidos.values() if not p.iniciado and not p.concluido),
+            key=lambda p: p.inicio_previsto,
+        )
+        for pedido in ativos:
+            if pedido.arquivos is None or pedido.reservado:
+                return pedido
+            if self._reservado + pedido.tamanho <= self.limite_bytes:
+                return pedido
+            # Quem começa antes tem prioridade: não pula para um trabalho menor.
+            return None
+        return None
+
+    def _executar(self) -> None:
+        while True:
+            with self._condicao:
+                while not self._parar and (pedido := self._proximo()) is None:
+                    self._condicao.wait()
+                if self._parar:
+                    return
+                if pedido.arquivos is not None and not pedido.reservado:
+                    pedido.reservado = True
+                    self._reservado += pedido.tamanho
+            if pedido.arquivos is None:
+                self._interpretar(pedido)
+            else:
+                self._ler_bloco(pedido)
+
+    def _interpretar(self, pedido: _Pedido) -> None:
+        try:
+            caminho_cue = Path(pedido.cue)
+            cue = resolver_caminhos_relativos(carregar_cue(caminho_cue), caminho_cue.parent)
+            arquivos = [(a.caminho, os.path.getsize(a.caminho)) for a in cue.arquivos]
+        except (OSError, ValueError) as exc:
+            with self._condicao:
+                pedido.arquivos, pedido.erro, pedido.concluido = [], str(exc), True
+            return
+        with self._condicao:
+            pedido.arquivos = arquivos
+            pedido.tamanho = sum(tamanho for _, tamanho in arquivos)
+
+    def _ler_bloco(self, pedido: _Pedido) -> None:
+        assert pedido.arquivos is not None
+        indice, deslocamento = pedido.cursor
+        if indice >= len(pedido.arquivos):
+            with self._condicao:
+                pedido.concluido = True
+            return
+        caminho, tamanho = pedido.arquivos[indice]
+        quantidade = min(BLOCO_PRE_LEITURA, tamanho - deslocamento)
+        try:
+            fd = os.open(caminho, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, deslocamento, quantidade, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError as exc:
+            pedido.erro = str(exc)
+        deslocamento += quantidade
+        with self._condicao:
+            pedido.pedidos += quantidade
+            if deslocamento >= tamanho:
+                pedido.cursor = (indice + 1, 0)
+            else:
+                pedido.cursor = (indice, deslocamento)
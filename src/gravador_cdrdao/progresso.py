@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import re
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
+_RE_FAIXA = re.compile(r"Writing track\s+(\d+)", re.I)
+_RE_BUFFER = re.compile(r"buffer\s*([0-9]+%)", re.I)
+# "Wrote 12 of 650 MB (Buffers 100%  97%)." -> FIFO do cdrdao e buffer do drive.
+_RE_ESCRITA = re.compile(
+    r"Wrote\s+(?P<escritos>\d+)\s+of\s+(?P<total>\d+)\s+MB"
+    r"(?:\s*\(Buffers?\s+(?P<fifo>\d+)%(?:\s+(?P<drive>\d+)%)?\))?",
+    re.I,
+)
+
+MAX_EMISSOES_POR_SEGUNDO = 10.0
+MAX_LINHAS_RETIDAS = 500
+SUAVIZACAO_VELOCIDADE = 0.3
+# 1x em CD: 75 setores/s de 2352 bytes.
+BYTES_POR_SEGUNDO_1X = 75 * 2352
+_BYTES_POR_MB = 1024 * 1024
+
+
+@dataclass
+class ProgressoCdrdao:
+    mensagem: str
+    faixa: str | None
+    buffer: str | None
+    mb_escritos: int | None = None
+    mb_total: int | None = None
+    mb_s: float | None = None
+    mb_s_suavizado: float | None = None
+    eta_segundos: float | None = None
+    buffer_drive: int | None = None
+    fifo_host: int | None = None
+
+    @property
+    def velocidade_x(self) -> float | None:
+        if self.mb_s_suavizado is None:
+            return None
+        return self.mb_s_suavizado * _BYTES_POR_MB / BYTES_POR_SEGUNDO_1X
+
+
+class SerieTelemetria:
+    """Amostras de uma gravação em arrays compactos (um valor por coluna).
+
+    Valores desconhecidos de buffer são guardados como ``-1``.
+    """
+
+    def __init__(self) -> None:
+        self.tempo = array("d")
+        self.mb_escritos = array("f")
+        self.mb_s = array("f")
+        self.mb_s_suavizado = array("f")
+        self.buffer_drive = array("b")
+        self.fifo_host = array("b")
+
+    def __len__(self) -> int:
+        return len(self.tempo)
+
+    def adicionar(self, tempo: float, progresso: ProgressoCdrdao) -> None:
+        self.tempo.append(tempo)
+        self.mb_escritos.append(float(progresso.mb_escritos or 0))
+        self.mb_s.append(progresso.mb_s or 0.0)
+        self.mb_s_suavizado.append(progresso.mb_s_suavizado or 0.0)
+        self.buffer_drive.append(-1 if progresso.buffer_drive is None else progresso.buffer_drive)
+        self.fifo_host.append(-1 if progresso.fifo_host is None else progresso.fifo_host)
+
+    def velocidade_media(self) -> float | None:
+        if len(self.tempo) < 2 or self.tempo[-1] <= self.tempo[0]:
+            return None
+        return (self.mb_escritos[-1] - self.mb_escritos[0]) / (self.tempo[-1] - self.tempo[0])
+
+    def buffer_drive_minimo(self) -> int | None:
+        conhecidos = [valor for valor in self.buffer_drive if valor >= 0]
+        return min(conhecidos) if conhecidos else None
+
+    def fifo_host_minimo(self) -> int | None:
+        conhecidos = [valor for valor in self.fifo_host if valor >= 0]
+        return min(conhecidos) if conhecidos else None
+
+
+class AnalisadorProgresso:
+    def __init__(self, relogio: Callable[[], float] = time.monotonic) -> None:
+        self.faixa: str | None = None
+        self.buffer: str | None = None
+        self.serie = SerieTelemetria()
+        self._relogio = relogio
+        self._ultima_amostra: tuple[float, int] | None = None
+        self._mb_s_suavizado: float | None = None
+
+    def analisar(self, linha: str) -> ProgressoCdrdao | None:
+        mensagem = linha.strip()
+        if not mensagem:
+            return None
+        if match := _RE_FAIXA.search(mensagem):
+            self.faixa = match.group(1)
+        if match := _RE_ESCRITA.search(mensagem):
+            return self._analisar_escrita(mensagem, match)
+        if match := _RE_BUFFER.search(mensagem):
+            self.buffer = match.group(1)
+        return ProgressoCdrdao(mensagem=mensagem, faixa=self.faixa, buffer=self.buffer)
+
+    def _analisar_escrita(self, mensagem: str, match: re.Match[str]) -> ProgressoCdrdao:
+        agora = self._relogio()
+        escritos = int(match.group("escritos"))
+        total = int(match.group("total"))
+        fifo = match.group("fifo")
+        drive = match.group("drive")
+        buffer_drive = int(drive) if drive is not None else None
+        if drive is not None or fifo is not None:
+            self.buffer = f"{drive if drive is not None else fifo}%"
+
+        mb_s = None
+        if self._ultima_amostra is not None:
+            tempo_anterior, escritos_anterior = self._ultima_amostra
+            if agora > tempo_anterior and escritos > escritos_anterior:
+                mb_s = (escritos - escritos_anterior) / (agora - tempo_anterior)
+        if mb_s is not None:
+            if self._mb_s_suavizado is None:
+                self._mb_s_suavizado = mb_s
+            else:
+                self._mb_s_suavizado += SUAVIZACAO_VELOCIDADE * (mb_s - self._mb_s_suavizado)
+        if self._ultima_amostra is None or escritos != self._ultima_amostra[1]:
+            self._ultima_amostra = (agora, escritos)
+
+        eta = None
+        if self._mb_s_suavizado:
+            eta = max(total - escritos, 0) / self._mb_s_suavizado
+        progresso = ProgressoCdrdao(
+            mensagem=mensagem,
+            faixa=self.faixa,
+            buffer=self.buffer,
+            mb_escritos=escritos,
+            mb_total=total,
+            mb_s=mb_s,
+            mb_s_suavizado=self._mb_s_suavizado,
+            eta_segundos=eta,
+            buffer_drive=buffer_drive,
+            fifo_host=int(fifo) if fifo is not None else None,
+        )
+        self.serie.adicionar(agora, progresso)
+        return progresso
+
+
+class LimitadorProgresso:
+    """Agrupa atualizações em no máximo ``max_por_segundo`` emissões.
+
+    Atualizações que chegam dentro do intervalo substituem a pendente, de modo
+    que a próxima emissão sempre reflete o estado mais recente.
+    """
+
+    def __init__(
+        self,
+        max_por_segundo: float = MAX_EMISSOES_POR_SEGUNDO,
+        relogio: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._intervalo = 1.0 / max_por_segundo if max_por_segundo > 0 else 0.0
+        self._relogio = relogio
+        self._ultima_emissao: float | None = None
+        self._pendente: ProgressoCdrdao | None = None
+        self.recebidos = 0
+        self.emitidos = 0
+
+    @property
+    def intervalo(self) -> float:
+        return self._intervalo
+
+    def oferecer(self, progresso: ProgressoCdrdao) -> ProgressoCdrdao | None:
+        self.recebidos += 1
+        self._pendente = progresso
+        return self.vencido()
+
+    def vencido(self) -> ProgressoCdrdao | None:
+        if self._pendente is None:
+            return None
+        agora = self._relogio()
+        if self._ultima_emissao is None or agora - self._ultima_emissao >= self._intervalo:
+            return self._emitir(agora)
+        return None
+
+    def pendente(self) -> ProgressoCdrdao | None:
+        if self._pendente is None:
+            return None
+        return self._emitir(self._relogio())
+
+    def _emitir(self, agora: float) -> ProgressoCdrdao | None:
+        progresso, self._pendente = self._pendente, None
+        self._ultima_emissao = agora
+        self.emitidos += 1
+        return progresso
+
+
+class SaidaRetida:
+    def __init__(self, max_linhas: int = MAX_LINHAS_RETIDAS) -> None:
+        self._linhas: deque[str] = deque(maxlen=max_linhas)
+        self.total_linhas = 0
+        self.total_bytes = 0
+
+    def adicionar(self, linha: str) -> None:
+        self._linhas.append(linha.rstrip("\r\n"))
+        self.total_linhas += 1
+        self.total_bytes += len(linha)
+
+    def texto(self) -> str:
+        omitidas = self.total_linhas - len(self._linhas)
+        linhas = list(self._linhas)
+        if omitidas:
+            linhas.insert(0, f"... ({omitidas} linhas anteriores omitidas)")
+        return "\n".join(linhas)
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import os
+import select
+import socket
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from gravador_cdrdao.dispositivos import RAIZ_BLOCOS, DispositivoOptico, ler_dispositivo
+
+EVENTO_ADICIONADO = "adicionado"
+EVENTO_REMOVIDO = "removido"
+EVENTO_MIDIA = "midia"
+INTERVALO_POLLING = 0.5
+_NETLINK_KOBJECT_UEVENT = 15
+_GRUPO_KERNEL = 1
+_TAMANHO_UEVENT = 8192
+
+
+@dataclass(frozen=True)
+class EventoDispositivo:
+    tipo: str
+    dispositivo: DispositivoOptico
+
+
+def interpretar_uevent(mensagem: bytes) -> dict[str, str]:
+    """Converte ``acao@caminho\\0CHAVE=valor\\0...`` do kernel em dicionário."""
+    campos: dict[str, str] = {}
+    for parte in mensagem.split(b"\0"):
+        chave, separador, valor = parte.partition(b"=")
+        if separador:
+            campos[chave.decode(errors="replace")] = valor.decode(errors="replace")
+    return campos
+
+
+def _abrir_netlink() -> socket.socket | None:
+    try:
+        conexao = socket.socket(
+            socket.AF_NETLINK, socket.SOCK_RAW, _NETLINK_KOBJECT_UEVENT
+        )
+        conexao.bind((0, _GRUPO_KERNEL))
+    except (AttributeError, OSError):
+        return None
+    return conexao
+
+
+class RegistroDispositivos:
+    """Inventário em memória dos drives ópticos, mantido por eventos.
+
+    Com ``iniciar`` uma thread escuta os uevents do kernel (netlink); sem
+    netlink, a cada ``INTERVALO_POLLING`` só o ``size`` de cada drive é lido e
+    só os drives alterados são relidos por inteiro. ``ao_evento`` é chamado
+    nessa thread.
+    """
+
+    def __init__(
+        self,
+        raiz: Path = RAIZ_BLOCOS,
+        ao_evento: Callable[[EventoDispositivo], None] | None = None,
+    ) -> None:
+        self.raiz = raiz
+        self.ao_evento = ao_evento
+        self._dispositivos: dict[str, DispositivoOptico] = {}
+        # mtime de ``device`` e conteúdo de ``size`` na última leitura.
+        self._assinaturas: dict[str, tuple[int, str] | None] = {}
+        self._mtime_raiz: int | None = None
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.usando_netlink = False
+
+    def dispositivos(self) -> list[DispositivoOptico]:
+        with self._trava:
+            return list(self._dispositivos.values())
+
+    def obter(self, caminho: str) -> DispositivoOptico | None:
+        with self._trava:
+            return self._dispositivos.get(caminho)
+
+    def sincronizar(self) -> list[EventoDispositivo]:
+        """Relê todos os drives do sysfs."""
+        self._mtime_raiz = _mtime(self.raiz)
+        atuais = {f"/dev/{nome}": nome for nome in self._listar()}
+        eventos = self._remover_ausentes(atuais)
+        for caminho, nome in atuais.items():
+            eventos.extend(self._atualizar(caminho, nome))
+        self._notificar(eventos)
+        return eventos
+
+    def sondar(self) -> list[EventoDispositivo]:
+        """Relê só os drives cuja assinatura no sysfs mudou desde a última vez."""
+        mtime_raiz = _mtime(self.raiz)
+        if mtime_raiz != self._mtime_raiz:
+            self._mtime_raiz = mtime_raiz
+            nomes = self._listar()
+        else:
+            nomes = sorted(Path(caminho).name for caminho in self._assinaturas)
+        atuais = {
+            f"/dev/{nome}": nome
+            for nome in nomes
+            if _assinatura(self.raiz / nome) is not None
+        }
+        eventos = self._remover_ausentes(atuais)
+        for caminho, nome in atuais.items():
+            if _assinatura(self.raiz / nome) != self._assinaturas.get(caminho):
+                eventos.extend(self._atualizar(caminho, nome))
+        self._notificar(eventos)
+        return eventos
+
+    def _listar(self) -> list[str]:
+        try:
+            return sorted(
+                entrada.name
+                for entrada in os.scandir(self.raiz)
+                if entrada.name.startswith("sr")
+            )
+        except OSError:
+            return []
+
+    def _remover_ausentes(self, atuais: dict[str, str]) -> list[EventoDispositivo]:
+        eventos: list[EventoDispositivo] = []
+        with self._trava:
+            for caminho in list(self._dispositivos):
+                if caminho not in atuais:
+                    removido = self._dispositivos.pop(caminho)
+                    self._assinaturas.pop(caminho, None)
+                    eventos.append(EventoDispositivo(EVENTO_REMOVIDO, removido))
+        return eventos
+
+    def iniciar(self) -> None:
+        if self._thread is not None:
+            return
+        self.sincronizar()
+        self._parar.clear()
+        conexao = _abrir_netlink()
+        self.usando_netlink = conexao is not None
+        self._thread = threading.Thread(
+            target=self._escutar if conexao else self._consultar,
+            args=(conexao,) if conexao else (),
+            name="registro-dispositivos",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def parar(self) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(2 * INTERVALO_POLLING)
+            self._thread = None
+
+    def aplicar_uevent(self, campos: dict[str, str]) -> list[EventoDispositivo]:
+        nome = campos.get("DEVNAME", "").rsplit("/", 1)[-1]
+        if campos.get("SUBSYSTEM") != "block" or not nome.startswith("sr"):
+            return []
+        caminho = f"/dev/{nome}"
+        acao = campos.get("ACTION")
+        eventos: list[EventoDispositivo] = []
+        if acao == "remove":
+            with self._trava:
+                removido = self._dispositivos.pop(caminho, None)
+                self._assinaturas.pop(caminho, None)
+            if removido is not None:
+                eventos.append(EventoDispositivo(EVENTO_REMOVIDO, removido))
+        elif acao in ("add", "change"):
+            eventos = self._atualizar(caminho, nome)
+        self._notificar(eventos)
+        return eventos
+
+    def _atualizar(self, caminho: str, nome: str) -> list[EventoDispositivo]:
+        # A assinatura vem antes da leitura: uma mudança no meio é vista na próxima.
+        assinatura = _assinatura(self.raiz / nome)
+        novo = ler_dispositivo(self.raiz / nome)
+        with self._trava:
+            anterior = self._dispositivos.get(caminho)
+            self._dispositivos[caminho] = novo
+            self._assinaturas[caminho] = assinatura
+        if anterior is None:
+            return [EventoDispositivo(EVENTO_ADICIONADO, novo)]
+        if anterior.setores_midia != novo.setores_midia:
+            return [EventoDispositivo(EVENTO_MIDIA, novo)]
+        return []
+
+    def _notificar(self, eventos: list[EventoDispositivo]) -> None:
+        if self.ao_evento is None:
+            return
+        for evento in eventos:
+            self.ao_evento(evento)
+
+    def _escutar(self, conexao: socket.socket) -> None:
+        with conexao:
+            while not self._parar.is_set():
+                prontos, _, _ = select.select([conexao], [], [], INTERVALO_POLLING)
+                if not prontos:
+                    continue
+                try:
+                    mensagem = conexao.recv(_TAMANHO_UEVENT)
+                except OSError:
+                    continue
+                self.aplicar_uevent(interpretar_uevent(mensagem))
+
+    def _consultar(self) -> None:
+        while not self._parar.wait(INTERVALO_POLLING):
+            self.sondar()
+
+
+def _mtime(caminho: Path) -> int | None:
+    try:
+        return os.stat(caminho).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _assinatura(caminho: Path) -> tuple[int, str] | None:
+    """``None`` quando o drive sumiu do sysfs.
+
+    O mtime dos atributos do sysfs não muda com a troca de mídia: o que muda é
+    o valor de ``size``, então ele é lido (poucos bytes) a cada consulta.
+    """
+    dispositivo = _mtime(caminho / "device")
+    try:
+        tamanho = (caminho / "size").read_text().strip()
+    except OSError:
+        if dispositivo is None:
+            return None
+        tamanho = ""
+    return dispositivo or 0, tamanho
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import os
+from collections import deque
+from pathlib import Path
+from typing import TextIO
+
+MAX_LINHAS_PADRAO = 2000
+VARIAVEL_DIRETORIO_LOGS = "GRAVADOR_CDRDAO_LOGS"
+
+
+def diretorio_logs() -> Path | None:
+    """Diretório para o log completo de cada trabalho, se configurado."""
+    diretorio = os.environ.get(VARIAVEL_DIRETORIO_LOGS)
+    return Path(diretorio) if diretorio else None
+
+
+class RegistroLog:
+    """Log somente-anexação com as últimas ``max_linhas`` linhas em memória.
+
+    Se ``arquivo`` for informado, todas as linhas também são gravadas em disco,
+    de modo que o log completo não se perde quando o buffer circular descarta
+    as mais antigas.
+    """
+
+    def __init__(
+        self, max_linhas: int = MAX_LINHAS_PADRAO, arquivo: Path | None = None
+    ) -> None:
+        self._linhas: deque[str] = deque(maxlen=max_linhas)
+        self.total_linhas = 0
+        self.arquivo = arquivo
+        self._saida: TextIO | None = None
+        if arquivo is not None:
+            arquivo.parent.mkdir(parents=True, exist_ok=True)
+            self._saida = arquivo.open("a", encoding="utf-8")
+
+    def anexar(self, texto: str) -> list[str]:
+        linhas = texto.splitlines() or [""]
+        self._linhas.extend(linhas)
+        self.total_linhas += len(linhas)
+        if self._saida is not None:
+            self._saida.write("\n".join(linhas) + "\n")
+        return linhas
+
+    def linhas(self) -> list[str]:
+        return list(self._linhas)
+
+    def texto(self) -> str:
+        return "\n".join(self._linhas)
+
+    @property
+    def descartadas(self) -> int:
+        return self.total_linhas - len(self._linhas)
+
+    def fechar(self) -> None:
+        if self._saida is not None:
+            self._saida.close()
+            self._saida = None
@@ -0,0 +1,319 @@
+"""EDC e ECC dos setores de dados de CD (ECMA-130).
+
+Com NumPy os cálculos são feitos em lotes de setores; sem ele ficam as versões
+byte a byte, corretas mas bem mais lentas.
+"""
+from __future__ import annotations
+
+import importlib.util
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+TAMANHO_SETOR = 2352
+SYNC = b"\x00" + b"\xff" * 10 + b"\x00"
+# Tipos de setor com EDC/ECC regeneráveis (mesma numeração do formato ECM).
+TIPO_MODE1 = 1
+TIPO_MODE2_FORM1 = 2
+TIPO_MODE2_FORM2 = 3
+# Região coberta pelo EDC, por tipo; o EDC fica nos 4 bytes seguintes.
+_REGIAO_EDC = {
+    TIPO_MODE1: (0x000, 0x810),
+    TIPO_MODE2_FORM1: (0x010, 0x818),
+    TIPO_MODE2_FORM2: (0x010, 0x92C),
+}
+_INICIO_ECC = 0x00C
+_INICIO_P = 0x81C
+_INICIO_Q = 0x8C8
+_FIM_Q = 0x930
+# NumPy só é importado no primeiro cálculo em lote: custa caro na partida da CLI.
+VETORIZADO = importlib.util.find_spec("numpy") is not None
+# Limita as cópias temporárias de edc_lote no acumulador.
+_LINHAS_POR_LOTE = 1024
+
+
+def _tabelas() -> tuple[list[int], list[int], list[int]]:
+    ecc_f = [0] * 256
+    ecc_b = [0] * 256
+    edc = [0] * 256
+    for i in range(256):
+        j = ((i << 1) ^ (0x11D if i & 0x80 else 0)) & 0xFF
+        ecc_f[i] = j
+        ecc_b[i ^ j] = i
+        valor = i
+        for _ in range(8):
+            valor = (valor >> 1) ^ (0xD8018001 if valor & 1 else 0)
+        edc[i] = valor
+    return ecc_f, ecc_b, edc
+
+
+_ECC_F, _ECC_B, _EDC = _tabelas()
+
+
+def edc(dados: bytes, inicial: int = 0) -> int:
+    valor = inicial
+    for byte in dados:
+        valor = (valor >> 8) ^ _EDC[(valor ^ byte) & 0xFF]
+    return valor
+
+
+def _ecc_bloco(
+    dados: bytes, maiores: int, menores: int, mult_maior: int, inc_menor: int
+) -> bytes:
+    tamanho = maiores * menores
+    saida = bytearray(2 * maiores)
+    for maior in range(maiores):
+        indice = (maior >> 1) * mult_maior + (maior & 1)
+        a = b = 0
+        for _ in range(menores):
+            valor = dados[indice]
+            indice += inc_menor
+            if indice >= tamanho:
+                indice -= tamanho
+            a ^= valor
+            b ^= valor
+            a = _ECC_F[a]
+        a = _ECC_B[_ECC_F[a] ^ b]
+        saida[maior] = a
+        saida[maior + maiores] = a ^ b
+    return bytes(saida)
+
+
+def ecc(setor: bytes, zerar_endereco: bool) -> bytes:
+    """Paridades P e Q (276 bytes) de um setor de 2352 bytes."""
+    regiao = bytearray(setor[_INICIO_ECC:_INICIO_Q])
+    if zerar_endereco:
+        regiao[0:4] = bytes(4)
+    regiao[_INICIO_P - _INICIO_ECC :] = _ecc_bloco(regiao, 86, 24, 2, 86)
+    return regiao[_INICIO_P - _INICIO_ECC :] + _ecc_bloco(regiao, 52, 43, 86, 88)
+
+
+def regenerar(setor: bytearray, tipo: int) -> None:
+    """Recalcula EDC e ECC do setor (e o sync, no Mode 1) no próprio buffer."""
+    inicio, fim = _REGIAO_EDC[tipo]
+    if tipo == TIPO_MODE1:
+        setor[0:12] = SYNC
+        setor[0x814:0x81C] = bytes(8)
+    setor[fim : fim + 4] = edc(setor[inicio:fim]).to_bytes(4, "little")
+    if tipo != TIPO_MODE2_FORM2:
+        setor[_INICIO_P:_FIM_Q] = ecc(setor, zerar_endereco=tipo == TIPO_MODE2_FORM1)
+
+
+_cache_vetorizado: dict[str, object] = {}
+
+
+def _tabelas_vetorizadas() -> dict[str, object]:
+    if not _cache_vetorizado:
+        import numpy as np
+
+        # EDC de 4 em 4 bytes (slicing-by-4), com as quatro tabelas de byte
+        # fundidas duas a duas em tabelas de 16 bits.
+        tabelas = [np.array(_EDC, dtype=np.uint32)]
+        for _ in range(3):
+            anterior = tabelas[-1]
+            tabelas.append((anterior >> 8) ^ tabelas[0][anterior & 0xFF])
+        meia = np.arange(1 << 16, dtype=np.uint32)
+        edc_baixo = tabelas[3][meia & 0xFF] ^ tabelas[2][meia >> 8]
+        edc_alto = tabelas[1][meia & 0xFF] ^ tabelas[0][meia >> 8]
+        # Linhas de P e Q como índices na região do ECC, já na ordem de leitura e
+        # completadas até múltiplo de 8 com um índice extra que aponta para zero.
+        regiao = _INICIO_Q - _INICIO_ECC
+        maiores = np.arange(88)[None, :]
+        indices_p = np.where(maiores < 86, np.arange(24)[:, None] * 86 + maiores, regiao)
+        maiores = np.arange(56)[None, :]
+        diagonal = (maiores >> 1) * 86 + (maiores & 1) + 88 * np.arange(43)[:, None]
+        indices_q = np.where(maiores < 52, diagonal % regiao, regiao)
+        _cache_vetorizado.update(
+            edc_baixo=edc_baixo,
+            edc_alto=edc_alto,
+            ecc_f=np.array(_ECC_F, dtype=np.uint8),
+            ecc_b=np.array(_ECC_B, dtype=np.uint8),
+            indices_p=indices_p.ravel(),
+            indices_q=indices_q.ravel(),
+        )
+    return _cache_vetorizado
+
+
+def edc_lote(dados: np.ndarray) -> np.ndarray:
+    """EDC de cada linha de uma matriz (setores, bytes) de uint8."""
+    import numpy as np
+
+    tabelas = _tabelas_vetorizadas()
+    linhas, comprimento = dados.shape
+    # Zeros à esquerda não mudam o EDC: completam a linha até múltiplo de 4.
+    preenchimento = -comprimento % 4
+    palavras = np.zeros((linhas, comprimento + preenchimento), dtype=np.uint8)
+    palavras[:, preenchimento:] = dados
+    # Uma coluna por palavra: cada passo avança todos os setores juntos.
+    colunas = np.ascontiguousarray(palavras.view("<u4").T)
+    valor = np.zeros(linhas, dtype=np.uint32)
+    indice = np.empty(linhas, dtype=np.uint32)
+    for coluna in colunas:
+        valor ^= coluna
+        np.bitwise_and(valor, 0xFFFF, out=indice)
+        proximo = tabelas["edc_baixo"].take(indice)
+        np.right_shift(valor, 16, out=indice)
+        proximo ^= tabelas["edc_alto"].take(indice)
+        valor = proximo
+    return valor
+
+
+def _ecc_lote_bloco(
+    regiao: np.ndarray, indices: np.ndarray, maiores: int, tabelas: dict[str, object]
+) -> np.ndarray:
+    """Paridades das linhas de ``indices`` em cada setor de ``regiao``."""
+    import numpy as np
+
+    # Oito bytes por palavra: a multiplicação por 2 em GF(2^8) vira deslocamento
+    # e máscara, sem consulta a tabela.
+    palavras = regiao.take(indices, axis=1).view(np.uint64)
+    largura = -(-maiores // 8)
+    a = np.zeros((len(regiao), largura), dtype=np.uint64)
+    b = np.zeros_like(a)
+    altos = np.empty_like(a)
+    for menor in range(0, palavras.shape[1], largura):
+        linha = palavras[:, menor : menor + largura]
+        a ^= linha
+        b ^= linha
+        np.bitwise_and(a, np.uint64(0x8080808080808080), out=altos)
+        a &= np.uint64(0x7F7F7F7F7F7F7F7F)
+        a <<= np.uint64(1)
+        altos >>= np.uint64(7)
+        altos *= np.uint64(0x1D)
+        a ^= altos
+    a = a.view(np.uint8)[:, :maiores]
+    b = b.view(np.uint8)[:, :maiores]
+    a = tabelas["ecc_b"].take(tabelas["ecc_f"].take(a) ^ b)
+    return np.concatenate((a, a ^ b), axis=1)
+
+
+def ecc_lote(setores: np.ndarray, zerar_endereco: bool) -> np.ndarray:
+    """Paridades P e Q (setores, 276) de uma matriz (setores, 2352)."""
+    import numpy as np
+
+    tabelas = _tabelas_vetorizadas()
+    tamanho = _INICIO_Q - _INICIO_ECC
+    # Uma coluna zero a mais, para onde apontam os índices de preenchimento.
+    regiao = np.zeros((len(setores), tamanho + 1), dtype=np.uint8)
+    regiao[:, :tamanho] = setores[:, _INICIO_ECC:_INICIO_Q]
+    if zerar_endereco:
+        regiao[:, 0:4] = 0
+    p = _ecc_lote_bloco(regiao, tabelas["indices_p"], 86, tabelas)
+    regiao[:, _INICIO_P - _INICIO_ECC : tamanho] = p
+    q = _ecc_lote_bloco(regiao, tabelas["indices_q"], 52, tabelas)
+    return np.concatenate((p, q), axis=1)
+
+
+def regenerar_lote(setores: np.ndarray, tipo: int) -> None:
+    """``regenerar`` para uma matriz (setores, 2352) de uint8, no próprio buffer."""
+    import numpy as np
+
+    inicio, fim = _REGIAO_EDC[tipo]
+    if tipo == TIPO_MODE1:
+        setores[:, 0:12] = np.frombuffer(SYNC, dtype=np.uint8)
+        setores[:, 0x814:0x81C] = 0
+    valores = edc_lote(setores[:, inicio:fim]).astype("<u4")
+    setores[:, fim : fim + 4] = valores.view(np.uint8).reshape(-1, 4)
+    if tipo != TIPO_MODE2_FORM2:
+        setores[:, _INICIO_P:_FIM_Q] = ecc_lote(setores, tipo == TIPO_MODE2_FORM1)
+
+
+def conferir_lote(
+    setores: np.ndarray, tipo: int, ecc: bool = False
+) -> tuple[np.ndarray, np.ndarray]:
+    """Máscaras (EDC errado, ECC errado) de setores do mesmo tipo, sem alterá-los."""
+    import numpy as np
+
+    inicio, fim = _REGIAO_EDC[tipo]
+    gravado = np.ascontiguousarray(setores[:, fim : fim + 4]).view("<u4")[:, 0]
+    falha_edc = edc_lote(setores[:, inicio:fim]) != gravado
+    if tipo == TIPO_MODE2_FORM2:
+        # No form 2 o EDC é opcional: zero quer dizer "não calculado".
+        falha_edc &= gravado != 0
+    falha_ecc = np.zeros(len(setores), dtype=bool)
+    if ecc and tipo != TIPO_MODE2_FORM2:
+        paridade = ecc_lote(setores, tipo == TIPO_MODE2_FORM1)
+        falha_ecc = (paridade != setores[:, _INICIO_P:_FIM_Q]).any(axis=1)
+    return falha_edc, falha_ecc
+
+
+def _aplicar(tabela: list[list[int]], valor: int) -> int:
+    return (
+        tabela[0][valor & 0xFF]
+        ^ tabela[1][(valor >> 8) & 0xFF]
+        ^ tabela[2][(valor >> 16) & 0xFF]
+        ^ tabela[3][valor >> 24]
+    )
+
+
+_deslocamentos: list[list[list[int]]] = []
+
+
+def _tabela_deslocamento(potencia: int) -> list[list[int]]:
+    """Avanço do EDC por 2**potencia bytes zero, separado por byte do valor."""
+    if not _deslocamentos:
+        um_byte = [[0] * 256 for _ in range(4)]
+        for faixa in range(4):
+            for byte in range(256):
+                valor = byte << (8 * faixa)
+                um_byte[faixa][byte] = (valor >> 8) ^ _EDC[valor & 0xFF]
+        _deslocamentos.append(um_byte)
+    while len(_deslocamentos) <= potencia:
+        anterior = _deslocamentos[-1]
+        _deslocamentos.append(
+            [
+                [_aplicar(anterior, _aplicar(anterior, byte << (8 * faixa))) for byte in range(256)]
+                for faixa in range(4)
+            ]
+        )
+    return _deslocamentos[potencia]
+
+
+def deslocar_edc(valor: int, quantidade: int) -> int:
+    """EDC depois de ``quantidade`` bytes zero: permite juntar EDCs de blocos."""
+    potencia = 0
+    while quantidade:
+        if quantidade & 1:
+            valor = _aplicar(_tabela_deslocamento(potencia), valor)
+        quantidade >>= 1
+        potencia += 1
+    return valor
+
+
+class AcumuladorEdc:
+    """EDC de um fluxo inteiro (o do fim de um ECM), alimentado em blocos."""
+
+    def __init__(self) -> None:
+        self.valor = 0
+
+    def atualizar(self, dados: bytes) -> None:
+        if not VETORIZADO:
+            self.valor = edc(dados, self.valor)
+            return
+        import numpy as np
+
+        # O começo avulso vai byte a byte; o resto, em linhas de um setor que se
+        # juntam avançando o valor acumulado um setor por linha.
+        sobra = len(dados) % TAMANHO_SETOR
+        valor = edc(dados[:sobra], self.valor)
+        linhas = np.frombuffer(dados, dtype=np.uint8, offset=sobra).reshape(-1, TAMANHO_SETOR)
+        avanco = _tabela_deslocamento_setor()
+        for inicio in range(0, len(linhas), _LINHAS_POR_LOTE):
+            for parcial in edc_lote(linhas[inicio : inicio + _LINHAS_POR_LOTE]).tolist():
+                valor = _aplicar(avanco, valor) ^ parcial
+        self.valor = valor
+
+
+_avanco_setor: list[list[list[int]]] = []
+
+
+def _tabela_deslocamento_setor() -> list[list[int]]:
+    if not _avanco_setor:
+        _avanco_setor.append(
+            [
+                [deslocar_edc(byte << (8 * faixa), TAMANHO_SETOR) for byte in range(256)]
+                for faixa in range(4)
+            ]
+        )
+    return _avanco_setor[0]
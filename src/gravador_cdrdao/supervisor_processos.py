@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import threading
+from concurrent.futures import Future
+from typing import Callable
+
+from gravador_cdrdao.leitor_saida import TAMANHO_BLOCO, DivisorLinhas
+
+TEMPO_LIMITE_TERMINO = 10.0
+
+
+class SupervisorProcessos:
+    """Executa todos os processos filhos em um único event loop asyncio.
+
+    O loop roda em uma thread de fundo; os callbacks são chamados nessa thread.
+    Cada processo recebe seu próprio grupo (``start_new_session``), então o
+    cancelamento alcança também os filhos do comando.
+    """
+
+    def __init__(self, tempo_limite_termino: float = TEMPO_LIMITE_TERMINO) -> None:
+        self.tempo_limite_termino = tempo_limite_termino
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._trava = threading.Lock()
+        self._processos: dict[str, asyncio.subprocess.Process] = {}
+        self._cancelados: set[str] = set()
+        self._tarefas: dict[str, Future[int]] = {}
+
+    def iniciar(
+        self,
+        identificador: str,
+        comando: list[str],
+        ao_linhas: Callable[[list[str]], None],
+        ao_fim: Callable[[int, str | None], None],
+        ao_ocioso: Callable[[], None] | None = None,
+        intervalo: float | None = None,
+    ) -> Future[int]:
+        loop = self._garantir_loop()
+        futuro = asyncio.run_coroutine_threadsafe(
+            self._executar(identificador, comando, ao_linhas, ao_fim, ao_ocioso, intervalo),
+            loop,
+        )
+        with self._trava:
+            self._tarefas[identificador] = futuro
+        futuro.add_done_callback(lambda _: self._remover_tarefa(identificador, futuro))
+        return futuro
+
+    def cancelar(self, identificador: str) -> None:
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._terminar(identificador), self._loop)
+
+    def ativos(self) -> list[str]:
+        with self._trava:
+            return list(self._tarefas)
+
+    def encerrar(self, tempo_limite: float | None = None) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        for identificador in self.ativos():
+            self.cancelar(identificador)
+        with self._trava:
+            tarefas = list(self._tarefas.values())
+        for futuro in tarefas:
+            try:
+                futuro.result(tempo_limite)
+            except Exception:
+                pass
+        loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join(tempo_limite)
+        loop.close()
+        self._loop = None
+        self._thread = None
+
+    def _garantir_loop(self) -> asyncio.AbstractEventLoop:
+        with self._trava:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="supervisor-processos",
+                    daemon=True,
+                )
+                self._thread.start()
+            return self._loop
+
+    def _remover_tarefa(self, identificador: str, futuro: Future[int]) -> None:
+        with self._trava:
+            if self._tarefas.get(identificador) is futuro:
+                del self._tarefas[identificador]
+
+    async def _executar(
+        self,
+        identificador: str,
+        comando: list[str],
+        ao_linhas: Callable[[list[str]], None],
+        ao_fim: Callable[[int, str | None], None],
+        ao_ocioso: Callable[[], None] | None,
+        intervalo: float | None,
+    ) -> int:
+        try:
+            processo = await asyncio.create_subprocess_exec(
+                *comando,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True,
+            )
+        except Exception as exc:
+            self._cancelados.discard(identificador)
+            ao_fim(1, f"Falha ao executar: {exc}")
+            return 1
+        self._processos[identificador] = processo
+        try:
+            if identificador in self._cancelados:
+                await self._terminar_processo(processo)
+            assert processo.stdout
+            divisor = DivisorLinhas()
+            while True:
+                try:
+                    bloco = await asyncio.wait_for(processo.stdout.read(TAMANHO_BLOCO), intervalo)
+                except asyncio.TimeoutError:
+                    if ao_ocioso is not None:
+                        ao_ocioso()
+                    continue
+                if not bloco:
+                    break
+                ao_linhas(divisor.alimentar(bloco))
+            if restantes := divisor.finalizar():
+                ao_linhas(restantes)
+            codigo = await processo.wait()
+        except asyncio.CancelledError:
+            await self._terminar_processo(processo)
+            # Quem espera pelo ao_fim (executor, agendador) também precisa saber.
+            ao_fim(-1, "Cancelado.")
+            raise
+        except Exception as exc:
+            await self._terminar_processo(processo)
+            ao_fim(1, f"Falha ao executar: {exc}")
+            return 1
+        finally:
+            self._processos.pop(identificador, None)
+            self._cancelados.discard(identificador)
+        ao_fim(codigo, None)
+        return codigo
+
+    async def _terminar(self, identificador: str) -> None:
+        processo = self._processos.get(identificador)
+        if processo is None:
+            with self._trava:
+                if identificador in self._tarefas:
+                    self._cancelados.add(identificador)
+            return
+        await self._terminar_processo(processo)
+
+    async def _terminar_processo(self, processo: asyncio.subprocess.Process) -> None:
+        if processo.returncode is not None:
+            return
+        _sinalizar_grupo(processo.pid, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(processo.wait(), self.tempo_limite_termino)
+        except asyncio.TimeoutError:
+            _sinalizar_grupo(processo.pid, signal.SIGKILL)
+            await processo.wait()
+
+
+def _sinalizar_grupo(pid: int, sinal: signal.Signals) -> None:
+    try:
+        os.killpg(pid, sinal)
+    except ProcessLookupError:
+        pass
+
+
+_supervisor_padrao: SupervisorProcessos | None = None
+
+
+def supervisor_padrao() -> SupervisorProcessos:
+    global _supervisor_padrao
+    if _supervisor_padrao is None:
+        _supervisor_padrao = SupervisorProcessos()
+    return _supervisor_padrao
@@ -0,0 +1,261 @@
+"""Varredura dos setores de dados de um BIN antes da gravação.
+
+Confere em cada setor das tracks MODE1/2352 e MODE2/2352 o sync, o cabeçalho
+(MSF do LBA esperado e modo), o EDC e, opcionalmente, o ECC. O BIN é mapeado
+com mmap e conferido em blocos de setores com NumPy.
+"""
+from __future__ import annotations
+
+import mmap
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from gravador_cdrdao import setores_cd
+from gravador_cdrdao.layout_disco import RegiaoFaixa, mapear_faixas
+from gravador_cdrdao.parser_cue import SUFIXOS_COMPRIMIDOS, CueSheet
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# 4096 setores (~9,6 MB) por bloco: amortiza o custo de cada operação NumPy.
+SETORES_POR_BLOCO = 4096
+# Byte de modo do cabeçalho esperado em cada tipo de track varrida.
+_MODO_POR_TIPO = {"MODE1/2352": 1, "MODE2/2352": 2, "CDI/2352": 2}
+_BYTE_SUBMODO = 0x12
+_BIT_FORM2 = 0x20
+# LBA 0 fica em 00:02:00 no cabeçalho.
+_SETORES_PREGAP = 150
+_INTERVALOS_NO_RESUMO = 5
+
+
+@dataclass
+class RelatorioFaixa:
+    numero: str
+    tipo: str
+    lba_inicial: int
+    setores: int
+    # Faixas de LBA (primeiro, último) com algum problema.
+    intervalos: list[tuple[int, int]] = field(default_factory=list)
+    falhas_sync: int = 0
+    falhas_cabecalho: int = 0
+    falhas_edc: int = 0
+    falhas_ecc: int = 0
+    setores_ausentes: int = 0
+    varrida: bool = True
+    observacao: str = ""
+
+    @property
+    def setores_ruins(self) -> int:
+        return sum(fim - inicio + 1 for inicio, fim in self.intervalos)
+
+    @property
+    def ok(self) -> bool:
+        return not self.intervalos
+
+
+@dataclass
+class RelatorioVarredura:
+    faixas: list[RelatorioFaixa]
+
+    @property
+    def ok(self) -> bool:
+        return all(faixa.ok for faixa in self.faixas)
+
+    def resumo(self) -> str:
+        linhas = []
+        for faixa in self.faixas:
+            cabecalho = f"Track {faixa.numero} ({faixa.tipo})"
+            if not faixa.varrida:
+                linhas.append(f"{cabecalho}: {faixa.observacao}")
+                continue
+            texto = f"{cabecalho}: {faixa.setores} setores"
+            if faixa.ok:
+                linhas.append(texto + ", íntegros")
+                continue
+            intervalos = [
+                str(inicio) if inicio == fim else f"{inicio}-{fim}"
+                for inicio, fim in faixa.intervalos[:_INTERVALOS_NO_RESUMO]
+            ]
+            if len(faixa.intervalos) > _INTERVALOS_NO_RESUMO:
+                intervalos.append("...")
+            texto += (
+                f", {faixa.setores_ruins} com erro"
+                f" (sync {faixa.falhas_sync}, cabeçalho {faixa.falhas_cabecalho},"
+                f" EDC {faixa.falhas_edc}, ECC {faixa.falhas_ecc}"
+            )
+            if faixa.setores_ausentes:
+                texto += f", ausentes {faixa.setores_ausentes}"
+            linhas.append(texto + f") em LBA {', '.join(intervalos)}")
+        return "\n".join(linhas)
+
+
+def _bcd(valores: np.ndarray) -> np.ndarray:
+    return ((valores // 10) << 4 | valores % 10).astype("u1")
+
+
+def _cabecalhos_esperados(lba_inicial: int, quantidade: int, modo: int) -> np.ndarray:
+    import numpy as np
+
+    endereco = np.arange(quantidade, dtype=np.int64) + lba_inicial + _SETORES_PREGAP
+    cabecalhos = np.empty((quantidade, 4), dtype=np.uint8)
+    cabecalhos[:, 0] = _bcd(endereco // (60 * 75))
+    cabecalhos[:, 1] = _bcd(endereco // 75 % 60)
+    cabecalhos[:, 2] = _bcd(endereco % 75)
+    cabecalhos[:, 3] = modo
+    return cabecalhos
+
+
+def _conferir_bloco(
+    setores: np.ndarray,
+    lba_inicial: int,
+    modo: int,
+    ecc: bool,
+    relatorio: RelatorioFaixa,
+) -> np.ndarray:
+    """Máscara dos setores do bloco com algum problema."""
+    import numpy as np
+
+    quantidade = len(setores)
+    sync = np.frombuffer(setores_cd.SYNC, dtype=np.uint8)
+    falha_sync = (setores[:, :12] != sync).any(axis=1)
+    esperados = _cabecalhos_esperados(lba_inicial, quantidade, modo)
+    falha_cabecalho = (setores[:, 12:16] != esperados).any(axis=1)
+    falha_edc = np.zeros(quantidade, dtype=bool)
+    falha_ecc = np.zeros(quantidade, dtype=bool)
+
+    if modo == 1:
+        grupos = [(setores_cd.TIPO_MODE1, np.arange(quantidade))]
+    else:
+        form2 = (setores[:, _BYTE_SUBMODO] & _BIT_FORM2) != 0
+        grupos = [
+            (setores_cd.TIPO_MODE2_FORM1, np.flatnonzero(~form2)),
+            (setores_cd.TIPO_MODE2_FORM2, np.flatnonzero(form2)),
+        ]
+    for tipo, linhas in grupos:
+        if not len(linhas):
+            continue
+        grupo = setores[linhas] if len(linhas) < quantidade else setores
+        edc, ecc_errado = setores_cd.conferir_lote(grupo, tipo, ecc)
+        falha_edc[linhas] = edc
+        falha_ecc[linhas] = ecc_errado
+
+    relatorio.falhas_sync += int(falha_sync.sum())
+    relatorio.falhas_cabecalho += int(falha_cabecalho.sum())
+    relatorio.falhas_edc += int(falha_edc.sum())
+    relatorio.falhas_ecc += int(falha_ecc.sum())
+    return falha_sync | falha_cabecalho | falha_edc | falha_ecc
+
+
+def _acrescentar_intervalos(
+    intervalos: list[tuple[int, int]], lbas: np.ndarray
+) -> None:
+    """Junta LBAs ordenados em faixas, emendando com a última já registrada."""
+    import numpy as np
+
+    if not len(lbas):
+        return
+    quebras = np.flatnonzero(np.diff(lbas) != 1)
+    inicios = np.concatenate(([lbas[0]], lbas[quebras + 1])).tolist()
+    fins = np.concatenate((lbas[quebras], [lbas[-1]])).tolist()
+    if intervalos and intervalos[-1][1] + 1 == inicios[0]:
+        inicios[0] = intervalos.pop()[0]
+    intervalos.extend(zip(inicios, fins, strict=True))
+
+
+def varrer_faixa(regiao: RegiaoFaixa, ecc: bool = False) -> RelatorioFaixa:
+    import numpy as np
+
+    relatorio = RelatorioFaixa(
+        numero=regiao.numero,
+        tipo=regiao.tipo,
+        lba_inicial=regiao.lba_inicial,
+        setores=regiao.setores,
+    )
+    modo = _MODO_POR_TIPO.get(regiao.tipo)
+    if modo is None:
+        relatorio.varrida = False
+        relatorio.observacao = "sem setores brutos de dados para conferir"
+        return relatorio
+    if os.path.splitext(regiao.caminho)[1].lower() in SUFIXOS_COMPRIMIDOS:
+        relatorio.varrida = False
+        relatorio.observacao = "imagem comprimida (o decodificador já confere o EDC)"
+        return relatorio
+    if regiao.setores <= 0:
+        return relatorio
+
+    with open(regiao.caminho, "rb") as arquivo:
+        if os.fstat(arquivo.fileno()).st_size == 0:
+            disponiveis = 0
+        else:
+            mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                disponiveis = min(
+                    regiao.setores,
+                    max(0, len(mapa) - regiao.deslocamento) // setores_cd.TAMANHO_SETOR,
+                )
+                _varrer_mapa(mapa, regiao, disponiveis, modo, ecc, relatorio)
+            finally:
+                mapa.close()
+    if disponiveis < regiao.setores:
+        relatorio.setores_ausentes = regiao.setores - disponiveis
+        _acrescentar_intervalos(
+            relatorio.intervalos,
+            np.arange(disponiveis, regiao.setores) + regiao.lba_inicial,
+        )
+    return relatorio
+
+
+def _varrer_mapa(
+    mapa: mmap.mmap,
+    regiao: RegiaoFaixa,
+    disponiveis: int,
+    modo: int,
+    ecc: bool,
+    relatorio: RelatorioFaixa,
+) -> None:
+    import numpy as np
+
+    if not disponiveis:
+        return
+    # A visão precisa sumir antes de mapa.close(); fica restrita a esta função.
+    setores = np.frombuffer(
+        mapa,
+        dtype=np.uint8,
+        count=disponiveis * setores_cd.TAMANHO_SETOR,
+        offset=regiao.deslocamento,
+    ).reshape(-1, setores_cd.TAMANHO_SETOR)
+    for inicio in range(0, disponiveis, SETORES_POR_BLOCO):
+        lba = regiao.lba_inicial + inicio
+        bloco = setores[inicio : inicio + SETORES_POR_BLOCO]
+        ruins = _conferir_bloco(bloco, lba, modo, ecc, relatorio)
+        _acrescentar_intervalos(relatorio.intervalos, np.flatnonzero(ruins) + lba)
+
+
+def varrer_cue(
+    cue: CueSheet, ecc: bool = False, max_processos: int | None = None
+) -> RelatorioVarredura:
+    """Varre as tracks de dados, uma por processo quando há mais de uma.
+
+    Os processos saem de um forkserver: quem chama pode ter threads vivas.
+    """
+    regioes = mapear_faixas(cue)
+    varridas = [regiao for regiao in regioes if regiao.tipo in _MODO_POR_TIPO]
+    if len(varridas) > 1 and max_processos != 1:
+        trabalhadores = min(len(varridas), max_processos or os.cpu_count() or 1)
+        contexto = multiprocessing.get_context("forkserver")
+        with ProcessPoolExecutor(trabalhadores, mp_context=contexto) as executor:
+            calculados = list(
+                executor.map(varrer_faixa, varridas, [ecc] * len(varridas))
+            )
+    else:
+        calculados = [varrer_faixa(regiao, ecc) for regiao in varridas]
+    restantes = iter(calculados)
+    return RelatorioVarredura(
+        faixas=[
+            next(restantes) if regiao.tipo in _MODO_POR_TIPO else varrer_faixa(regiao)
+            for regiao in regioes
+        ]
+    )
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import argparse
+import fcntl
+import mmap
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from gravador_cdrdao.layout_disco import RegiaoFaixa, mapear_faixas
+from gravador_cdrdao.parser_cue import (
+    CueSheet,
+    carregar_cue,
+    resolver_caminhos_relativos,
+)
+
+MODO_COZIDO = "cozido"
+MODO_BRUTO = "bruto"
+SETOR_COZIDO = 2048
+SETOR_BRUTO = 2352
+# 64 setores por leitura: 128 KiB no modo cozido, sempre múltiplo de 4 KiB.
+SETORES_POR_LEITURA = 64
+_CDROMEJECT = 0x5309
+
+# Deslocamento, dentro do setor bruto de 2352 bytes, onde começa o setor
+# gravado no BIN para cada tipo de track.
+_INICIO_NO_SETOR_BRUTO = {
+    "MODE1/2048": 16,
+    "MODE2/2048": 24,
+    "MODE2/2324": 24,
+    "MODE2/2336": 16,
+    "CDI/2336": 16,
+}
+# Deslocamento dos dados de usuário (2048 bytes) dentro do setor bruto.
+_DADOS_USUARIO_NO_SETOR_BRUTO = {"MODE1": 16, "MODE2": 24, "CDI": 24}
+_BYTE_SUBMODO = 18
+_BIT_FORM2 = 0x20
+
+
+@dataclass
+class ResultadoFaixa:
+    numero: str
+    tipo: str
+    lba_inicial: int
+    setores: int
+    setores_diferentes: int = 0
+    primeiro_lba_diferente: int | None = None
+    setores_ilegiveis: int = 0
+    setores_ignorados: int = 0
+    verificada: bool = True
+    observacao: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.setores_diferentes == 0 and self.setores_ilegiveis == 0
+
+
+@dataclass
+class ResultadoVerificacao:
+    faixas: list[ResultadoFaixa]
+
+    @property
+    def ok(self) -> bool:
+        return all(faixa.ok for faixa in self.faixas)
+
+    @property
+    def ignoradas(self) -> list[ResultadoFaixa]:
+        """Tracks que o dispositivo não entrega (áudio no modo cozido)."""
+        return [faixa for faixa in self.faixas if not faixa.verificada]
+
+    def conclusao(self) -> str:
+        if not self.ok:
+            return "Verificação falhou."
+        if not self.ignoradas:
+            return "Verificação concluída: disco idêntico."
+        numeros = ", ".join(faixa.numero for faixa in self.ignoradas)
+        return (
+            "Verificação concluída: dados idênticos;"
+            f" track(s) {numeros} ignorada(s), sem conferir."
+        )
+
+    def resumo(self) -> str:
+        linhas = []
+        for faixa in self.faixas:
+            if not faixa.verificada:
+                linhas.append(f"Track {faixa.numero} ({faixa.tipo}): {faixa.observacao}")
+                continue
+            texto = f"Track {faixa.numero} ({faixa.tipo}): {faixa.setores} setores"
+            if faixa.ok:
+                texto += ", idêntica"
+            else:
+                texto += (
+                    f", {faixa.setores_diferentes} diferentes"
+                    f" (primeiro LBA {faixa.primeiro_lba_diferente}),"
+                    f" {faixa.setores_ilegiveis} ilegíveis"
+                )
+            if faixa.setores_ignorados:
+                texto += f", {faixa.setores_ignorados} form 2 ignorados"
+            linhas.append(texto)
+        linhas.append(self.conclusao())
+        return "\n".join(linhas)
+
+
+def verificar_midia(
+    cue: CueSheet,
+    dispositivo: str,
+    modo: str = MODO_COZIDO,
+    ao_progresso: Callable[[RegiaoFaixa, int], None] | None = None,
+) -> ResultadoVerificacao:
+    tamanho_dispositivo = SETOR_BRUTO if modo == MODO_BRUTO else SETOR_COZIDO
+    buffer = bytearray(SETORES_POR_LEITURA * tamanho_dispositivo)
+    resultados = []
+    fd = os.open(dispositivo, os.O_RDONLY)
+    try:
+        for regiao in mapear_faixas(cue):
+            resultados.append(
+                _verificar_faixa(fd, regiao, modo, tamanho_dispositivo, buffer, ao_progresso)
+            )
+    finally:
+        os.close(fd)
+    return ResultadoVerificacao(faixas=resultados)
+
+
+def _recorte(regiao: RegiaoFaixa, modo: str) -> tuple[int, int, int] | None:
+    """Retorna (início no setor do BIN, início no setor lido, tamanho) comparados."""
+    if modo == MODO_BRUTO:
+        inicio_bin = _INICIO_NO_SETOR_BRUTO.get(regiao.tipo, 0)
+        return 0, inicio_bin, regiao.tamanho_setor
+    familia = regiao.tipo.split("/")[0]
+    if familia not in _DADOS_USUARIO_NO_SETOR_BRUTO:
+        return None
+    inicio_bin = _INICIO_NO_SETOR_BRUTO.get(regiao.tipo, 0)
+    return _DADOS_USUARIO_NO_SETOR_BRUTO[familia] - inicio_bin, 0, SETOR_COZIDO
+
+
+def _verificar_faixa(
+    fd: int,
+    regiao: RegiaoFaixa,
+    modo: str,
+    tamanho_dispositivo: int,
+    buffer: bytearray,
+    ao_progresso: Callable[[RegiaoFaixa, int], None] | None,
+) -> ResultadoFaixa:
+    resultado = ResultadoFaixa(
+        numero=regiao.numero,
+        tipo=regiao.tipo,
+        lba_inicial=regiao.lba_inicial,
+        setores=regiao.setores,
+    )
+    recorte = _recorte(regiao, modo)
+    if recorte is None:
+        resultado.verificada = False
+        resultado.observacao = (
+            "ignorada: o dispositivo de bloco não entrega setores de áudio"
+        )
+        return resultado
+    if regiao.setores <= 0:
+        return resultado
+    inicio_bin, inicio_disp, comprimento = recorte
+    form2_visivel = regiao.tipo.startswith(("MODE2", "CDI")) and (
+        _INICIO_NO_SETOR_BRUTO.get(regiao.tipo, 0) <= _BYTE_SUBMODO
+    )
+    byte_submodo = _BYTE_SUBMODO - _INICIO_NO_SETOR_BRUTO.get(regiao.tipo, 0)
+    contiguo = inicio_bin == 0 and inicio_disp == 0 and comprimento == regiao.tamanho_setor
+    contiguo = contiguo and comprimento == tamanho_dispositivo
+
+    with open(regiao.caminho, "rb") as arquivo_bin:
+        with mmap.mmap(arquivo_bin.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            with memoryview(mapa) as origem:
+                lido = memoryview(buffer)
+                setor = 0
+                while setor < regiao.setores:
+                    quantidade = min(SETORES_POR_LEITURA, regiao.setores - setor)
+                    lba = regiao.lba_inicial + setor
+                    obtidos = _ler_bloco(fd, lido, lba, quantidade, tamanho_dispositivo)
+                    base_bin = regiao.deslocamento + setor * regiao.tamanho_setor
+                    identico = contiguo and obtidos == quantidade and _iguais(
+                        origem, base_bin, lido[: quantidade * tamanho_dispositivo]
+                    )
+                    for indice in range(0 if identico else quantidade):
+                        inicio = base_bin + indice * regiao.tamanho_setor
+                        if form2_visivel and modo == MODO_COZIDO:
+                            if origem[inicio + byte_submodo] & _BIT_FORM2:
+                                resultado.setores_ignorados += 1
+                                continue
+                        if indice >= obtidos and not _ler_setor(
+                            fd, lido, lba + indice, indice, tamanho_dispositivo
+                        ):
+                            resultado.setores_ilegiveis += 1
+                            continue
+                        base_disp = indice * tamanho_dispositivo + inicio_disp
+                        if not _iguais(
+                            origem, inicio + inicio_bin, lido[base_disp : base_disp + comprimento]
+                        ):
+                            resultado.setores_diferentes += 1
+                            if resultado.primeiro_lba_diferente is None:
+                                resultado.primeiro_lba_diferente = lba + indice
+                    setor += quantidade
+                    if ao_progresso is not None:
+                        ao_progresso(regiao, setor)
+    return resultado
+
+
+def _iguais(origem: memoryview, inicio: int, lido: memoryview) -> bool:
+    with origem[inicio : inicio + len(lido)] as esperado:
+        return esperado == lido
+
+
+def _ler_bloco(fd: int, destino: memoryview, lba: int, quantidade: int, tamanho: int) -> int:
+    try:
+        lidos = os.preadv(fd, [destino[: quantidade * tamanho]], lba * tamanho)
+    except OSError:
+        return 0
+    return lidos // tamanho
+
+
+def _ler_setor(fd: int, destino: memoryview, lba: int, indice: int, tamanho: int) -> bool:
+    try:
+        lidos = os.preadv(fd, [destino[indice * tamanho : (indice + 1) * tamanho]], lba * tamanho)
+    except OSError:
+        return False
+    return lidos == tamanho
+
+
+def ejetar(dispositivo: str) -> None:
+    fd = os.open(dispositivo, os.O_RDONLY | os.O_NONBLOCK)
+    try:
+        fcntl.ioctl(fd, _CDROMEJECT)
+    finally:
+        os.close(fd)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Verifica o disco gravado contra os BINs do CUE.")
+    parser.add_argument("--device", required=True)
+    parser.add_argument(
+        "--bruto",
+        action="store_true",
+        help="a origem entrega setores de 2352 bytes (imagem bruta; /dev/srN não)",
+    )
+    parser.add_argument("--ejetar", action="store_true")
+    parser.add_argument("cue")
+    args = parser.parse_args(argv)
+
+    caminho = Path(args.cue)
+    cue = resolver_caminhos_relativos(carregar_cue(caminho), caminho.parent)
+
+    def ao_progresso(regiao: RegiaoFaixa, setor: int) -> None:
+        print(f"Verificando track {regiao.numero}: {setor} de {regiao.setores} setores", end="\r", flush=True)
+
+    try:
+        resultado = verificar_midia(
+            cue, args.device, MODO_BRUTO if args.bruto else MODO_COZIDO, ao_progresso
+        )
+    except OSError as exc:
+        print(f"Falha na verificação: {exc}")
+        return 1
+    print(resultado.resumo())
+    if args.ejetar:
+        try:
+            ejetar(args.device)
+        except OSError as exc:
+            print(f"Não foi possível ejetar: {exc}")
+    return 0 if resultado.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,47 +2,159 @@ from __future__ import annotations
 
 import os
 import platform
-from dataclasses import dataclass
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
+from typing import Callable
 
 from PySide6 import QtCore
 
-from gravador_cdrdao.classificador_erros import ClassificadorErros
-from gravador_cdrdao.dispositivos import DispositivoOptico, info_drive_cdrdao, info_midia_cdrdao, listar_dispositivos
-from gravador_cdrdao.executor_cdrdao import ExecutorCdrdao, ExecutorCdrdaoFactory, ProgressoCdrdao
+from gravador_cdrdao import setores_cd
+from gravador_cdrdao.agendador import AgendadorGravacoes
+from gravador_cdrdao.cache_cue import CacheCue
+from gravador_cdrdao.cache_imagens import (
+    CacheImagens,
+    cue_comprimido,
+    diretorio_cache_local,
+    diretorio_copias,
+    limite_cache_local,
+)
+from gravador_cdrdao.classificador_erros import ClassificadorErros, OcorrenciaErro
+from gravador_cdrdao.dispositivos import DispositivoOptico
+from gravador_cdrdao.executor_cdrdao import ExecutorCdrdao, ExecutorCdrdaoFactory
+from gravador_cdrdao.fila_trabalhos import (
+    MODO_APAGAR,
+    MODO_GRAVAR,
+    MODO_SIMULAR,
+    MODO_VERIFICAR,
+    TrabalhoGravacao,
+    criar_copias,
+    criar_pipeline,
+    grava_midia,
+)
+from gravador_cdrdao.hashes_imagem import cache_hashes_padrao
+from gravador_cdrdao.info_drive import ConsultorInfoDrive, InfoDispositivo, formatar_info
+from gravador_cdrdao.indice_dat import IndiceDat, caminho_indice_padrao, construir_indice
+from gravador_cdrdao.layout_disco import checar_capacidade
 from gravador_cdrdao.parser_cue import (
-    aplicar_mapeamento_nomes,
-    carregar_cue,
+    CueSheet,
     corrigir_conteudo_cue,
     detectar_mismatch_nomes,
     formatar_sumario,
-    resolver_caminhos_relativos,
+    reescrever_nomes,
     validar_arquivos_existem,
 )
+from gravador_cdrdao.pre_leitura import EstatisticaPreLeitura, PreLeitor, formatar_estatistica
+from gravador_cdrdao.progresso import BYTES_POR_SEGUNDO_1X, ProgressoCdrdao, SerieTelemetria
 from gravador_cdrdao.privilegios import detectar_grupo_optico, executar_pkexec, usuario_no_grupo
+from gravador_cdrdao.registro_dispositivos import (
+    EVENTO_ADICIONADO,
+    EVENTO_REMOVIDO,
+    EventoDispositivo,
+    RegistroDispositivos,
+)
+from gravador_cdrdao.registro_log import RegistroLog, diretorio_logs
 from gravador_cdrdao.requisitos import ResultadoRequisitos, checar_requisitos, comandos_por_distro
+from gravador_cdrdao.varredura_setores import RelatorioVarredura, varrer_cue
+
+MAX_LOGS_TRABALHOS = 64
+# Abaixo desta fração da velocidade pedida a gravação é sinalizada como lenta.
+TOLERANCIA_VELOCIDADE = 0.8
+BUFFER_DRIVE_RISCO = 20
+NOMES_ETAPAS = {
+    MODO_SIMULAR: "simulação",
+    MODO_GRAVAR: "gravação",
+    MODO_APAGAR: "apagar",
+    MODO_VERIFICAR: "verificação",
+}
+
+
+def _etapas_gravacao(simular: bool, verificar: bool) -> list[str]:
+    etapas = [MODO_SIMULAR, MODO_GRAVAR] if simular else [MODO_GRAVAR]
+    if verificar:
+        etapas.append(MODO_VERIFICAR)
+    return etapas
 
 
 @dataclass
 class EstadoOperacao:
     em_andamento: bool = False
-    ultimo_log: str = ""
+    log: RegistroLog = field(default_factory=RegistroLog)
     diagnostico: str = ""
 
 
 class ViewModelPrincipal(QtCore.QObject):
     requisitos_atualizados = QtCore.Signal(ResultadoRequisitos)
     dispositivos_atualizados = QtCore.Signal(list)
-    log_atualizado = QtCore.Signal(str)
+    log_anexado = QtCore.Signal(str)
     diagnostico_atualizado = QtCore.Signal(str)
     progresso_atualizado = QtCore.Signal(str)
+    progresso_drive = QtCore.Signal(str, str)
     info_drive_atualizada = QtCore.Signal(str)
+    evento_dispositivo = QtCore.Signal(str, str)
+    info_dispositivo_atualizada = QtCore.Signal(str, InfoDispositivo)
+    # Conferência de setores em segundo plano: (CUE, relatório) ou (CUE, erro).
+    varredura_concluida = QtCore.Signal(str, RelatorioVarredura)
+    varredura_falhou = QtCore.Signal(str, str)
+    # (sucesso, texto com os hashes ou o erro) do processo de hashes.
+    hashes_calculados = QtCore.Signal(bool, str)
 
     def __init__(self) -> None:
         super().__init__()
         self._classificador = ClassificadorErros()
-        self._executor: ExecutorCdrdao | None = None
+        self._cache_hashes = cache_hashes_padrao()
+        self._cache_imagens: CacheImagens | None = None
+        if diretorio := diretorio_cache_local():
+            try:
+                self._cache_imagens = CacheImagens(
+                    diretorio, limite_cache_local(), self._cache_hashes
+                )
+            except OSError:
+                self._cache_imagens = None
+        self._pre_leitor = PreLeitor()
+        self._agendador = AgendadorGravacoes(
+            classificador=self._classificador,
+            cache_imagens=self._cache_imagens,
+            pre_leitor=self._pre_leitor,
+        )
+        self._agendador.progresso_trabalho.connect(self._ao_progresso)
+        self._agendador.etapa_finalizada.connect(self._ao_etapa_finalizada)
+        self._agendador.trabalho_iniciado.connect(self._ao_trabalho_iniciado)
+        self._agendador.trabalho_finalizado.connect(self._ao_finalizado)
+        self._agendador.telemetria_trabalho.connect(self._ao_telemetria)
+        self._agendador.erro_trabalho.connect(self._ao_erro)
+        self._agendador.trabalho_reenfileirado.connect(self._ao_reenfileirado)
+        self._agendador.aviso_trabalho.connect(self._ao_aviso_trabalho)
+        self._agendador.pre_leitura_trabalho.connect(self._ao_pre_leitura)
+        self._velocidades: dict[str, int] = {}
+        # grupo multi-cópia -> identificador -> (drive, código de saída ou None).
+        self._copias: dict[str, dict[str, tuple[str, int | None]]] = {}
         self.estado = EstadoOperacao()
+        self._logs_trabalhos: OrderedDict[str, RegistroLog] = OrderedDict()
+        # Com o diretório configurado, cada trabalho grava o log completo em disco.
+        self._diretorio_logs = diretorio_logs()
+        self._cache_cue = CacheCue()
+        self._registro_dispositivos = RegistroDispositivos(
+            ao_evento=self._ao_evento_dispositivo
+        )
+        self.evento_dispositivo.connect(self._registrar_evento_dispositivo)
+        self._consultor_info = ConsultorInfoDrive()
+        self._dispositivo_info: str | None = None
+        self._inventario_pendente: set[str] = set()
+        self.info_dispositivo_atualizada.connect(self._registrar_inventario)
+        self._executor_biblioteca: ExecutorCdrdao | None = None
+        self._executor_hashes: ExecutorCdrdao | None = None
+        self._varredura: threading.Thread | None = None
+        self.varredura_concluida.connect(self._ao_varredura_concluida)
+        self.varredura_falhou.connect(self._ao_varredura_falhou)
+        self._indice_dat: IndiceDat | None = None
+        if caminho_indice_padrao().exists():
+            try:
+                self._indice_dat = IndiceDat(caminho_indice_padrao())
+            except (OSError, ValueError):
+                self._indice_dat = None
 
     def checar_requisitos(self) -> None:
         resultado = checar_requisitos()
@@ -52,32 +164,192 @@ class ViewModelPrincipal(QtCore.QObject):
         return comandos_por_distro(distro)
 
     def atualizar_dispositivos(self) -> None:
-        dispositivos = listar_dispositivos()
-        self.dispositivos_atualizados.emit(dispositivos)
+        # O inventário já é mantido pelo monitor; listar não relê o sysfs.
+        self.dispositivos_atualizados.emit(self._registro_dispositivos.dispositivos())
+
+    def iniciar_monitor_dispositivos(self) -> None:
+        self._registro_dispositivos.iniciar()
 
-    def validar_cue(self, caminho: str) -> tuple[bool, str]:
+    def parar_monitor_dispositivos(self) -> None:
+        self._registro_dispositivos.parar()
+
+    def _ao_evento_dispositivo(self, evento: EventoDispositivo) -> None:
+        # Chamado na thread do registro; os sinais chegam enfileirados à interface.
+        if evento.tipo != EVENTO_ADICIONADO:
+            self._consultor_info.invalidar(evento.dispositivo.caminho)
+        self.evento_dispositivo.emit(evento.tipo, evento.dispositivo.caminho)
+        self.dispositivos_atualizados.emit(self._registro_dispositivos.dispositivos())
+
+    def _registrar_evento_dispositivo(self, tipo: str, caminho: str) -> None:
+        textos = {
+            EVENTO_ADICIONADO: "Drive conectado.",
+            EVENTO_REMOVIDO: "Drive removido.",
+        }
+        self._append_log(f"[{caminho}] {textos.get(tipo, 'Mídia alterada.')}")
+
+    def validar_cue(self, caminho: str, profunda: bool = False) -> tuple[bool, str]:
+        """Com ``profunda`` também confere os setores de dados, em segundo plano.
+
+        O relatório chega depois por ``varredura_concluida``.
+        """
         try:
-            cue = carregar_cue(Path(caminho))
-            cue = resolver_caminhos_relativos(cue, Path(caminho).parent)
+            cue = self._cache_cue.carregar_resolvido(caminho)
             ausentes = validar_arquivos_existem(cue)
             if ausentes:
                 return False, "Arquivos ausentes: " + ", ".join(ausentes)
-            return True, formatar_sumario(cue)
+            sumario = formatar_sumario(cue)
+            if self._indice_dat is not None:
+                sumario += "\n" + self._corresponder_dat(cue, caminho)
+            if profunda:
+                sumario += "\n" + self._iniciar_varredura(caminho, cue)
+            return True, sumario
         except Exception as exc:
             return False, f"Falha ao validar: {exc}"
 
+    def _iniciar_varredura(self, caminho: str, cue: CueSheet) -> str:
+        if not setores_cd.VETORIZADO:
+            return "Verificação profunda indisponível: instale NumPy."
+        if self._varredura is not None:
+            return "Conferência de setores já em andamento."
+        self._varredura = threading.Thread(
+            target=self._varrer_setores,
+            args=(caminho, cue),
+            name="varredura-setores",
+            daemon=True,
+        )
+        self._varredura.start()
+        self.progresso_atualizado.emit("Conferindo setores...")
+        return "Setores: conferindo em segundo plano (resultado no log)."
+
+    def _varrer_setores(self, caminho: str, cue: CueSheet) -> None:
+        # Roda fora da interface; os sinais chegam enfileirados à thread dela.
+        try:
+            relatorio = varrer_cue(cue)
+        except Exception as exc:
+            self.varredura_falhou.emit(caminho, str(exc))
+            return
+        self.varredura_concluida.emit(caminho, relatorio)
+
+    def _ao_varredura_concluida(
+        self, caminho: str, relatorio: RelatorioVarredura
+    ) -> None:
+        self._varredura = None
+        self._append_log(f"Setores de {Path(caminho).name}:\n{relatorio.resumo()}")
+        self.progresso_atualizado.emit(
+            "Setores íntegros." if relatorio.ok else "Setores com erro."
+        )
+
+    def _ao_varredura_falhou(self, caminho: str, erro: str) -> None:
+        self._varredura = None
+        self._append_log(f"Falha ao conferir setores de {Path(caminho).name}: {erro}")
+        self.progresso_atualizado.emit("Falha ao conferir setores.")
+
+    def _corresponder_dat(
+        self, cue: CueSheet, caminho: str, calcular: bool = True
+    ) -> str:
+        """Consulta o DAT só com hashes em cache; os que faltam vão a um processo."""
+        cache = self._cache_hashes
+        if any(cache.obter(arquivo.caminho) is None for arquivo in cue.arquivos):
+            if not calcular:
+                return "Dump: hashes indisponíveis."
+            if self._iniciar_hashes(caminho, partial(self._ao_hashes_dat, caminho)):
+                return "Dump: calculando hashes em segundo plano (resultado no log)."
+            return "Dump: cálculo de hashes já em andamento."
+        correspondencia = self._indice_dat.corresponder(cue, self._cache_hashes)
+        if correspondencia.titulo:
+            return f"Dump verificado: {correspondencia.titulo}"
+        return "Dump não encontrado no DAT."
+
+    def _iniciar_hashes(
+        self, caminho: str, ao_concluir: Callable[[int, str], None]
+    ) -> bool:
+        if self._executor_hashes is not None:
+            return False
+        executor = ExecutorCdrdaoFactory.criar_hashes(caminho)
+        executor.finalizado.connect(partial(self._ao_hashes_finalizados, ao_concluir))
+        self._executor_hashes = executor
+        executor.start()
+        return True
+
+    def _ao_hashes_finalizados(
+        self, ao_concluir: Callable[[int, str], None], codigo: int, log: str
+    ) -> None:
+        if self._executor_hashes is not None:
+            self._executor_hashes.aguardar()
+            self._executor_hashes = None
+        # O processo gravou os hashes no arquivo do cache.
+        self._cache_hashes.recarregar()
+        ao_concluir(codigo, log)
+
+    def _ao_hashes_dat(self, caminho: str, codigo: int, log: str) -> None:
+        if codigo != 0 or self._indice_dat is None:
+            self._append_log(log)
+            return
+        try:
+            cue = self._cache_cue.carregar_resolvido(caminho)
+            resultado = self._corresponder_dat(cue, caminho, calcular=False)
+        except (OSError, ValueError) as exc:
+            resultado = f"falha ao consultar o DAT ({exc})"
+        self._append_log(f"{Path(caminho).name}: {resultado}")
+
+    def validar_biblioteca(self, raiz: str, hashes: bool = False) -> tuple[bool, str]:
+        if self._executor_biblioteca is not None:
+            return False, "Validação da biblioteca já em andamento."
+        executor = ExecutorCdrdaoFactory.criar_validacao_biblioteca(raiz, hashes)
+        executor.finalizado.connect(self._ao_biblioteca_finalizada)
+        self._executor_biblioteca = executor
+        executor.start()
+        self.progresso_atualizado.emit("Validando biblioteca...")
+        return True, "Validação da biblioteca iniciada."
+
+    def _ao_biblioteca_finalizada(self, codigo: int, log: str) -> None:
+        if self._executor_biblioteca is not None:
+            self._executor_biblioteca.aguardar()
+            self._executor_biblioteca = None
+        self._append_log(log)
+        self.progresso_atualizado.emit(
+            "Biblioteca validada." if codigo == 0 else "Biblioteca com problemas."
+        )
+
+    def importar_dat(self, caminhos: list[str]) -> tuple[bool, str]:
+        try:
+            if self._indice_dat is not None:
+                self._indice_dat.fechar()
+                self._indice_dat = None
+            destino = caminho_indice_padrao()
+            quantidade = construir_indice([Path(caminho) for caminho in caminhos], destino)
+            self._indice_dat = IndiceDat(destino)
+            return True, f"Índice DAT atualizado: {quantidade} ROMs."
+        except Exception as exc:
+            return False, f"Falha ao importar DAT: {exc}"
+
+    def calcular_hashes(self, caminho: str) -> tuple[bool, str]:
+        """Calcula num processo à parte; o resultado sai em ``hashes_calculados``."""
+        if not Path(caminho).is_file():
+            return False, f"Falha ao calcular hashes: {caminho} não encontrado."
+        if not self._iniciar_hashes(caminho, self._ao_hashes_calculados):
+            return False, "Cálculo de hashes já em andamento."
+        self.progresso_atualizado.emit("Calculando hashes...")
+        return True, "Cálculo de hashes iniciado."
+
+    def _ao_hashes_calculados(self, codigo: int, log: str) -> None:
+        self.progresso_atualizado.emit(
+            "Hashes calculados." if codigo == 0 else "Falha ao calcular hashes."
+        )
+        self.hashes_calculados.emit(codigo == 0, log)
+
     def corrigir_cue(self, caminho: str) -> tuple[bool, str]:
         try:
             conteudo = Path(caminho).read_text(encoding="utf-8", errors="replace")
             corrigido = corrigir_conteudo_cue(conteudo)
-            Path(caminho).write_text(corrigido, encoding="utf-8")
+            self._cache_cue.escrever(caminho, corrigido)
             return True, "Arquivo CUE corrigido com sucesso."
         except Exception as exc:
             return False, f"Falha ao corrigir: {exc}"
 
     def assistente_mismatch(self, caminho: str) -> tuple[bool, str, dict[str, list[str]]]:
         try:
-            cue = carregar_cue(Path(caminho))
+            cue = self._cache_cue.carregar(caminho)
             sugestoes = detectar_mismatch_nomes(cue, Path(caminho).parent)
             if not sugestoes:
                 return True, "Nenhum mismatch encontrado.", {}
@@ -85,62 +357,292 @@ class ViewModelPrincipal(QtCore.QObject):
         except Exception as exc:
             return False, f"Falha no assistente: {exc}", {}
 
-    def aplicar_mapeamento(self, caminho: str, mapeamento: dict[str, str]) -> tuple[bool, str]:
+    def aplicar_mapeamento(
+        self, caminho: str, mapeamento: dict[str, str], simular: bool = False
+    ) -> tuple[bool, str]:
         try:
             conteudo = Path(caminho).read_text(encoding="utf-8", errors="replace")
-            novo = aplicar_mapeamento_nomes(conteudo, mapeamento)
-            Path(caminho).write_text(novo, encoding="utf-8")
-            return True, "CUE atualizado com novos nomes."
+            novo, edicoes = reescrever_nomes(conteudo, mapeamento)
+            if not edicoes:
+                return False, "Nenhuma linha FILE corresponde ao mapeamento."
+            descricao = "\n".join(
+                f"Linha {edicao.linha}: {edicao.antigo} -> {edicao.novo}" for edicao in edicoes
+            )
+            if simular:
+                return True, descricao
+            self._cache_cue.escrever(caminho, novo)
+            return True, "CUE atualizado com novos nomes.\n" + descricao
         except Exception as exc:
             return False, f"Falha ao aplicar mapeamento: {exc}"
 
-    def iniciar_simulacao(self, dev: str, velocidade: int, cue: str) -> None:
-        self._iniciar_executor(ExecutorCdrdaoFactory.criar_simulacao(dev, velocidade, cue))
+    def iniciar_simulacao(self, dev: str, velocidade: int, cue: str) -> str:
+        return self._enfileirar(
+            TrabalhoGravacao(dispositivo=dev, modo=MODO_SIMULAR, cue=cue, velocidade=velocidade)
+        )
 
-    def iniciar_gravacao(self, dev: str, velocidade: int, cue: str) -> None:
-        self._iniciar_executor(ExecutorCdrdaoFactory.criar_gravacao(dev, velocidade, cue))
+    def iniciar_gravacao(self, dev: str, velocidade: int, cue: str) -> str:
+        return self._enfileirar(
+            TrabalhoGravacao(dispositivo=dev, modo=MODO_GRAVAR, cue=cue, velocidade=velocidade)
+        )
+
+    def iniciar_apagar(self, dev: str) -> str:
+        return self._enfileirar(TrabalhoGravacao(dispositivo=dev, modo=MODO_APAGAR))
+
+    def iniciar_pipeline(
+        self, dev: str, velocidade: int, cue: str, simular: bool, verificar: bool = False
+    ) -> str:
+        etapas = _etapas_gravacao(simular, verificar)
+        return self._enfileirar(criar_pipeline(dev, etapas, cue, velocidade))
+
+    def iniciar_copias(
+        self,
+        devs: list[str],
+        velocidade: int,
+        cue: str,
+        simular: bool,
+        verificar: bool = False,
+    ) -> list[str]:
+        """Grava a mesma imagem em vários drives lendo a origem uma única vez."""
+        etapas = _etapas_gravacao(simular, verificar)
+        try:
+            trabalhos = criar_copias(devs, etapas, cue, velocidade)
+        except ValueError as exc:
+            self._append_log(str(exc))
+            return []
+        if not self._garantir_cache_imagens():
+            self._append_log("Cada drive lerá a imagem da origem.")
+        copias: dict[str, tuple[str, int | None]] = {}
+        for trabalho in trabalhos:
+            if identificador := self._enfileirar(trabalho):
+                copias[identificador] = (trabalho.dispositivo, None)
+        if copias:
+            self._copias[trabalhos[0].grupo] = copias
+            self._append_log(f"{len(copias)} cópias de {Path(cue).name} enfileiradas.")
+        return list(copias)
 
-    def iniciar_apagar(self, dev: str) -> None:
-        self._iniciar_executor(ExecutorCdrdaoFactory.criar_apagar(dev))
+    def definir_limite_concorrencia(self, limite: int) -> None:
+        self._agendador.definir_limite_concorrencia(limite)
 
-    def cancelar_operacao(self) -> None:
-        if self._executor:
-            self._executor.cancelar()
+    def cancelar_operacao(self, dev: str | None = None) -> None:
+        if self._agendador.em_execucao(dev) or self._agendador.pendentes(dev):
+            self._agendador.cancelar(dev)
             self.progresso_atualizado.emit("Cancelando operação...")
 
-    def _iniciar_executor(self, executor: ExecutorCdrdao) -> None:
-        if self._executor:
-            self._executor.cancelar()
-        self._executor = executor
-        executor.progresso.connect(self._ao_progresso)
-        executor.finalizado.connect(self._ao_finalizado)
-        executor.start()
+    def _garantir_cache_imagens(self) -> bool:
+        """Sem cache local configurado, cria um só para cópias e imagens comprimidas."""
+        if self._agendador.possui_cache_imagens():
+            return True
+        try:
+            cache = CacheImagens(diretorio_copias(), limite_cache_local(), self._cache_hashes)
+        except OSError as exc:
+            self._append_log(f"Cache de imagens indisponível ({exc}).")
+            return False
+        self._agendador.definir_cache_imagens(cache, preparar_todos=False)
+        return True
 
-    def _ao_progresso(self, progresso: ProgressoCdrdao) -> None:
+    def _enfileirar(self, trabalho: TrabalhoGravacao) -> str:
+        if trabalho.cue:
+            try:
+                ausentes = validar_arquivos_existem(
+                    self._cache_cue.carregar_resolvido(trabalho.cue)
+                )
+            except Exception as exc:
+                ausentes = [f"CUE inválido ({exc})"]
+            if ausentes:
+                self._append_log("Trabalho não enfileirado: " + ", ".join(ausentes))
+                self.progresso_drive.emit(trabalho.dispositivo, "CUE com problemas.")
+                return ""
+            if cue_comprimido(trabalho.cue) and not self._garantir_cache_imagens():
+                self._append_log("Trabalho não enfileirado: imagem comprimida sem cache local.")
+                self.progresso_drive.emit(trabalho.dispositivo, "Cache de imagens indisponível.")
+                return ""
+            if grava_midia(trabalho):
+                motivo = self._checar_capacidade(trabalho)
+                if motivo:
+                    self._append_log("Trabalho não enfileirado: " + motivo)
+                    self.progresso_drive.emit(trabalho.dispositivo, "Imagem não cabe na mídia.")
+                    return ""
+        self.estado.em_andamento = True
+        if trabalho.velocidade:
+            self._velocidades[trabalho.identificador] = trabalho.velocidade
+        if self._agendador.em_execucao(trabalho.dispositivo):
+            self.progresso_drive.emit(trabalho.dispositivo, "Aguardando na fila do drive...")
+        return self._agendador.enfileirar(trabalho)
+
+    def _checar_capacidade(self, trabalho: TrabalhoGravacao) -> str:
+        """Compara o layout com a mídia em cache; pode trocar o drive do trabalho."""
+        try:
+            layout = self._cache_cue.layout(trabalho.cue)
+        except (OSError, ValueError) as exc:
+            return f"layout do CUE inválido ({exc})"
+        caminhos = [
+            dispositivo.caminho
+            for dispositivo in self._registro_dispositivos.dispositivos()
+        ]
+        if trabalho.dispositivo not in caminhos:
+            caminhos.append(trabalho.dispositivo)
+        infos = [
+            candidato
+            for caminho in caminhos
+            if (candidato := self._consultor_info.em_cache(caminho)) is not None
+        ]
+        ocupados = {
+            candidato.caminho
+            for candidato in infos
+            if self._agendador.em_execucao(candidato.caminho)
+            or self._agendador.pendentes(candidato.caminho)
+        }
+        resultado = checar_capacidade(layout, trabalho.dispositivo, infos, ocupados)
+        if resultado.aviso:
+            self._append_log(f"[{trabalho.dispositivo}] Aviso: {resultado.aviso}.")
+            if self._consultor_info.em_cache(trabalho.dispositivo) is None:
+                # Aquece o cache para os próximos trabalhos deste drive.
+                self._consultor_info.consultar(
+                    trabalho.dispositivo, self._ao_info_dispositivo
+                )
+        if resultado.alternativo is not None:
+            self._append_log(
+                f"[{trabalho.dispositivo}] Mídia pequena demais;"
+                f" trabalho enviado para {resultado.alternativo}."
+            )
+            trabalho.dispositivo = resultado.alternativo
+        return resultado.motivo
+
+    def _ao_progresso(self, identificador: str, dev: str, progresso: ProgressoCdrdao) -> None:
         mensagem = progresso.mensagem
         if progresso.faixa:
             mensagem = f"Escrevendo track {progresso.faixa} - {mensagem}"
         if progresso.buffer:
             mensagem = f"{mensagem} (Buffer {progresso.buffer})"
-        self.progresso_atualizado.emit(mensagem)
-        self._append_log(mensagem)
+        if progresso.velocidade_x is not None:
+            mensagem = f"{mensagem} - {progresso.velocidade_x:.1f}x"
+        if progresso.eta_segundos is not None:
+            minutos, segundos = divmod(int(progresso.eta_segundos), 60)
+            mensagem = f"{mensagem}, restam {minutos:02d}:{segundos:02d}"
+        self.progresso_drive.emit(dev, mensagem)
+        self.progresso_atualizado.emit(f"[{dev}] {mensagem}")
+        self._append_log(f"[{dev}] {mensagem}", identificador)
 
-    def _ao_finalizado(self, codigo: int, log: str) -> None:
-        self._append_log("Operação finalizada." if codigo == 0 else "Operação falhou.")
-        self._append_log(log)
-        diagnostico = self._classificador.classificar(log)
-        if diagnostico:
-            texto = (
-                f"{diagnostico.titulo}\n{diagnostico.explicacao}\n"
-                f"Causa provável: {diagnostico.causa_provavel}\n"
-                f"Como resolver: {diagnostico.como_resolver}\n"
-                f"Ações: {', '.join(diagnostico.acoes)}"
-            )
-            self.diagnostico_atualizado.emit(texto)
+    def _ao_etapa_finalizada(
+        self, identificador: str, dev: str, modo: str, codigo: int, log: str, duracao: float
+    ) -> None:
+        situacao = "finalizada" if codigo == 0 else "falhou"
+        self._append_log(
+            f"[{dev}] Etapa {NOMES_ETAPAS.get(modo, modo)} {situacao} em {duracao:.1f}s.",
+            identificador,
+        )
+        self._append_log(log, identificador)
+
+    def _ao_erro(self, identificador: str, dev: str, ocorrencia: OcorrenciaErro) -> None:
+        diagnostico = ocorrencia.diagnostico
+        texto = (
+            f"[{dev}] {diagnostico.titulo} (linha {ocorrencia.linha}, {ocorrencia.severidade})\n"
+            f"{ocorrencia.texto}\n{diagnostico.explicacao}\n"
+            f"Causa provável: {diagnostico.causa_provavel}\n"
+            f"Como resolver: {diagnostico.como_resolver}\n"
+            f"Ações: {', '.join(diagnostico.acoes)}"
+        )
+        self.diagnostico_atualizado.emit(texto)
+        if ocorrencia.fatal:
+            self._append_log(f"[{dev}] Falha fatal detectada: {diagnostico.titulo}", identificador)
+
+    def _ao_reenfileirado(
+        self, identificador: str, dev: str, motivo: str, velocidade: int
+    ) -> None:
+        self._append_log(f"[{dev}] Trabalho reenfileirado após: {motivo}", identificador)
+        pedida = self._velocidades.get(identificador)
+        if velocidade and pedida != velocidade:
+            # A nova tentativa pode ter reduzido a velocidade pedida.
+            self._velocidades[identificador] = velocidade
+            if pedida:
+                self._append_log(
+                    f"[{dev}] Nova tentativa a {velocidade}x (antes {pedida}x).",
+                    identificador,
+                )
+        self.progresso_drive.emit(dev, "Reenfileirado, aguardando nova tentativa...")
+
+    def _ao_aviso_trabalho(self, identificador: str, dev: str, mensagem: str) -> None:
+        self._append_log(f"[{dev}] {mensagem}", identificador)
+        self.progresso_drive.emit(dev, mensagem)
 
-    def _append_log(self, texto: str) -> None:
-        self.estado.ultimo_log += texto + "\n"
-        self.log_atualizado.emit(self.estado.ultimo_log)
+    def _ao_pre_leitura(
+        self, identificador: str, dev: str, estatistica: EstatisticaPreLeitura
+    ) -> None:
+        self._append_log(f"[{dev}] {formatar_estatistica(estatistica)}", identificador)
+
+    def _ao_finalizado(self, identificador: str, dev: str, codigo: int, log: str) -> None:
+        self._consultor_info.invalidar(dev)
+        self.estado.em_andamento = not self._agendador.ocioso()
+        self._velocidades.pop(identificador, None)
+        self._append_log(
+            f"[{dev}] Operação finalizada." if codigo == 0 else f"[{dev}] Operação falhou.",
+            identificador,
+        )
+        if registro := self._logs_trabalhos.get(identificador):
+            registro.fechar()
+        self._registrar_copia(identificador, codigo)
+
+    def _registrar_copia(self, identificador: str, codigo: int) -> None:
+        grupo = next(
+            (grupo for grupo, copias in self._copias.items() if identificador in copias),
+            None,
+        )
+        if grupo is None:
+            return
+        copias = self._copias[grupo]
+        copias[identificador] = (copias[identificador][0], codigo)
+        if any(resultado is None for _, resultado in copias.values()):
+            return
+        del self._copias[grupo]
+        falhas = [dev for dev, resultado in copias.values() if resultado != 0]
+        resumo = f"Cópias: {len(copias) - len(falhas)} de {len(copias)} gravadas."
+        if falhas:
+            resumo += " Falharam: " + ", ".join(falhas) + "."
+        self._append_log(resumo)
+        self.progresso_atualizado.emit(resumo)
+
+    def _ao_telemetria(self, identificador: str, dev: str, serie: SerieTelemetria) -> None:
+        velocidade_pedida = self._velocidades.get(identificador)
+        partes = []
+        media = serie.velocidade_media()
+        if media is not None:
+            velocidade_x = media * 1024 * 1024 / BYTES_POR_SEGUNDO_1X
+            partes.append(f"velocidade média {media:.2f} MB/s ({velocidade_x:.1f}x)")
+            if velocidade_pedida and velocidade_x < velocidade_pedida * TOLERANCIA_VELOCIDADE:
+                partes.append(f"abaixo dos {velocidade_pedida}x pedidos")
+        buffer_minimo = serie.buffer_drive_minimo()
+        if buffer_minimo is not None:
+            partes.append(f"buffer mínimo do drive {buffer_minimo}%")
+            if buffer_minimo < BUFFER_DRIVE_RISCO:
+                partes.append("risco de buffer underrun")
+        fifo_minimo = serie.fifo_host_minimo()
+        if fifo_minimo is not None:
+            partes.append(f"FIFO mínimo {fifo_minimo}%")
+        if partes:
+            self._append_log(f"[{dev}] Telemetria: " + ", ".join(partes), identificador)
+
+    def _ao_trabalho_iniciado(self, identificador: str, dev: str) -> None:
+        if self._diretorio_logs is None or identificador in self._logs_trabalhos:
+            return
+        arquivo = self._diretorio_logs / f"{identificador}.log"
+        try:
+            registro = RegistroLog(arquivo=arquivo)
+        except OSError as exc:
+            self._append_log(f"[{dev}] Log em disco indisponível ({exc}).")
+            return
+        self._logs_trabalhos[identificador] = registro
+        while len(self._logs_trabalhos) > MAX_LOGS_TRABALHOS:
+            _, antigo = self._logs_trabalhos.popitem(last=False)
+            antigo.fechar()
+        self._append_log(f"[{dev}] Log completo em {arquivo}", identificador)
+
+    def _append_log(self, texto: str, identificador: str | None = None) -> None:
+        linhas = self.estado.log.anexar(texto)
+        if identificador is not None and (
+            registro := self._logs_trabalhos.get(identificador)
+        ):
+            registro.anexar(texto)
+        self.log_anexado.emit("\n".join(linhas))
 
     def gerar_relatorio(self, dev: str, cue: str, comando: str, log: str) -> str:
         return (
@@ -153,8 +655,37 @@ class ViewModelPrincipal(QtCore.QObject):
         )
 
     def obter_info_drive(self, dev: str) -> None:
-        info = info_drive_cdrdao(dev) + "\n" + info_midia_cdrdao(dev)
-        self.info_drive_atualizada.emit(info)
+        self._dispositivo_info = dev
+        if self._agendador.em_execucao(dev):
+            self.info_drive_atualizada.emit(f"{dev}: em uso por um trabalho.")
+            return
+        self._consultor_info.consultar(dev, self._ao_info_dispositivo)
+
+    def preflight_dispositivos(self) -> list[str]:
+        livres = [
+            dispositivo.caminho
+            for dispositivo in self._registro_dispositivos.dispositivos()
+            if not self._agendador.em_execucao(dispositivo.caminho)
+        ]
+        self._inventario_pendente.update(livres)
+        self._consultor_info.consultar_todos(livres, self._ao_info_dispositivo)
+        return livres
+
+    def _registrar_inventario(self, dev: str, info: InfoDispositivo) -> None:
+        if dev not in self._inventario_pendente:
+            return
+        self._inventario_pendente.discard(dev)
+        resumo = formatar_info(info).split("\n\n", 1)[0]
+        self._append_log(f"[{dev}] " + resumo.replace("\n", "; "))
+
+    def info_em_cache(self, dev: str) -> InfoDispositivo | None:
+        return self._consultor_info.em_cache(dev)
+
+    def _ao_info_dispositivo(self, info: InfoDispositivo) -> None:
+        # Pode chegar pela thread do supervisor; só sinais atravessam para a interface.
+        self.info_dispositivo_atualizada.emit(info.caminho, info)
+        if info.caminho == self._dispositivo_info:
+            self.info_drive_atualizada.emit(formatar_info(info))
 
     def verificar_grupo(self) -> tuple[bool, str | None]:
         grupo = detectar_grupo_optico()
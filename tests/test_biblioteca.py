@@ -0,0 +1,67 @@
+import os
+from pathlib import Path
+
+from gravador_cdrdao import biblioteca
+from gravador_cdrdao.biblioteca import IndiceBiblioteca, validar_biblioteca
+
+CUE = 'FILE "{nome}" BINARY\nTRACK 01 MODE2/2352\nINDEX 01 00:00:00\n'
+
+
+def test_validar_biblioteca_incremental(tmp_path: Path):
+    for numero in range(3):
+        pasta = tmp_path / f"jogo{numero}"
+        pasta.mkdir()
+        (pasta / "jogo.cue").write_text(CUE.format(nome="jogo.bin"), encoding="utf-8")
+        (pasta / "jogo.bin").write_bytes(b"\0" * 2352)
+    (tmp_path / "jogo2" / "jogo.bin").unlink()
+    indice = IndiceBiblioteca(tmp_path / "indice.sqlite3")
+    try:
+        resumo = validar_biblioteca(tmp_path, indice, max_processos=1)
+        assert (resumo.total, resumo.processados, resumo.reaproveitados) == (3, 3, 0)
+        assert [Path(r.caminho).parent.name for r in resumo.invalidos] == ["jogo2"]
+        assert resumo.invalidos[0].mismatch
+
+        resumo = validar_biblioteca(tmp_path, indice, max_processos=1)
+        assert (resumo.processados, resumo.reaproveitados) == (0, 3)
+        assert len(resumo.invalidos) == 1
+
+        (tmp_path / "jogo2" / "jogo.bin").write_bytes(b"\0" * 2352)
+        bin0 = tmp_path / "jogo0" / "jogo.bin"
+        bin0.write_bytes(b"\1" * 4704)
+        os.utime(bin0, ns=(1, 1))
+        (tmp_path / "jogo1" / "jogo.cue").unlink()
+        resumo = validar_biblioteca(tmp_path, indice, com_hashes=True, max_processos=1)
+        assert (resumo.total, resumo.processados, resumo.removidos) == (2, 2, 1)
+        assert resumo.invalidos == []
+        resultado = indice.obter(str(tmp_path / "jogo0" / "jogo.cue"))
+        assert resultado.tamanho_total == 4704
+        assert resultado.hashes[str(bin0)]["crc32"]
+    finally:
+        indice.fechar()
+
+
+def test_cue_quebrado_ou_bin_ilegivel_nao_interrompe(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", str(Path(biblioteca.__file__).parents[1]))
+    (tmp_path / "quebrado.cue").symlink_to(tmp_path / "sumiu.cue")
+    ilegivel = tmp_path / "ilegivel"
+    ilegivel.mkdir()
+    (ilegivel / "jogo.cue").write_text(CUE.format(nome="jogo.bin"), encoding="utf-8")
+    # Um diretório passa no stat, mas a leitura para os hashes falha.
+    (ilegivel / "jogo.bin").mkdir()
+    bom = tmp_path / "bom"
+    bom.mkdir()
+    (bom / "jogo.cue").write_text(CUE.format(nome="jogo.bin"), encoding="utf-8")
+    (bom / "jogo.bin").write_bytes(b"\0" * 2352)
+    indice = IndiceBiblioteca(tmp_path / "indice.sqlite3")
+    try:
+        resumo = validar_biblioteca(tmp_path, indice, com_hashes=True, max_processos=2)
+        assert resumo.processados == 3
+        erros = {
+            Path(r.caminho).relative_to(tmp_path).parts[0]: r.erro
+            for r in resumo.invalidos
+        }
+        assert sorted(erros) == ["ilegivel", "quebrado.cue"]
+        assert "Falha ao ler" in erros["ilegivel"]
+        assert indice.obter(str(bom / "jogo.cue")).hashes
+    finally:
+        indice.fechar()
@@ -0,0 +1,43 @@
+import os
+from pathlib import Path
+
+from gravador_cdrdao.cache_cue import CacheCue
+
+CUE = 'FILE "jogo.bin" BINARY\nTRACK 01 MODE2/2352\nINDEX 01 00:00:00\n'
+
+
+def test_cache_cue_reaproveita_e_invalida(tmp_path: Path):
+    caminho = tmp_path / "jogo.cue"
+    caminho.write_text(CUE, encoding="utf-8")
+    cache = CacheCue()
+
+    primeiro = cache.carregar(caminho)
+    assert cache.carregar(str(caminho)) is primeiro
+    resolvido = cache.carregar_resolvido(caminho)
+    assert resolvido.arquivos[0].caminho == str(tmp_path / "jogo.bin")
+    assert (cache.falhas, cache.acertos) == (1, 2)
+
+    caminho.chmod(0o640)
+    cache.escrever(caminho, CUE.replace("jogo.bin", "outro.bin"))
+    assert cache.carregar(caminho).arquivos[0].caminho == "outro.bin"
+    assert caminho.stat().st_mode & 0o777 == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["jogo.cue"]
+
+    caminho.write_text(CUE, encoding="utf-8")
+    os.utime(caminho, ns=(0, 0))
+    assert cache.carregar(caminho).arquivos[0].caminho == "jogo.bin"
+    assert cache.falhas == 3
+
+
+def test_cache_cue_respeita_orcamento(tmp_path: Path):
+    cache = CacheCue(limite_bytes=len(CUE) * 2)
+    caminhos = []
+    for numero in range(3):
+        caminho = tmp_path / f"{numero}.cue"
+        caminho.write_text(CUE, encoding="utf-8")
+        caminhos.append(caminho)
+        cache.carregar(caminho)
+    assert len(cache) == 2
+    assert cache.bytes_usados == len(CUE) * 2
+    cache.carregar(caminhos[0])
+    assert cache.falhas == 4
@@ -0,0 +1,108 @@
+import gzip
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from gravador_cdrdao import cache_imagens
+from gravador_cdrdao.cache_imagens import CacheImagens, cue_comprimido
+from gravador_cdrdao.parser_cue import carregar_cue
+
+
+def _criar_cue(pasta: Path, nome: str, dados: bytes) -> Path:
+    pasta.mkdir(parents=True, exist_ok=True)
+    (pasta / f"{nome}.bin").write_bytes(dados)
+    cue = pasta / f"{nome}.cue"
+    cue.write_text(
+        f'FILE "{nome}.bin" BINARY\nTRACK 01 MODE2/2352\nINDEX 01 00:00:00\n',
+        encoding="utf-8",
+    )
+    return cue
+
+
+def test_conteudo_igual_copiado_uma_vez(tmp_path: Path):
+    dados = bytes(range(256)) * 2352
+    primeiro = _criar_cue(tmp_path / "nas" / "a", "jogo", dados)
+    segundo = _criar_cue(tmp_path / "nas" / "b", "copia", dados)
+    cache = CacheImagens(tmp_path / "local")
+
+    local = cache.preparar_cue(primeiro, "t1")
+    assert cache.preparar_cue(primeiro, "t2") == local
+    cache.preparar_cue(segundo, "t3")
+
+    arquivo = carregar_cue(Path(local)).arquivos[0].caminho
+    assert Path(arquivo).parent == tmp_path / "local"
+    assert Path(arquivo).read_bytes() == dados
+    assert cache.acertos == 1
+    assert len(list((tmp_path / "local").glob("*.bin"))) == 1
+
+
+def test_travas_por_origem_liberadas_apos_a_copia(tmp_path: Path):
+    cue = _criar_cue(tmp_path / "nas", "jogo", bytes(2352 * 4))
+    cache = CacheImagens(tmp_path / "local")
+    with ThreadPoolExecutor(4) as executor:
+        locais = set(executor.map(lambda n: cache.preparar_cue(cue, f"t{n}"), range(8)))
+    assert len(locais) == 1
+    (tmp_path / "nas" / "jogo.bin").unlink()
+    with pytest.raises(OSError):
+        cache.preparar_cue(cue, "t9")
+    assert cache._travas_origem == {} and cache._usos_origem == {}
+
+
+def test_cue_com_bom_e_aspas_tipograficas_aponta_para_o_cache(
+    tmp_path: Path, monkeypatch
+):
+    origem = tmp_path / "nas"
+    origem.mkdir()
+    (origem / "jogo.bin").write_bytes(bytes(2352 * 4))
+    cue = origem / "jogo.cue"
+    cue.write_text(
+        "\ufeffFILE “jogo.bin” BINARY\r\n"
+        "TRACK 01 MODE2/2352\r\nINDEX 01 00:00:00\r\n",
+        encoding="utf-8",
+    )
+    cache = CacheImagens(tmp_path / "local")
+    local = carregar_cue(Path(cache.preparar_cue(cue, "t1")))
+    assert Path(local.arquivos[0].caminho).parent == tmp_path / "local"
+
+    monkeypatch.setattr(cache_imagens, "reescrever_nomes", lambda texto, _: (texto, []))
+    with pytest.raises(ValueError, match="jogo.bin"):
+        cache.preparar_cue(cue, "t2")
+
+
+def test_lru_respeita_orcamento_e_trabalhos_ativos(tmp_path: Path):
+    tamanho = 2352 * 100
+    cues = [_criar_cue(tmp_path / "nas", f"jogo{n}", bytes([n]) * tamanho) for n in range(3)]
+    cache = CacheImagens(tmp_path / "local", limite_bytes=2 * tamanho + 1024)
+
+    cache.preparar_cue(cues[0], "t0")
+    cache.preparar_cue(cues[1], "t1")
+    cache.liberar("t0")
+    cache.preparar_cue(cues[2], "t2")
+    assert cache.bytes_usados <= cache.limite_bytes
+    restantes = {p.name for p in (tmp_path / "local").glob("*.bin")}
+    esperados = {hashlib.sha1(bytes([n]) * tamanho).hexdigest() + ".bin" for n in (1, 2)}
+    assert restantes == esperados
+
+    with pytest.raises(OSError, match="sem espaço"):
+        cache.preparar_cue(cues[0], "t3")
+
+    # Reaberto, o cache reconhece os arquivos já copiados.
+    assert CacheImagens(tmp_path / "local").bytes_usados == cache.bytes_usados
+
+
+def test_bin_comprimido_decodificado_na_copia(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", str(Path(cache_imagens.__file__).parents[1]))
+    dados = bytes(range(256)) * 2352
+    cue = _criar_cue(tmp_path / "nas", "jogo", b"")
+    bin_original = tmp_path / "nas" / "jogo.bin"
+    with gzip.open(bin_original.with_name("jogo.bin.gz"), "wb") as arquivo:
+        arquivo.write(dados)
+    bin_original.unlink()
+    assert cue_comprimido(cue)
+
+    local = CacheImagens(tmp_path / "local").preparar_cue(cue, "t1")
+    arquivo = carregar_cue(Path(local)).arquivos[0].caminho
+    assert arquivo == str(tmp_path / "local" / (hashlib.sha1(dados).hexdigest() + ".bin"))
+    assert Path(arquivo).read_bytes() == dados
@@ -0,0 +1,210 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from gravador_cdrdao import cli, execucao_sincrona
+from gravador_cdrdao.cli import ler_fila, main
+from gravador_cdrdao.fila_trabalhos import MODO_GRAVAR, MODO_SIMULAR, criar_pipeline
+from gravador_cdrdao.info_drive import InfoDispositivo
+from gravador_cdrdao.supervisor_processos import SupervisorProcessos
+
+
+def _criar_cue(tmp_path: Path, nome_bin: str = "jogo.bin") -> Path:
+    (tmp_path / "jogo.bin").write_bytes(bytes(2352 * 10))
+    cue = tmp_path / "jogo.cue"
+    cue.write_text(
+        f'FILE "{nome_bin}" BINARY\nTRACK 01 MODE2/2352\nINDEX 01 00:00:00\n',
+        encoding="utf-8",
+    )
+    return cue
+
+
+def test_cli_nao_importa_qt_nem_asyncio(tmp_path: Path):
+    cue = _criar_cue(tmp_path)
+    codigo = (
+        "import sys\n"
+        "from gravador_cdrdao.cli import main\n"
+        f"main(['validate', {str(cue)!r}])\n"
+        "print(sorted(m for m in ('PySide6', 'asyncio', 'sqlite3') if m in sys.modules))\n"
+    )
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1] / "src",
+    ).stdout
+    assert saida.splitlines()[-1] == "[]"
+
+
+# Orçamento de importação do módulo da CLI, medido com -X importtime. Hoje fica
+# por volta de 90 ms; só o PySide6.QtCore leva uns 150 ms.
+ORCAMENTO_PARTIDA_US = 250_000
+
+
+def test_partida_da_cli_dentro_do_orcamento():
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import gravador_cdrdao.cli"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1] / "src",
+    ).stderr
+    # "import time: self [us] | cumulative | nome"; a última linha é o módulo raiz.
+    linha = next(
+        linha
+        for linha in reversed(saida.splitlines())
+        if linha.endswith(" gravador_cdrdao.cli")
+    )
+    acumulado = int(linha.split("|")[1])
+    assert acumulado < ORCAMENTO_PARTIDA_US
+
+
+def test_validate_dat_sem_indice_e_importacao(tmp_path: Path, monkeypatch, capsys):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    cue = _criar_cue(tmp_path)
+    assert main(["validate", str(cue), "--dat"]) == 1
+    assert "dat import" in capsys.readouterr().err
+
+    dat = tmp_path / "ps1.dat"
+    dat.write_text(
+        "<datafile><game name='Jogo (USA)'>"
+        f"<rom name='jogo.bin' size='{2352 * 10}' crc='00000000'/></game></datafile>",
+        encoding="utf-8",
+    )
+    assert main(["dat", "import", str(dat)]) == 0
+    assert "1 ROMs" in capsys.readouterr().out
+    assert main(["validate", str(cue), "--dat"]) == 0
+    assert "Dump não encontrado no DAT." in capsys.readouterr().out
+    (tmp_path / "quebrado.dat").write_text("<datafile>", encoding="utf-8")
+    assert main(["dat", "import", str(tmp_path / "quebrado.dat")]) == 1
+
+
+def test_validate_e_fix(tmp_path: Path, capsys):
+    cue = _criar_cue(tmp_path, "Jogo (Track 1).bin")
+    assert main(["validate", str(cue)]) == 1
+    assert main(["fix", str(cue), "--mapa", "Jogo (Track 1).bin=jogo.bin", "--simular"]) == 0
+    assert "Jogo (Track 1).bin" in cue.read_text(encoding="utf-8")
+    assert main(["fix", str(cue), "--mapa", "Jogo (Track 1).bin=jogo.bin"]) == 0
+    assert main(["validate", str(cue)]) == 0
+    assert "10 setores" in capsys.readouterr().out
+
+
+def test_ler_fila(tmp_path: Path):
+    fila = tmp_path / "fila.jsonl"
+    fila.write_text(
+        "# comentário\n"
+        '{"dispositivo": "/dev/sr0", "cue": "a.cue", "etapas": ["simular", "gravar"]}\n'
+        '{"dispositivo": "/dev/sr1", "etapas": ["apagar"]}\n',
+        encoding="utf-8",
+    )
+    trabalhos = ler_fila(fila)
+    assert [(t.dispositivo, t.modo, t.etapas_seguintes) for t in trabalhos] == [
+        ("/dev/sr0", MODO_SIMULAR, [MODO_GRAVAR]),
+        ("/dev/sr1", "apagar", []),
+    ]
+    fila.write_text('{"cue": "a.cue"}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="Linha 1"):
+        ler_fila(fila)
+
+
+def test_executar_trabalho_repete_com_velocidade_menor(monkeypatch):
+    comandos = []
+
+    def comando_falso(trabalho):
+        comandos.append((trabalho.modo, trabalho.velocidade))
+        if trabalho.modo == MODO_GRAVAR and trabalho.velocidade > 4:
+            # Fica pendurado: só termina se o erro fatal cancelar a etapa.
+            codigo = "import time; print('illegal write speed', flush=True); time.sleep(30)"
+            return [sys.executable, "-c", codigo]
+        return [sys.executable, "-c", "print('ok')"]
+
+    monkeypatch.setattr(execucao_sincrona, "comando_trabalho", comando_falso)
+    supervisor = SupervisorProcessos()
+    trabalho = criar_pipeline("/dev/sr0", [MODO_SIMULAR, MODO_GRAVAR], "a.cue", 8)
+    try:
+        resultado = execucao_sincrona.executar_trabalho(trabalho, supervisor=supervisor)
+    finally:
+        supervisor.encerrar(5)
+    assert resultado.sucesso
+    assert comandos == [(MODO_SIMULAR, 8), (MODO_GRAVAR, 8), (MODO_GRAVAR, 4)]
+    assert trabalho.tentativas == 1
+
+
+def test_aviso_nao_fatal_nao_reprova_a_etapa(monkeypatch):
+    # "permission denied" casa com uma regra de severidade "erro", não fatal.
+    codigo = "print('warning: permission denied on /tmp/x', flush=True)"
+    monkeypatch.setattr(
+        execucao_sincrona, "comando_trabalho", lambda _: [sys.executable, "-c", codigo]
+    )
+    supervisor = SupervisorProcessos()
+    trabalho = criar_pipeline("/dev/sr0", [MODO_SIMULAR, MODO_GRAVAR], "a.cue", 8)
+    try:
+        resultado = execucao_sincrona.executar_trabalho(trabalho, supervisor=supervisor)
+    finally:
+        supervisor.encerrar(5)
+    assert [o.regra for o in resultado.ocorrencias] == ["permissao"]
+    assert resultado.sucesso
+    assert trabalho.modo == MODO_GRAVAR
+
+
+def test_copias_leem_origem_uma_vez_e_falham_isoladas(tmp_path: Path, monkeypatch, capsys):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.delenv("GRAVADOR_CDRDAO_CACHE_LOCAL", raising=False)
+    monkeypatch.setattr("os.geteuid", lambda: 1000)
+    cue = _criar_cue(tmp_path)
+    lidos = []
+
+    def comando_falso(trabalho):
+        lidos.append(trabalho.cue)
+        codigo = 3 if trabalho.dispositivo == "/dev/sr1" else 0
+        return [sys.executable, "-c", f"raise SystemExit({codigo})"]
+
+    monkeypatch.setattr(execucao_sincrona, "comando_trabalho", comando_falso)
+    monkeypatch.setattr(cli, "_consultar_midias", lambda _: [])
+    dispositivos = ["/dev/sr0", "/dev/sr1", "/dev/sr2"]
+    argv = ["burn", str(cue), "--speed", "4"]
+    for dispositivo in dispositivos:
+        argv += ["--device", dispositivo]
+
+    assert main(argv) == 1
+    assert len(lidos) == 3 and len(set(lidos)) == 1
+    assert Path(lidos[0]).parent == tmp_path / "cache" / "gravador-cdrdao" / "imagens"
+    assert len(list(Path(lidos[0]).parent.glob("*.bin"))) == 1
+    assert "2 de 3 trabalhos concluídos." in capsys.readouterr().out
+
+
+def _midia_vazia(caminho: str, livres: int) -> InfoDispositivo:
+    return InfoDispositivo(
+        caminho, midia_presente=True, vazia=True, capacidade_restante=livres
+    )
+
+
+def test_burn_confere_capacidade_da_midia(tmp_path: Path, monkeypatch, capsys):
+    monkeypatch.setattr("os.geteuid", lambda: 1000)
+    monkeypatch.delenv("GRAVADOR_CDRDAO_CACHE_LOCAL", raising=False)
+    cue = _criar_cue(tmp_path)
+    comandos = []
+    monkeypatch.setattr(
+        execucao_sincrona,
+        "comando_trabalho",
+        lambda trabalho: comandos.append(trabalho) or [sys.executable, "-c", ""],
+    )
+    infos = [
+        _midia_vazia("/dev/sr0", 5),
+        _midia_vazia("/dev/sr1", 50),
+    ]
+    monkeypatch.setattr(cli, "_consultar_midias", lambda caminhos: infos)
+
+    # A sr1 tem espaço, mas a CLI não troca o drive pedido.
+    assert main(["burn", str(cue), "--device", "/dev/sr0"]) == 1
+    assert comandos == []
+    erro = capsys.readouterr().err
+    assert "10 setores (00:00:10) não cabem nos 5 livres em /dev/sr0" in erro
+
+    infos[:] = [InfoDispositivo("/dev/sr2")]
+    assert main(["burn", str(cue), "--device", "/dev/sr2"]) == 0
+    assert len(comandos) == 1
+    assert "capacidade livre de /dev/sr2 desconhecida" in capsys.readouterr().err
@@ -0,0 +1,86 @@
+import pytest
+
+from gravador_cdrdao.fila_trabalhos import (
+    MODO_GRAVAR,
+    MODO_SIMULAR,
+    FilaTrabalhos,
+    TrabalhoGravacao,
+    criar_copias,
+    criar_pipeline,
+)
+
+
+def _trabalho(dev: str, modo: str = MODO_GRAVAR) -> TrabalhoGravacao:
+    return TrabalhoGravacao(dispositivo=dev, modo=modo, cue="disco.cue", velocidade=8)
+
+
+def test_um_trabalho_por_drive_em_paralelo():
+    fila = FilaTrabalhos()
+    a1, a2, b1 = _trabalho("/dev/sr0"), _trabalho("/dev/sr0"), _trabalho("/dev/sr1")
+    for trabalho in (a1, a2, b1):
+        fila.adicionar(trabalho)
+    assert fila.proximos() == [a1, b1]
+    assert fila.proximos() == []
+    assert fila.concluir(a1.identificador) is a1
+    assert fila.proximos() == [a2]
+
+
+def test_limite_concorrencia():
+    fila = FilaTrabalhos(limite_concorrencia=1)
+    a, b = _trabalho("/dev/sr0"), _trabalho("/dev/sr1", MODO_SIMULAR)
+    fila.adicionar(a)
+    fila.adicionar(b)
+    assert fila.proximos() == [a]
+    fila.concluir(a.identificador)
+    assert fila.proximos() == [b]
+    fila.concluir(b.identificador)
+    assert fila.vazia()
+
+
+def test_remover_pendentes_por_drive():
+    fila = FilaTrabalhos()
+    fila.adicionar(_trabalho("/dev/sr0"))
+    fila.adicionar(_trabalho("/dev/sr1"))
+    removidos = fila.remover_pendentes("/dev/sr0")
+    assert [t.dispositivo for t in removidos] == ["/dev/sr0"]
+    assert [t.dispositivo for t in fila.pendentes()] == ["/dev/sr1"]
+
+
+def test_modo_invalido():
+    with pytest.raises(ValueError):
+        FilaTrabalhos().adicionar(_trabalho("/dev/sr0", "formatar"))
+
+
+def test_pipeline_avanca_no_mesmo_drive_sem_liberar_vaga():
+    fila = FilaTrabalhos(limite_concorrencia=1)
+    pipeline = criar_pipeline("/dev/sr0", [MODO_SIMULAR, MODO_GRAVAR], "disco.cue", 4)
+    outro = _trabalho("/dev/sr1")
+    fila.adicionar(pipeline)
+    fila.adicionar(outro)
+    assert fila.proximos() == [pipeline]
+    assert fila.avancar(pipeline.identificador) is pipeline
+    assert pipeline.modo == MODO_GRAVAR
+    assert fila.proximos() == []
+    assert fila.avancar(pipeline.identificador) is None
+    fila.concluir(pipeline.identificador)
+    assert fila.proximos() == [outro]
+
+
+def test_reenfileirado_volta_para_o_inicio_da_fila():
+    fila = FilaTrabalhos()
+    a1, a2 = _trabalho("/dev/sr0"), _trabalho("/dev/sr0")
+    fila.adicionar(a1)
+    fila.adicionar(a2)
+    assert fila.proximos() == [a1]
+    fila.concluir(a1.identificador)
+    fila.adicionar(a1, prioritario=True)
+    assert fila.proximos() == [a1]
+
+
+def test_criar_copias_compartilha_grupo():
+    trabalhos = criar_copias(["/dev/sr0", "/dev/sr1"], [MODO_GRAVAR], "a.cue", 8)
+    assert [t.dispositivo for t in trabalhos] == ["/dev/sr0", "/dev/sr1"]
+    assert trabalhos[0].grupo and trabalhos[0].grupo == trabalhos[1].grupo
+    assert trabalhos[0].identificador != trabalhos[1].identificador
+    with pytest.raises(ValueError):
+        criar_copias([], [MODO_GRAVAR], "a.cue")
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import threading
+import zlib
+from pathlib import Path
+
+import gravador_cdrdao
+from gravador_cdrdao.hashes_imagem import (
+    CacheHashes,
+    HashesArquivo,
+    cache_hashes_padrao,
+    calcular_hashes,
+    calcular_hashes_cue,
+    main,
+)
+from gravador_cdrdao.parser_cue import ArquivoCue, CueSheet
+
+
+def test_calcular_hashes_em_uma_passada(tmp_path: Path):
+    dados = bytes(range(256)) * 5000
+    arquivo = tmp_path / "faixa.bin"
+    arquivo.write_bytes(dados)
+    hashes = calcular_hashes(arquivo)
+    assert hashes.tamanho == len(dados)
+    assert hashes.crc32 == f"{zlib.crc32(dados):08x}"
+    assert hashes.md5 == hashlib.md5(dados).hexdigest()
+    assert hashes.sha1 == hashlib.sha1(dados).hexdigest()
+
+
+def test_cache_evita_recalculo_e_persiste(tmp_path: Path, monkeypatch):
+    # Os processos saem de um forkserver, que não herda o sys.path do pytest.
+    monkeypatch.setenv("PYTHONPATH", str(Path(gravador_cdrdao.__file__).parents[1]))
+    caminhos = []
+    for numero in range(3):
+        caminho = tmp_path / f"faixa{numero}.bin"
+        caminho.write_bytes(bytes([numero]) * 1000)
+        caminhos.append(str(caminho))
+    cue = CueSheet(
+        arquivos=[ArquivoCue(caminho=c, tipo="BINARY", faixas=[]) for c in caminhos]
+    )
+    arquivo_cache = tmp_path / "cache" / "hashes.json"
+
+    primeiro = calcular_hashes_cue(cue, CacheHashes(arquivo_cache), max_processos=2)
+    assert arquivo_cache.exists()
+
+    cache = CacheHashes(arquivo_cache)
+    assert cache.obter(caminhos[0]) == primeiro[caminhos[0]]
+    Path(caminhos[1]).write_bytes(b"alterado")
+    assert cache.obter(caminhos[1]) is None
+    segundo = calcular_hashes_cue(cue, cache)
+    assert segundo[caminhos[1]].tamanho == len(b"alterado")
+    assert segundo[caminhos[0]] == primeiro[caminhos[0]]
+
+
+def test_cache_compartilhado_entre_threads(tmp_path: Path):
+    cache = CacheHashes(tmp_path / "hashes.json")
+    hashes = HashesArquivo(tamanho=1, crc32="0", md5="0", sha1="0")
+
+    def guardar() -> None:
+        for numero in range(20000):
+            cache.guardar(str(numero), hashes)
+
+    thread = threading.Thread(target=guardar)
+    thread.start()
+    while thread.is_alive():
+        cache.salvar()
+    thread.join()
+    cache.salvar()
+    assert len(json.loads((tmp_path / "hashes.json").read_text())) == 20000
+
+
+def test_processo_de_hashes_grava_no_cache_padrao(tmp_path: Path, monkeypatch, capsys):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    (tmp_path / "jogo.bin").write_bytes(bytes(2352))
+    cue = tmp_path / "jogo.cue"
+    cue.write_text('FILE "jogo.bin" BINARY\nTRACK 01 MODE2/2352\nINDEX 01 00:00:00\n')
+    cache = cache_hashes_padrao()
+    assert cache.obter(tmp_path / "jogo.bin") is None
+
+    assert main([str(cue)]) == 0
+    assert "jogo.bin: 2352 bytes" in capsys.readouterr().out
+    cache.recarregar()
+    assert cache.obter(tmp_path / "jogo.bin").tamanho == 2352
@@ -0,0 +1,119 @@
+import gzip
+import io
+import lzma
+import os
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from gravador_cdrdao import imagem_comprimida, setores_cd
+from gravador_cdrdao.imagem_comprimida import (
+    abrir_imagem,
+    decodificar_ecm,
+    tamanho_descomprimido,
+)
+from gravador_cdrdao.parser_cue import localizar_comprimida
+
+
+def _contagem_ecm(tipo: int, quantidade: int) -> bytes:
+    quantidade = (quantidade - 1) & 0xFFFFFFFF
+    saida = bytearray([(0x80 if quantidade >= 32 else 0) | ((quantidade & 31) << 2) | tipo])
+    quantidade >>= 5
+    while quantidade:
+        saida.append((0x80 if quantidade >= 128 else 0) | (quantidade & 127))
+        quantidade >>= 7
+    return bytes(saida)
+
+
+def _setor(tipo: int, semente: int) -> bytearray:
+    setor = bytearray(os.urandom(setores_cd.TAMANHO_SETOR))
+    setor[0x0C:0x10] = bytes([0, 2, semente, 1 if tipo == setores_cd.TIPO_MODE1 else 2])
+    if tipo != setores_cd.TIPO_MODE1:
+        setor[0x14:0x18] = setor[0x10:0x14]
+    setores_cd.regenerar(setor, tipo)
+    return setor
+
+
+def _imagem_e_ecm() -> tuple[bytes, bytes]:
+    """Um BIN com trechos crus, Mode 1 e Mode 2, e o ECM equivalente."""
+    imagem = bytearray()
+    ecm = bytearray(b"ECM\x00")
+    cru = os.urandom(100)
+    imagem += cru
+    ecm += _contagem_ecm(0, len(cru)) + cru
+    modo1 = [_setor(setores_cd.TIPO_MODE1, i) for i in range(40)]
+    ecm += _contagem_ecm(setores_cd.TIPO_MODE1, len(modo1))
+    for setor in modo1:
+        imagem += setor
+        ecm += setor[0x0C:0x0F] + setor[0x10:0x810]
+    for tipo, fim in ((setores_cd.TIPO_MODE2_FORM1, 0x818), (setores_cd.TIPO_MODE2_FORM2, 0x92C)):
+        setor = _setor(tipo, 3)
+        imagem += setor
+        ecm += _contagem_ecm(0, 16) + setor[:16]
+        ecm += _contagem_ecm(tipo, 1) + setor[0x14:fim]
+    ecm += _contagem_ecm(0, 0)
+    ecm += setores_cd.edc(bytes(imagem)).to_bytes(4, "little")
+    return bytes(imagem), bytes(ecm)
+
+
+@pytest.mark.parametrize("vetorizado", [True, False])
+def test_decodificar_ecm_regenera_setores(monkeypatch, vetorizado):
+    if vetorizado and not setores_cd.VETORIZADO:
+        pytest.skip("NumPy ausente.")
+    monkeypatch.setattr(setores_cd, "VETORIZADO", vetorizado)
+    imagem, ecm = _imagem_e_ecm()
+    saida = io.BytesIO()
+    assert decodificar_ecm(io.BytesIO(ecm), saida) == len(imagem)
+    assert saida.getvalue() == imagem
+
+    corrompido = ecm[:-1] + bytes([ecm[-1] ^ 1])
+    with pytest.raises(ValueError, match="EDC"):
+        decodificar_ecm(io.BytesIO(corrompido), io.BytesIO())
+
+
+def test_formatos_comprimidos_decodificados_por_processo(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", str(Path(imagem_comprimida.__file__).parents[1]))
+    imagem, ecm = _imagem_e_ecm()
+    (tmp_path / "a.bin.ecm").write_bytes(ecm)
+    with gzip.open(tmp_path / "b.bin.gz", "wb") as arquivo:
+        arquivo.write(imagem)
+    with lzma.open(tmp_path / "c.bin.xz", "wb") as arquivo:
+        arquivo.write(imagem)
+    with zipfile.ZipFile(tmp_path / "d.bin.zip", "w", zipfile.ZIP_DEFLATED) as arquivo:
+        arquivo.writestr("d.bin", imagem)
+
+    for nome in ("a.bin.ecm", "b.bin.gz", "c.bin.xz", "d.bin.zip"):
+        caminho = tmp_path / nome
+        assert localizar_comprimida(tmp_path / nome.rsplit(".", 1)[0]) == caminho
+        assert tamanho_descomprimido(caminho) == len(imagem)
+        with abrir_imagem(caminho) as leitor:
+            assert leitor.read() == imagem
+
+    (tmp_path / "e.bin.gz").write_bytes(b"lixo")
+    with pytest.raises(ValueError, match="e.bin.gz"):
+        with abrir_imagem(tmp_path / "e.bin.gz") as leitor:
+            leitor.read()
+
+
+def test_ecm_corrompido_falha_sem_gravar_da_origem(tmp_path, monkeypatch, capsys):
+    from gravador_cdrdao import execucao_sincrona
+    from gravador_cdrdao.cli import main
+
+    monkeypatch.setenv("PYTHONPATH", str(Path(imagem_comprimida.__file__).parents[1]))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.delenv("GRAVADOR_CDRDAO_CACHE_LOCAL", raising=False)
+    monkeypatch.setattr("os.geteuid", lambda: 1000)
+    _, ecm = _imagem_e_ecm()
+    (tmp_path / "jogo.bin.ecm").write_bytes(ecm[:-1] + bytes([ecm[-1] ^ 1]))
+    cue = tmp_path / "jogo.cue"
+    cue.write_text(
+        'FILE "jogo.bin.ecm" BINARY\nTRACK 01 MODE2/2352\nINDEX 01 00:00:00\n'
+    )
+    gravados = []
+    monkeypatch.setattr(execucao_sincrona, "comando_trabalho", gravados.append)
+
+    assert main(["burn", str(cue), "--device", "/dev/sr0"]) == 1
+    assert gravados == []
+    erro = capsys.readouterr().err
+    assert "Imagem comprimida indisponível (Falha ao decodificar" in erro
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from gravador_cdrdao.hashes_imagem import calcular_hashes
+from gravador_cdrdao.indice_dat import IndiceDat, construir_indice
+from gravador_cdrdao.parser_cue import ArquivoCue, CueSheet
+
+
+def _rom(caminho: Path) -> str:
+    hashes = calcular_hashes(caminho)
+    return (
+        f'<rom name="{caminho.name}" size="{hashes.tamanho}" '
+        f'crc="{hashes.crc32}" sha1="{hashes.sha1}"/>'
+    )
+
+
+def test_indice_dat_corresponde_cue(tmp_path: Path):
+    faixa1 = tmp_path / "jogo (Track 1).bin"
+    faixa2 = tmp_path / "jogo (Track 2).bin"
+    faixa1.write_bytes(b"\x01" * 4704)
+    faixa2.write_bytes(b"\x02" * 2352)
+    dat = tmp_path / "ps1.dat"
+    dat.write_text(
+        "<?xml version='1.0'?><datafile><header><name>PS1</name></header>"
+        '<game name="Outro Jogo"><rom name="x.bin" size="10" crc="0000abcd"/></game>'
+        f'<game name="Jogo (USA)">{_rom(faixa1)}{_rom(faixa2)}</game>'
+        "</datafile>",
+        encoding="utf-8",
+    )
+    destino = tmp_path / "dat.idx"
+    assert construir_indice([dat], destino) == 3
+
+    indice = IndiceDat(destino)
+    try:
+        assert indice.buscar(10, 0xABCD) == ["Outro Jogo"]
+        assert indice.buscar(10, 0xABCE) == []
+        cue = CueSheet(
+            arquivos=[
+                ArquivoCue(caminho=str(faixa1), tipo="BINARY", faixas=[]),
+                ArquivoCue(caminho=str(faixa2), tipo="BINARY", faixas=[]),
+            ]
+        )
+        assert indice.corresponder(cue).titulo == "Jogo (USA)"
+        faixa2.write_bytes(b"\x03" * 2352)
+        correspondencia = indice.corresponder(cue)
+        assert correspondencia.titulo is None
+        assert correspondencia.arquivos[str(faixa2)] is None
+    finally:
+        indice.fechar()
@@ -0,0 +1,64 @@
+import sys
+import threading
+
+from gravador_cdrdao.info_drive import (
+    ConsultorInfoDrive,
+    InfoDispositivo,
+    interpretar_disk_info,
+    interpretar_inquiry,
+)
+from gravador_cdrdao.supervisor_processos import SupervisorProcessos
+
+DISK_INFO = """\
+CD-RW                : no
+Total Capacity       : 79:59:74 (359999 blocks, 703/791 MB)
+Recording Speed      : 16X - 48X
+CD-R empty           : yes
+Appendable           : yes
+Remaining Capacity   : 79:59:74 (359999 blocks, 703/791 MB)
+"""
+
+_FALSO_CDRDAO = (
+    "import sys\n"
+    "if sys.argv[1] == 'inquiry':\n"
+    "    print('Vendor   : ASUS'); print('Product  : DRW-24'); print('Revision : 1.00')\n"
+    f"else:\n    print({DISK_INFO!r})\n"
+)
+
+
+def test_interpretar_saidas():
+    info = InfoDispositivo(caminho="/dev/sr0")
+    interpretar_inquiry("Vendor   : ASUS\nProduct  : DRW-24\nRevision : 1.00\n", info)
+    interpretar_disk_info(DISK_INFO, info)
+    assert (info.fabricante, info.modelo, info.revisao) == ("ASUS", "DRW-24", "1.00")
+    assert info.midia_presente and info.vazia and info.anexavel
+    assert info.regravavel is False
+    assert info.capacidade_total == info.capacidade_restante == 359999
+    assert info.velocidade_max_x == 48
+
+    sem_midia = InfoDispositivo(caminho="/dev/sr0")
+    interpretar_disk_info("ERROR: Unit not ready, giving up.\n", sem_midia)
+    assert not sem_midia.midia_presente
+
+
+def test_consultor_em_paralelo_com_cache(tmp_path):
+    script = tmp_path / "cdrdao.py"
+    script.write_text(_FALSO_CDRDAO)
+    supervisor = SupervisorProcessos()
+    consultor = ConsultorInfoDrive(supervisor, [sys.executable, str(script)])
+    recebidos: list[InfoDispositivo] = []
+    prontos = threading.Event()
+
+    def ao_concluir(info: InfoDispositivo) -> None:
+        recebidos.append(info)
+        if len(recebidos) == 3:
+            prontos.set()
+
+    consultor.consultar_todos(["/dev/sr0", "/dev/sr1"], ao_concluir)
+    consultor.consultar("/dev/sr0", ao_concluir)
+    assert prontos.wait(20)
+    assert sorted(info.caminho for info in recebidos) == ["/dev/sr0", "/dev/sr0", "/dev/sr1"]
+    assert consultor.em_cache("/dev/sr1").velocidade_max_x == 48
+    consultor.invalidar("/dev/sr1")
+    assert consultor.em_cache("/dev/sr1") is None
+    supervisor.encerrar(5)
@@ -0,0 +1,93 @@
+import os
+from pathlib import Path
+
+from gravador_cdrdao.cache_cue import CacheCue
+from gravador_cdrdao.info_drive import InfoDispositivo
+from gravador_cdrdao.layout_disco import (
+    ResultadoCapacidade,
+    cabe_na_midia,
+    checar_capacidade,
+    escolher_dispositivo,
+)
+
+
+def _criar_cue(tmp_path: Path) -> Path:
+    (tmp_path / "dados.bin").write_bytes(bytes(2048 * 100))
+    (tmp_path / "audio.bin").write_bytes(bytes(2352 * 300))
+    cue = tmp_path / "disco.cue"
+    cue.write_text(
+        'FILE "dados.bin" BINARY\nTRACK 01 MODE1/2048\nINDEX 01 00:00:00\nPOSTGAP 00:02:00\n'
+        'FILE "audio.bin" BINARY\nTRACK 02 AUDIO\nINDEX 01 00:00:00\n'
+        "TRACK 03 AUDIO\nINDEX 01 00:02:00\n",
+        encoding="utf-8",
+    )
+    return cue
+
+
+def _midia_vazia(caminho: str, livres: int) -> InfoDispositivo:
+    return InfoDispositivo(
+        caminho, midia_presente=True, vazia=True, capacidade_restante=livres
+    )
+
+
+def test_layout_soma_faixas_e_gaps(tmp_path: Path):
+    layout = CacheCue().layout(_criar_cue(tmp_path))
+    assert [faixa.setores for faixa in layout.faixas] == [100, 150, 150]
+    assert layout.setores_total == 100 + 300 + 150
+    assert layout.duracao == "00:07:25"
+
+
+def test_layout_recalculado_quando_bin_muda(tmp_path: Path):
+    cue = _criar_cue(tmp_path)
+    cache = CacheCue()
+    primeiro = cache.layout(cue)
+    assert cache.layout(cue) is primeiro
+    with open(tmp_path / "audio.bin", "ab") as saida:
+        saida.write(bytes(2352 * 75))
+    os.utime(tmp_path / "audio.bin", ns=(0, 1))
+    assert cache.layout(cue).setores_total == primeiro.setores_total + 75
+
+
+def test_escolher_dispositivo_com_capacidade(tmp_path: Path):
+    layout = CacheCue().layout(_criar_cue(tmp_path))
+    pequena = InfoDispositivo("/dev/sr0", midia_presente=True, vazia=True, capacidade_restante=500)
+    grande = InfoDispositivo("/dev/sr1", midia_presente=True, vazia=True, capacidade_restante=900)
+    justa = InfoDispositivo("/dev/sr2", midia_presente=True, vazia=True, capacidade_restante=600)
+    sem_midia = InfoDispositivo("/dev/sr3")
+    assert cabe_na_midia(layout, pequena) is False
+    assert cabe_na_midia(layout, sem_midia) is None
+    infos = [pequena, grande, justa, sem_midia]
+    assert escolher_dispositivo(layout, infos, set()) == "/dev/sr2"
+    assert escolher_dispositivo(layout, infos, {"/dev/sr2"}) == "/dev/sr1"
+    assert escolher_dispositivo(layout, infos, {"/dev/sr1", "/dev/sr2"}) is None
+
+
+def test_mapear_faixas_soma_gaps_gerados_ao_lba(tmp_path: Path):
+    (tmp_path / "dados.bin").write_bytes(bytes(2352 * 100))
+    (tmp_path / "audio.bin").write_bytes(bytes(2352 * 300))
+    cue = tmp_path / "disco.cue"
+    cue.write_text(
+        'FILE "dados.bin" BINARY\nTRACK 01 MODE2/2352\nINDEX 01 00:00:00\n'
+        'FILE "audio.bin" BINARY\nTRACK 02 AUDIO\nPREGAP 00:02:00\nINDEX 01 00:00:00\n'
+        "TRACK 03 AUDIO\nINDEX 01 00:02:00\nPOSTGAP 00:01:00\n"
+        "TRACK 04 AUDIO\nINDEX 01 00:03:00\n",
+        encoding="utf-8",
+    )
+    layout = CacheCue().layout(cue)
+    assert [faixa.lba_inicial for faixa in layout.faixas] == [0, 250, 400, 550]
+    assert layout.setores_total == 100 + 300 + 150 + 75
+
+
+def test_checar_capacidade_avisa_bloqueia_ou_troca_de_drive(tmp_path: Path):
+    layout = CacheCue().layout(_criar_cue(tmp_path))
+    pequeno = _midia_vazia("/dev/sr0", 100)
+    grande = _midia_vazia("/dev/sr1", 900)
+
+    desconhecido = checar_capacidade(layout, "/dev/sr2", [pequeno], set())
+    assert "desconhecida" in desconhecido.aviso and not desconhecido.motivo
+    cabe = checar_capacidade(layout, "/dev/sr1", [grande], set())
+    assert cabe == ResultadoCapacidade()
+    bloqueado = checar_capacidade(layout, "/dev/sr0", [pequeno, grande], {"/dev/sr1"})
+    assert "550 setores" in bloqueado.motivo and bloqueado.alternativo is None
+    trocado = checar_capacidade(layout, "/dev/sr0", [pequeno, grande], set())
+    assert trocado.alternativo == "/dev/sr1" and not trocado.motivo
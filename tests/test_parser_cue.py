@@ -1,11 +1,15 @@
 from pathlib import Path
 
+import pytest
+
 from gravador_cdrdao.classificador_erros import ClassificadorErros
 from gravador_cdrdao.parser_cue import (
     aplicar_mapeamento_nomes,
     carregar_cue,
     corrigir_conteudo_cue,
     detectar_mismatch_nomes,
+    reescrever_nomes,
+    sugerir_mapeamento_automatico,
 )
 
 
@@ -55,3 +59,134 @@ def test_classificador_erros():
     classificador = ClassificadorErros()
     diag = classificador.classificar("cannot open device")
     assert diag is not None
+
+
+def test_classificador_uma_varredura_por_linha():
+    classificador = ClassificadorErros()
+    ocorrencias = classificador.analisar("cannot open device: no such file")
+    assert [o.regra for o in ocorrencias] == ["permissao", "arquivo_ausente"]
+    # "cannot open device" e "cannot open .*\.bin" começam no mesmo ponto: vale
+    # só a regra de maior prioridade.
+    ocorrencias = classificador.analisar("cannot open device imagem.bin")
+    assert [o.regra for o in ocorrencias] == ["permissao"]
+
+
+def test_carregar_cue_comandos_completos(tmp_path: Path):
+    cue = tmp_path / "disco.cue"
+    cue.write_text(
+        "REM GENRE Game\n"
+        "CATALOG 0000000000000\n"
+        "TITLE \"Disco\"\n"
+        "FILE \"faixa 1.bin\" BINARY\n"
+        "  TRACK 01 MODE2/2352\n"
+        "    INDEX 01 00:00:00\n"
+        "  TRACK 02 AUDIO\n"
+        "    FLAGS DCP pre\n"
+        "    ISRC USXXX0000001\n"
+        "    PREGAP 00:02:00\n"
+        "    INDEX 01 12:34:56\n"
+        "    POSTGAP 00:00:10\n",
+        encoding="utf-8",
+    )
+    sheet = carregar_cue(cue)
+    assert sheet.comentarios == ["GENRE Game"]
+    assert sheet.titulo == "Disco"
+    assert sheet.arquivos[0].caminho == "faixa 1.bin"
+    faixa = sheet.arquivos[0].faixas[1]
+    assert faixa.flags == ["DCP", "PRE"]
+    assert faixa.isrc == "USXXX0000001"
+    assert (faixa.pregap, faixa.postgap) == (150, 10)
+    assert faixa.indices[0].frames == (12 * 60 + 34) * 75 + 56
+    assert faixa.indices[0].tempo == "12:34:56"
+
+
+def test_carregar_cue_tempo_invalido(tmp_path: Path):
+    cue = tmp_path / "disco.cue"
+    cue.write_text("FILE \"a.bin\" BINARY\nTRACK 01 AUDIO\nINDEX 01 00:61:00\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Linha 3"):
+        carregar_cue(cue)
+
+
+def test_mismatch_ranqueado_e_automatico(tmp_path: Path):
+    for nome, setores in [
+        ("Jogo (Europe) (Track 1).bin", 100),
+        ("Jogo (Europe) (Track 2).bin", 50),
+        ("Outro (Track 1).bin", 3),
+        ("leiame.txt", 0),
+    ]:
+        (tmp_path / nome).write_bytes(b"\0" * (2352 * setores))
+    cue = tmp_path / "jogo.cue"
+    cue.write_text(
+        "FILE \"Jogo (USA) (Track 1).bin\" BINARY\nTRACK 01 MODE2/2352\nINDEX 01 00:00:00\n"
+        "FILE \"Jogo (USA) (Track 2).bin\" BINARY\nTRACK 02 AUDIO\nINDEX 01 00:00:00\n",
+        encoding="utf-8",
+    )
+    sheet = carregar_cue(cue)
+    sugestoes = detectar_mismatch_nomes(sheet, tmp_path, limite=2)
+    assert sugestoes["Jogo (USA) (Track 2).bin"] == [
+        "Jogo (Europe) (Track 2).bin",
+        "Jogo (Europe) (Track 1).bin",
+    ]
+    assert sugerir_mapeamento_automatico(sheet, tmp_path) == {
+        "Jogo (USA) (Track 1).bin": "Jogo (Europe) (Track 1).bin",
+        "Jogo (USA) (Track 2).bin": "Jogo (Europe) (Track 2).bin",
+    }
+
+
+def test_reescrever_nomes_passada_unica():
+    conteudo = (
+        'REM "a.bin" fica intacto\r\n'
+        'FILE "a.bin" BINARY\r\n'
+        "  TRACK 01 AUDIO\r\n"
+        "FILE b.bin BINARY\r\n"
+    )
+    novo, edicoes = reescrever_nomes(conteudo, {"a.bin": "b.bin", "b.bin": "c.bin"})
+    assert novo == (
+        'REM "a.bin" fica intacto\r\n'
+        'FILE "b.bin" BINARY\r\n'
+        "  TRACK 01 AUDIO\r\n"
+        'FILE "c.bin" BINARY\r\n'
+    )
+    assert [(e.linha, e.antigo, e.novo) for e in edicoes] == [
+        (2, "a.bin", "b.bin"),
+        (4, "b.bin", "c.bin"),
+    ]
+
+
+def test_reescrever_nomes_com_bom_e_aspas_tipograficas():
+    assert aplicar_mapeamento_nomes(
+        '\ufeffFILE "a.bin" BINARY\r\n', {"a.bin": "b.bin"}
+    ) == 'FILE "b.bin" BINARY\r\n'
+    novo, edicoes = reescrever_nomes(
+        "REM “x”\nFILE “a.bin” BINARY\n", {"a.bin": "b.bin"}
+    )
+    assert novo == 'REM “x”\nFILE "b.bin" BINARY\n'
+    assert [(e.linha, e.antigo) for e in edicoes] == [(2, "a.bin")]
+
+
+def test_file_separado_por_tab(tmp_path: Path):
+    (tmp_path / "a b.bin").write_bytes(b"")
+    (tmp_path / "c.bin").write_bytes(b"")
+    cue = tmp_path / "jogo.cue"
+    cue.write_text(
+        'FILE "a b.bin"\tBINARY\n  TRACK 01 AUDIO\n    INDEX 01 00:00:00\n'
+        "FILE c.bin\t\tBINARY\n  TRACK 02 AUDIO\n    INDEX 01 00:00:00\n"
+    )
+    sheet = carregar_cue(cue)
+    assert [(a.caminho, a.tipo) for a in sheet.arquivos] == [
+        ("a b.bin", "BINARY"),
+        ("c.bin", "BINARY"),
+    ]
+    novo, edicoes = reescrever_nomes('FILE "a b.bin"\tBINARY\n', {"a b.bin": "d.bin"})
+    assert novo == 'FILE "d.bin" BINARY\n'
+    assert len(edicoes) == 1
+
+
+def test_analisador_erros_incremental():
+    analisador = ClassificadorErros().novo_analisador()
+    assert analisador.alimentar("Starting write at speed 8...") == []
+    assert analisador.alimentar("cannot open device /dev/sr0: permission denied") != []
+    ocorrencias = analisador.alimentar("usb 1-1: resetting usb high-speed device")
+    assert [(o.regra, o.linha, o.fatal) for o in ocorrencias] == [("usb_reset", 3, True)]
+    assert analisador.fatal is ocorrencias[0]
+    assert [o.regra for o in analisador.ocorrencias] == ["permissao", "usb_reset"]
@@ -0,0 +1,64 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from gravador_cdrdao.fila_trabalhos import criar_pipeline
+from gravador_cdrdao.pre_leitura import PreLeitor, bytes_em_memoria, duracao_estimada
+
+TAMANHO = 1024 * 1024
+
+
+def _imagem_fria(pasta: Path, nome: str) -> tuple[Path, Path]:
+    binario = pasta / f"{nome}.bin"
+    with open(binario, "wb") as arquivo:
+        arquivo.write(os.urandom(TAMANHO))
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    fd = os.open(binario, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    cue = pasta / f"{nome}.cue"
+    cue.write_text(f'FILE "{binario.name}" BINARY\n  TRACK 01 MODE1/2352\n    INDEX 01 00:00:00\n')
+    if bytes_em_memoria(binario) != 0:
+        pytest.skip("Sistema de arquivos não permite tirar páginas do page cache.")
+    return cue, binario
+
+
+def _aguardar_em_memoria(binario: Path) -> bool:
+    limite = time.monotonic() + 10
+    while time.monotonic() < limite:
+        if bytes_em_memoria(binario) == TAMANHO:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_pre_leitura_respeita_ordem_e_orcamento(tmp_path):
+    cue_a, bin_a = _imagem_fria(tmp_path, "a")
+    cue_b, bin_b = _imagem_fria(tmp_path, "b")
+    pre_leitor = PreLeitor(limite_bytes=TAMANHO)
+    try:
+        pre_leitor.agendar("a", str(cue_a), inicio_previsto=20.0)
+        pre_leitor.agendar("b", str(cue_b), inicio_previsto=10.0)
+        assert _aguardar_em_memoria(bin_b)
+        time.sleep(0.2)
+        # O orçamento só cabe uma imagem: "a" espera "b" ser liberado.
+        assert bytes_em_memoria(bin_a) == 0
+        estatistica = pre_leitor.iniciar("b")
+        assert estatistica.bytes_total == TAMANHO
+        assert estatistica.taxa_acerto == 1.0
+        pre_leitor.liberar("b")
+        assert _aguardar_em_memoria(bin_a)
+    finally:
+        pre_leitor.parar()
+
+
+def test_duracao_estimada_conta_etapas_com_imagem():
+    trabalho = criar_pipeline("/dev/sr0", ["simular", "gravar", "verificar"], "x.cue", 4)
+    assert duracao_estimada(trabalho, 75 * 2352 * 4 * 10) == pytest.approx(30.0)
+    trabalho = criar_pipeline("/dev/sr0", ["apagar"], "x.cue", 4)
+    assert duracao_estimada(trabalho, 10**9) == 0
@@ -0,0 +1,66 @@
+from gravador_cdrdao.leitor_saida import DivisorLinhas
+from gravador_cdrdao.progresso import (
+    AnalisadorProgresso,
+    LimitadorProgresso,
+    ProgressoCdrdao,
+    SaidaRetida,
+)
+
+
+def _progresso(mensagem: str) -> ProgressoCdrdao:
+    return ProgressoCdrdao(mensagem=mensagem, faixa=None, buffer=None)
+
+
+def test_analisador_mantem_faixa_atual():
+    analisador = AnalisadorProgresso()
+    assert analisador.analisar("   \n") is None
+    analisador.analisar("Writing track 02 (mode AUDIO/AUDIO)...")
+    progresso = analisador.analisar("Wrote 10 of 600 MB (buffer 98%).")
+    assert progresso.faixa == "02"
+    assert progresso.buffer == "98%"
+
+
+def test_limitador_agrupa_e_emite_estado_mais_recente():
+    agora = [0.0]
+    limitador = LimitadorProgresso(max_por_segundo=2, relogio=lambda: agora[0])
+    assert limitador.oferecer(_progresso("a")).mensagem == "a"
+    assert limitador.oferecer(_progresso("b")) is None
+    assert limitador.oferecer(_progresso("c")) is None
+    agora[0] = 0.5
+    assert limitador.oferecer(_progresso("d")).mensagem == "d"
+    assert limitador.oferecer(_progresso("e")) is None
+    assert limitador.pendente().mensagem == "e"
+    assert limitador.pendente() is None
+    assert (limitador.recebidos, limitador.emitidos) == (5, 3)
+
+
+def test_saida_retida_guarda_apenas_o_final():
+    saida = SaidaRetida(max_linhas=2)
+    for numero in range(5):
+        saida.adicionar(f"linha {numero}\n")
+    assert saida.total_linhas == 5
+    assert saida.texto() == "... (3 linhas anteriores omitidas)\nlinha 3\nlinha 4"
+
+
+def test_divisor_linhas_trata_retorno_de_carro():
+    divisor = DivisorLinhas()
+    assert divisor.alimentar(b"Wrote 1 of 600 MB\rWrote 2 of") == ["Wrote 1 of 600 MB"]
+    assert divisor.alimentar(b" 600 MB\r") == ["Wrote 2 of 600 MB"]
+    assert divisor.alimentar(b"\nfim\r\nres") == ["fim"]
+    assert divisor.finalizar() == ["res"]
+
+
+def test_telemetria_de_escrita():
+    agora = [0.0]
+    analisador = AnalisadorProgresso(relogio=lambda: agora[0])
+    analisador.analisar("Wrote 0 of 100 MB (Buffers 100%  96%).")
+    agora[0] = 2.0
+    progresso = analisador.analisar("Wrote 2 of 100 MB (Buffers 90%  80%).")
+    assert (progresso.mb_escritos, progresso.mb_total) == (2, 100)
+    assert (progresso.fifo_host, progresso.buffer_drive) == (90, 80)
+    assert progresso.buffer == "80%"
+    assert progresso.mb_s == 1.0
+    assert progresso.eta_segundos == 98.0
+    assert len(analisador.serie) == 2
+    assert analisador.serie.buffer_drive_minimo() == 80
+    assert analisador.serie.velocidade_media() == 1.0
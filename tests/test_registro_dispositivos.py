@@ -0,0 +1,79 @@
+import os
+import shutil
+from pathlib import Path
+
+from gravador_cdrdao import registro_dispositivos
+from gravador_cdrdao.registro_dispositivos import (
+    EVENTO_ADICIONADO,
+    EVENTO_MIDIA,
+    EVENTO_REMOVIDO,
+    RegistroDispositivos,
+    interpretar_uevent,
+)
+
+
+def _criar_drive(raiz: Path, nome: str, setores: int = 0) -> None:
+    (raiz / nome / "device").mkdir(parents=True)
+    (raiz / nome / "device" / "vendor").write_text("ASUS\n")
+    (raiz / nome / "device" / "model").write_text("DRW-24\n")
+    (raiz / nome / "size").write_text(f"{setores}\n")
+
+
+def test_sincronizar_emite_eventos(tmp_path: Path):
+    eventos = []
+    registro = RegistroDispositivos(tmp_path, ao_evento=eventos.append)
+    _criar_drive(tmp_path, "sr0")
+    (tmp_path / "sda").mkdir()
+    registro.sincronizar()
+    assert [(e.tipo, e.dispositivo.caminho) for e in eventos] == [(EVENTO_ADICIONADO, "/dev/sr0")]
+    assert registro.obter("/dev/sr0").modelo == "DRW-24"
+
+    (tmp_path / "sr0" / "size").write_text("1300000\n")
+    _criar_drive(tmp_path, "sr1")
+    assert [(e.tipo, e.dispositivo.caminho) for e in registro.sincronizar()] == [
+        (EVENTO_MIDIA, "/dev/sr0"),
+        (EVENTO_ADICIONADO, "/dev/sr1"),
+    ]
+    assert registro.sincronizar() == []
+
+
+def test_aplicar_uevent(tmp_path: Path):
+    registro = RegistroDispositivos(tmp_path)
+    _criar_drive(tmp_path, "sr0")
+    mensagem = b"add@/devices/x/block/sr0\0ACTION=add\0SUBSYSTEM=block\0DEVNAME=sr0\0"
+    campos = interpretar_uevent(mensagem)
+    assert [e.tipo for e in registro.aplicar_uevent(campos)] == [EVENTO_ADICIONADO]
+    assert registro.aplicar_uevent({**campos, "DEVNAME": "sda"}) == []
+    remocao = {**campos, "ACTION": "remove"}
+    assert [e.tipo for e in registro.aplicar_uevent(remocao)] == [EVENTO_REMOVIDO]
+    assert registro.dispositivos() == []
+
+
+def test_sondar_rele_so_drives_alterados(tmp_path: Path, monkeypatch):
+    registro = RegistroDispositivos(tmp_path)
+    _criar_drive(tmp_path, "sr0")
+    _criar_drive(tmp_path, "sr1")
+    registro.sincronizar()
+    lidos = []
+    ler = registro_dispositivos.ler_dispositivo
+
+    def ler_contando(caminho: Path):
+        lidos.append(caminho.name)
+        return ler(caminho)
+
+    monkeypatch.setattr(registro_dispositivos, "ler_dispositivo", ler_contando)
+    assert registro.sondar() == [] and lidos == []
+
+    # O sysfs não atualiza o mtime quando a mídia muda: só o conteúdo.
+    antes = os.stat(tmp_path / "sr1" / "size")
+    (tmp_path / "sr1" / "size").write_text("1300000\n")
+    os.utime(tmp_path / "sr1" / "size", ns=(antes.st_atime_ns, antes.st_mtime_ns))
+    assert [(e.tipo, e.dispositivo.caminho) for e in registro.sondar()] == [
+        (EVENTO_MIDIA, "/dev/sr1")
+    ]
+    assert lidos == ["sr1"]
+
+    shutil.rmtree(tmp_path / "sr0")
+    assert [(e.tipo, e.dispositivo.caminho) for e in registro.sondar()] == [
+        (EVENTO_REMOVIDO, "/dev/sr0")
+    ]
@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from gravador_cdrdao.registro_log import RegistroLog
+
+
+def test_buffer_circular_limita_memoria():
+    registro = RegistroLog(max_linhas=3)
+    for numero in range(10):
+        registro.anexar(f"linha {numero}")
+    assert registro.linhas() == ["linha 7", "linha 8", "linha 9"]
+    assert registro.total_linhas == 10
+    assert registro.descartadas == 7
+
+
+def test_anexar_texto_multilinha_retorna_linhas_novas():
+    registro = RegistroLog()
+    assert registro.anexar("a\nb") == ["a", "b"]
+    assert registro.texto() == "a\nb"
+
+
+def test_log_completo_em_disco(tmp_path: Path):
+    arquivo = tmp_path / "logs" / "trabalho.log"
+    registro = RegistroLog(max_linhas=1, arquivo=arquivo)
+    registro.anexar("primeira")
+    registro.anexar("segunda")
+    registro.fechar()
+    assert registro.linhas() == ["segunda"]
+    assert arquivo.read_text(encoding="utf-8") == "primeira\nsegunda\n"
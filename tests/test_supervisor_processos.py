@@ -0,0 +1,97 @@
+import sys
+import threading
+import time
+
+from gravador_cdrdao.supervisor_processos import SupervisorProcessos
+
+
+def _executar(supervisor, identificador, codigo_python):
+    linhas: list[str] = []
+    fim: dict[str, object] = {}
+    terminou = threading.Event()
+
+    def ao_fim(codigo, falha):
+        fim.update(codigo=codigo, falha=falha)
+        terminou.set()
+
+    supervisor.iniciar(
+        identificador,
+        [sys.executable, "-c", codigo_python],
+        ao_linhas=linhas.extend,
+        ao_fim=ao_fim,
+    )
+    return linhas, fim, terminou
+
+
+def test_executa_processos_em_uma_unica_thread():
+    supervisor = SupervisorProcessos()
+    threads_antes = threading.active_count()
+    execucoes = [
+        _executar(supervisor, f"job-{n}", f"print('linha {n}')") for n in range(4)
+    ]
+    for _linhas, fim, terminou in execucoes:
+        assert terminou.wait(10)
+        assert fim["codigo"] == 0
+    assert threading.active_count() <= threads_antes + 1
+    assert [execucao[0] for execucao in execucoes] == [[f"linha {n}"] for n in range(4)]
+    supervisor.encerrar(5)
+
+
+def test_cancelamento_escala_para_kill():
+    supervisor = SupervisorProcessos(tempo_limite_termino=0.5)
+    codigo = (
+        "import signal, sys, time\n"
+        "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+        "print('pronto', flush=True)\n"
+        "time.sleep(30)\n"
+    )
+    linhas, fim, terminou = _executar(supervisor, "teimoso", codigo)
+    limite = time.monotonic() + 10
+    while not linhas and time.monotonic() < limite:
+        time.sleep(0.05)
+    supervisor.cancelar("teimoso")
+    assert terminou.wait(10)
+    assert fim["codigo"] == -9
+    supervisor.encerrar(5)
+
+
+def test_tarefa_cancelada_chama_ao_fim():
+    supervisor = SupervisorProcessos(tempo_limite_termino=0.5)
+    terminou = threading.Event()
+    linhas: list[str] = []
+    resultado = {}
+
+    def ao_fim(codigo, falha):
+        resultado.update(codigo=codigo, falha=falha)
+        terminou.set()
+
+    codigo = "import time\nprint('pronto', flush=True)\ntime.sleep(30)\n"
+    futuro = supervisor.iniciar(
+        "lento",
+        [sys.executable, "-c", codigo],
+        ao_linhas=linhas.extend,
+        ao_fim=ao_fim,
+    )
+    limite = time.monotonic() + 10
+    while not linhas and time.monotonic() < limite:
+        time.sleep(0.05)
+    futuro.cancel()
+    assert terminou.wait(10)
+    assert resultado == {"codigo": -1, "falha": "Cancelado."}
+    supervisor.encerrar(5)
+
+
+def test_comando_inexistente_reporta_falha():
+    supervisor = SupervisorProcessos()
+    terminou = threading.Event()
+    resultado = {}
+
+    def ao_fim(codigo, falha):
+        resultado.update(codigo=codigo, falha=falha)
+        terminou.set()
+
+    supervisor.iniciar("x", ["/nao/existe"], ao_linhas=lambda _: None, ao_fim=ao_fim)
+    assert terminou.wait(10)
+    assert resultado["codigo"] == 1
+    assert "Falha ao executar" in resultado["falha"]
+    supervisor.encerrar(5)
@@ -0,0 +1,77 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from gravador_cdrdao import setores_cd
+from gravador_cdrdao.parser_cue import carregar_cue, resolver_caminhos_relativos
+from gravador_cdrdao.varredura_setores import varrer_cue
+
+if not setores_cd.VETORIZADO:
+    pytest.skip("NumPy ausente.", allow_module_level=True)
+
+
+def _bcd(valor: int) -> int:
+    return (valor // 10) << 4 | valor % 10
+
+
+def _setor_mode2(lba: int) -> bytearray:
+    setor = bytearray(os.urandom(setores_cd.TAMANHO_SETOR))
+    setor[0:12] = setores_cd.SYNC
+    endereco = lba + 150
+    setor[12:16] = bytes(
+        [_bcd(endereco // 4500), _bcd(endereco // 75 % 60), _bcd(endereco % 75), 2]
+    )
+    form2 = lba % 3 == 0
+    setor[0x10:0x14] = bytes([0, 0, 0x20 if form2 else 0x08, 0])
+    setor[0x14:0x18] = setor[0x10:0x14]
+    tipo = setores_cd.TIPO_MODE2_FORM2 if form2 else setores_cd.TIPO_MODE2_FORM1
+    setores_cd.regenerar(setor, tipo)
+    return setor
+
+
+def test_varredura_aponta_setores_ruins_por_track(tmp_path, monkeypatch):
+    monkeypatch.setattr("gravador_cdrdao.varredura_setores.SETORES_POR_BLOCO", 16)
+    imagem = bytearray()
+    for lba in range(60):
+        imagem += _setor_mode2(lba)
+    # EDC do LBA 5, ECC do 16 e 17 (form 1) e cabeçalho do 31 a 33: os dois
+    # últimos atravessam a fronteira entre blocos.
+    imagem[5 * 2352 + 100] ^= 1
+    imagem[16 * 2352 + 0x900] ^= 1
+    imagem[17 * 2352 + 0x900] ^= 1
+    for lba in (31, 32, 33):
+        imagem[lba * 2352 + 14] ^= 1
+    (tmp_path / "a.bin").write_bytes(imagem + os.urandom(2352 * 4))
+    (tmp_path / "a.cue").write_text(
+        'FILE "a.bin" BINARY\n'
+        "  TRACK 01 MODE2/2352\n    INDEX 01 00:00:00\n"
+        "  TRACK 02 AUDIO\n    INDEX 01 00:00:60\n"
+    )
+    cue = resolver_caminhos_relativos(carregar_cue(tmp_path / "a.cue"), tmp_path)
+
+    relatorio = varrer_cue(cue, max_processos=1)
+    dados, audio = relatorio.faixas
+    assert dados.intervalos == [(5, 5), (31, 33)]
+    assert (dados.falhas_edc, dados.falhas_cabecalho) == (1, 3)
+    assert not audio.varrida
+
+    relatorio = varrer_cue(cue, ecc=True, max_processos=1)
+    assert relatorio.faixas[0].intervalos == [(5, 5), (16, 17), (31, 33)]
+    # O LBA 5 também tem o ECC errado; o cabeçalho fica fora do ECC no Mode 2.
+    assert relatorio.faixas[0].falhas_ecc == 3
+    assert not relatorio.ok
+    assert "16-17" in relatorio.resumo()
+
+
+def test_varredura_em_processos_uma_track_por_arquivo(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", str(Path(setores_cd.__file__).parents[1]))
+    (tmp_path / "a.bin").write_bytes(b"".join(_setor_mode2(lba) for lba in range(8)))
+    (tmp_path / "b.bin").write_bytes(bytes(2352 * 4))
+    (tmp_path / "a.cue").write_text(
+        'FILE "a.bin" BINARY\n  TRACK 01 MODE2/2352\n    INDEX 01 00:00:00\n'
+        'FILE "b.bin" BINARY\n  TRACK 02 MODE2/2352\n    INDEX 01 00:00:00\n'
+    )
+    cue = resolver_caminhos_relativos(carregar_cue(tmp_path / "a.cue"), tmp_path)
+    relatorio = varrer_cue(cue, max_processos=2)
+    assert [faixa.intervalos for faixa in relatorio.faixas] == [[], [(8, 11)]]
@@ -0,0 +1,93 @@
+import os
+from pathlib import Path
+
+from gravador_cdrdao.parser_cue import carregar_cue, resolver_caminhos_relativos
+from gravador_cdrdao.verificacao import MODO_BRUTO, mapear_faixas, verificar_midia
+
+
+def _criar_imagem(tmp_path: Path, setores: int) -> tuple[Path, bytes]:
+    setores_brutos = []
+    for numero in range(setores):
+        cabecalho = b"\x00" + b"\xff" * 10 + b"\x00" + numero.to_bytes(3, "big") + b"\x01"
+        setores_brutos.append(cabecalho + os.urandom(2048) + bytes(288))
+    dados = b"".join(setores_brutos)
+    (tmp_path / "jogo.bin").write_bytes(dados)
+    cue = tmp_path / "jogo.cue"
+    cue.write_text(
+        'FILE "jogo.bin" BINARY\nTRACK 01 MODE1/2352\nINDEX 01 00:00:00\n',
+        encoding="utf-8",
+    )
+    return cue, dados
+
+
+def _carregar(cue: Path):
+    return resolver_caminhos_relativos(carregar_cue(cue), cue.parent)
+
+
+def test_mapear_faixas_multi_arquivo(tmp_path: Path):
+    (tmp_path / "a.bin").write_bytes(bytes(2352 * 10))
+    (tmp_path / "b.bin").write_bytes(bytes(2352 * 200))
+    cue = tmp_path / "disco.cue"
+    cue.write_text(
+        'FILE "a.bin" BINARY\nTRACK 01 MODE2/2352\nINDEX 01 00:00:00\n'
+        'FILE "b.bin" BINARY\nTRACK 02 AUDIO\nINDEX 00 00:00:00\nINDEX 01 00:02:00\n',
+        encoding="utf-8",
+    )
+    regioes = mapear_faixas(_carregar(cue))
+    assert [(r.lba_inicial, r.setores) for r in regioes] == [(0, 10), (10, 200)]
+
+
+def test_verificacao_cozida_detecta_setores_diferentes(tmp_path: Path):
+    cue, dados = _criar_imagem(tmp_path, 150)
+    usuario = bytearray(
+        b"".join(dados[n * 2352 + 16 : n * 2352 + 2064] for n in range(150))
+    )
+    usuario[70 * 2048 + 5] ^= 0xFF
+    usuario[71 * 2048 + 5] ^= 0xFF
+    disco = tmp_path / "disco.iso"
+    disco.write_bytes(bytes(usuario))
+    resultado = verificar_midia(_carregar(cue), str(disco))
+    faixa = resultado.faixas[0]
+    assert not resultado.ok
+    assert (faixa.primeiro_lba_diferente, faixa.setores_diferentes) == (70, 2)
+
+
+def test_verificacao_bruta_identica(tmp_path: Path):
+    cue, dados = _criar_imagem(tmp_path, 100)
+    disco = tmp_path / "disco.raw"
+    disco.write_bytes(dados)
+    resultado = verificar_midia(_carregar(cue), str(disco), MODO_BRUTO)
+    assert resultado.ok
+    assert resultado.faixas[0].setores == 100
+
+
+def test_verificacao_disco_curto_reporta_ilegiveis(tmp_path: Path):
+    cue, dados = _criar_imagem(tmp_path, 10)
+    disco = tmp_path / "disco.raw"
+    disco.write_bytes(dados[: 2352 * 8])
+    resultado = verificar_midia(_carregar(cue), str(disco), MODO_BRUTO)
+    assert resultado.faixas[0].setores_ilegiveis == 2
+
+
+def test_verificacao_modo_misto_ignora_audio(tmp_path: Path):
+    cue, dados = _criar_imagem(tmp_path, 10)
+    (tmp_path / "audio.bin").write_bytes(bytes(2352 * 5))
+    with cue.open("a", encoding="utf-8") as arquivo:
+        arquivo.write('FILE "audio.bin" BINARY\nTRACK 02 AUDIO\nINDEX 01 00:00:00\n')
+    usuario = bytearray(
+        b"".join(dados[n * 2352 + 16 : n * 2352 + 2064] for n in range(10))
+    )
+    disco = tmp_path / "disco.iso"
+    disco.write_bytes(bytes(usuario))
+    resultado = verificar_midia(_carregar(cue), str(disco))
+    assert resultado.ok
+    assert [faixa.numero for faixa in resultado.ignoradas] == ["02"]
+    assert resultado.resumo().endswith(
+        "dados idênticos; track(s) 02 ignorada(s), sem conferir."
+    )
+
+    usuario[3 * 2048] ^= 0xFF
+    disco.write_bytes(bytes(usuario))
+    resultado = verificar_midia(_carregar(cue), str(disco))
+    assert not resultado.ok
+    assert resultado.resumo().endswith("Verificação falhou.")
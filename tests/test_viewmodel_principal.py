@@ -0,0 +1,105 @@
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from gravador_cdrdao.cache_cue import CacheCue  # noqa: E402
+from gravador_cdrdao.fila_trabalhos import criar_pipeline  # noqa: E402
+from gravador_cdrdao.hashes_imagem import CacheHashes  # noqa: E402
+from gravador_cdrdao.info_drive import InfoDispositivo  # noqa: E402
+from gravador_cdrdao.registro_log import RegistroLog  # noqa: E402
+from gravador_cdrdao.viewmodel_principal import ViewModelPrincipal  # noqa: E402
+
+
+def test_capacidade_insuficiente_sem_alternativa(tmp_path: Path):
+    (tmp_path / "jogo.bin").write_bytes(bytes(2352 * 1000))
+    cue = tmp_path / "jogo.cue"
+    cue.write_text('FILE "jogo.bin" BINARY\nTRACK 01 MODE2/2352\nINDEX 01 00:00:00\n')
+    infos = {
+        "/dev/sr0": InfoDispositivo(
+            "/dev/sr0", midia_presente=True, vazia=True, capacidade_restante=500
+        ),
+    }
+    # O último drive registrado ainda não tem informação em cache.
+    dispositivos = [SimpleNamespace(caminho=f"/dev/sr{numero}") for numero in (0, 1)]
+    viewmodel = SimpleNamespace(
+        _cache_cue=CacheCue(),
+        _consultor_info=SimpleNamespace(em_cache=infos.get),
+        _registro_dispositivos=SimpleNamespace(dispositivos=lambda: dispositivos),
+        _agendador=SimpleNamespace(em_execucao=lambda _: False, pendentes=lambda _: []),
+    )
+    trabalho = criar_pipeline("/dev/sr0", ["gravar"], str(cue), 4)
+    motivo = ViewModelPrincipal._checar_capacidade(viewmodel, trabalho)
+    assert motivo == "1000 setores (00:13:25) não cabem nos 500 livres em /dev/sr0"
+
+
+def test_dat_sem_hashes_em_cache_calcula_fora_da_interface(tmp_path: Path):
+    (tmp_path / "jogo.bin").write_bytes(bytes(2352))
+    cue = tmp_path / "jogo.cue"
+    cue.write_text('FILE "jogo.bin" BINARY\nTRACK 01 MODE2/2352\nINDEX 01 00:00:00\n')
+    iniciados = []
+    viewmodel = SimpleNamespace(
+        _cache_hashes=CacheHashes(),
+        _indice_dat=None,
+        _iniciar_hashes=lambda caminho, _: iniciados.append(caminho) or True,
+        _ao_hashes_dat=lambda *_: None,
+    )
+    carregado = CacheCue().carregar_resolvido(cue)
+    texto = ViewModelPrincipal._corresponder_dat(viewmodel, carregado, str(cue))
+    assert texto == "Dump: calculando hashes em segundo plano (resultado no log)."
+    assert iniciados == [str(cue)]
+
+
+def test_calcular_hashes_nao_bloqueia_a_interface(tmp_path: Path):
+    cue = tmp_path / "jogo.cue"
+    cue.write_text('FILE "jogo.bin" BINARY\nTRACK 01 MODE2/2352\nINDEX 01 00:00:00\n')
+    iniciados = []
+    emitidos = []
+    viewmodel = SimpleNamespace(
+        _iniciar_hashes=lambda caminho, _: iniciados.append(caminho) or True,
+        _ao_hashes_calculados=None,
+        progresso_atualizado=SimpleNamespace(emit=emitidos.append),
+    )
+    assert ViewModelPrincipal.calcular_hashes(viewmodel, str(cue)) == (
+        True,
+        "Cálculo de hashes iniciado.",
+    )
+    assert iniciados == [str(cue)]
+    assert emitidos == ["Calculando hashes..."]
+
+
+def test_log_do_trabalho_gravado_no_diretorio_configurado(tmp_path: Path):
+    emitidos = []
+    viewmodel = SimpleNamespace(
+        _diretorio_logs=tmp_path / "logs",
+        _logs_trabalhos={},
+        estado=SimpleNamespace(log=RegistroLog()),
+        log_anexado=SimpleNamespace(emit=emitidos.append),
+    )
+    viewmodel._append_log = partial(ViewModelPrincipal._append_log, viewmodel)
+    ViewModelPrincipal._ao_trabalho_iniciado(viewmodel, "t1", "/dev/sr0")
+    viewmodel._append_log("[/dev/sr0] linha do cdrdao", "t1")
+    viewmodel._append_log("geral")
+    viewmodel._logs_trabalhos["t1"].fechar()
+    assert (tmp_path / "logs" / "t1.log").read_text(encoding="utf-8") == (
+        f"[/dev/sr0] Log completo em {tmp_path / 'logs' / 't1.log'}\n"
+        "[/dev/sr0] linha do cdrdao\n"
+    )
+    assert emitidos[-1] == "geral"
+
+
+def test_reenfileirado_atualiza_velocidade_pedida():
+    logs = []
+    viewmodel = SimpleNamespace(
+        _velocidades={"t1": 8},
+        _append_log=lambda mensagem, identificador=None: logs.append(mensagem),
+        progresso_drive=SimpleNamespace(emit=lambda *_: None),
+    )
+    ViewModelPrincipal._ao_reenfileirado(viewmodel, "t1", "/dev/sr0", "Buffer", 4)
+    assert viewmodel._velocidades == {"t1": 4}
+    assert logs[-1] == "[/dev/sr0] Nova tentativa a 4x (antes 8x)."
+    ViewModelPrincipal._ao_reenfileirado(viewmodel, "t1", "/dev/sr0", "Buffer", 4)
+    assert logs[-1] == "[/dev/sr0] Trabalho reenfileirado após: Buffer"